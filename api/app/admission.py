@@ -0,0 +1,261 @@
+"""
+Admission control for the expensive endpoints (/rag/query, /directions, /search).
+
+Each endpoint gets a concurrency limit with a bounded wait queue, an optional
+per-client token bucket and a deadline. Waiting happens on the event loop, before
+the request reaches a threadpool worker, so shed or queued requests never hold
+the threads the cheap map endpoints run on. Rejections are fast 429/503 responses
+with Retry-After; queued requests whose client disconnected are dropped.
+
+Limits are configured per endpoint with ADMISSION_<NAME>, e.g.
+ADMISSION_RAG="concurrency=2,queue=8,timeout=60,rate=0.2,burst=3".
+"""
+import asyncio
+import contextvars
+import math
+import os
+import time
+from collections import deque
+
+from fastapi.responses import JSONResponse
+
+from .utils import error_response
+
+# İstemci bütçesi (saniye); endpoint'in kendi timeout'undan kısaysa o geçerli
+TIMEOUT_HEADER = b"x-request-timeout"
+TRUST_PROXY = os.getenv("ADMISSION_TRUST_PROXY", "").lower() in ("1", "true", "yes")
+MAX_CLIENTS = 10_000
+
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar("admission_deadline", default=None)
+
+
+def remaining_seconds(default: float, minimum: float = 0.5) -> float:
+    """Time left until the current request's deadline, capped at `default`."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return default
+    return max(min(default, deadline - time.monotonic()), minimum)
+
+
+class Rejected(Exception):
+    def __init__(self, status: int, message: str, retry_after: float):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+
+
+class ClientGone(Exception):
+    """The client disconnected while its request was queued."""
+
+
+class TokenBuckets:
+    """Per-client token buckets: `rate` tokens per second, up to `burst`."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.buckets: dict[str, tuple[float, float]] = {}
+
+    def take(self, client: str, now: float) -> float:
+        """Takes a token; returns 0 on success or the seconds until one is available."""
+        if len(self.buckets) > MAX_CLIENTS:
+            # Dolmuş kovaları at: tam dolu kova kayıt tutmadan da aynı davranır
+            self.buckets = {
+                c: (t, at) for c, (t, at) in self.buckets.items()
+                if t + (now - at) * self.rate < self.burst
+            }
+        tokens, updated = self.buckets.get(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self.buckets[client] = (tokens, now)
+            return (1 - tokens) / self.rate
+        self.buckets[client] = (tokens - 1, now)
+        return 0.0
+
+
+class Limiter:
+    """Concurrency limit with a bounded FIFO queue. Used only from the event loop."""
+
+    def __init__(self, name, concurrency, queue, timeout, rate=0.0, burst=0):
+        self.name = name
+        self.concurrency = int(concurrency)
+        self.queue = int(queue)
+        self.timeout = float(timeout)
+        self.buckets = TokenBuckets(float(rate), float(burst or rate)) if rate else None
+        self.active = 0
+        self.waiters: deque[asyncio.Future] = deque()
+        self.service_time = 1.0  # saniye, üstel ortalama; Retry-After tahmini için
+        self.stats = {k: 0 for k in ("admitted", "queue_full", "rate_limited", "expired", "abandoned")}
+
+    def retry_after(self) -> float:
+        return self.service_time * (len(self.waiters) + 1) / self.concurrency
+
+    async def acquire(self, client: str, deadline: float, disconnected: asyncio.Future):
+        now = time.monotonic()
+        if self.buckets is not None:
+            wait = self.buckets.take(client, now)
+            if wait:
+                self.stats["rate_limited"] += 1
+                raise Rejected(429, "Too many requests", wait)
+
+        if self.active < self.concurrency and not self.waiters:
+            self.active += 1
+            self.stats["admitted"] += 1
+            return
+        if len(self.waiters) >= self.queue:
+            self.stats["queue_full"] += 1
+            raise Rejected(503, f"{self.name} is overloaded", self.retry_after())
+
+        slot = asyncio.get_running_loop().create_future()
+        self.waiters.append(slot)
+        try:
+            await asyncio.wait({slot, disconnected}, timeout=max(deadline - now, 0), return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            if slot.done() and not slot.cancelled():
+                # Slot devredildikten sonra iptal edildik: kapasite kaybolmasın, sıradakine aktar
+                self.release()
+            raise
+        finally:
+            if not slot.done():
+                slot.cancel()
+                self.waiters.remove(slot)
+
+        if slot.cancelled():
+            if disconnected.done():
+                self.stats["abandoned"] += 1
+                raise ClientGone()
+            self.stats["expired"] += 1
+            raise Rejected(503, f"{self.name} queue timeout", self.retry_after())
+        if disconnected.done():
+            # Slot bize devredildi ama istemci gitti: sıradakine aktar
+            self.release()
+            self.stats["abandoned"] += 1
+            raise ClientGone()
+        self.stats["admitted"] += 1
+
+    def release(self, elapsed: float | None = None):
+        if elapsed is not None:
+            self.service_time = 0.8 * self.service_time + 0.2 * elapsed
+        while self.waiters:
+            slot = self.waiters.popleft()
+            if not slot.done():
+                slot.set_result(True)  # slot doğrudan sıradakine geçer, active değişmez
+                return
+        self.active -= 1
+
+
+def parse_limit(spec: str, defaults: dict) -> dict:
+    """'concurrency=2,queue=8' -> defaults updated with those keys."""
+    limit = dict(defaults)
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        key, _, value = part.partition("=")
+        if key not in ("concurrency", "queue", "timeout", "rate", "burst"):
+            raise ValueError(f"unknown admission setting '{key}'")
+        limit[key] = float(value)
+    return limit
+
+
+# (method, path) -> (isim, varsayılanlar). Eşzamanlılık toplamı (2 + 8 + 16) threadpool'un
+# (40) altında kalır; kalan iş parçacıkları ucuz harita endpoint'lerine ayrılır.
+DEFAULT_LIMITS = {
+    ("POST", "/rag/query"): ("rag", {"concurrency": 2, "queue": 8, "timeout": 60}),
+    ("POST", "/directions"): ("directions", {"concurrency": 8, "queue": 32, "timeout": 25}),
+    ("GET", "/search"): ("search", {"concurrency": 16, "queue": 64, "timeout": 5}),
+}
+
+
+def build_limiters(limits=DEFAULT_LIMITS) -> dict:
+    limiters = {}
+    for route, (name, defaults) in limits.items():
+        config = parse_limit(os.getenv(f"ADMISSION_{name.upper()}", ""), defaults)
+        limiters[route] = Limiter(name, **config)
+    return limiters
+
+
+def admission_metrics(limiters):
+    """Gauges for /internal/stats: current load and cumulative outcomes per limiter."""
+    for limiter in limiters.values():
+        labels = {"limiter": limiter.name}
+        yield "admission_active", labels, limiter.active
+        yield "admission_queued", labels, len(limiter.waiters)
+        for outcome, count in limiter.stats.items():
+            yield "admission_requests", {**labels, "outcome": outcome}, count
+
+
+def client_id(scope) -> str:
+    if TRUST_PROXY:
+        for key, value in scope.get("headers", []):
+            if key == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def request_deadline(scope, timeout: float, now: float) -> float:
+    for key, value in scope.get("headers", []):
+        if key == TIMEOUT_HEADER:
+            try:
+                timeout = min(timeout, float(value))
+            except ValueError:
+                pass
+    return now + timeout
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying the Limiter of the matching (method, path)."""
+
+    def __init__(self, app, limiters=None):
+        self.app = app
+        self.limiters = limiters if limiters is not None else build_limiters()
+
+    async def __call__(self, scope, receive, send):
+        limiter = None
+        if scope["type"] == "http":
+            limiter = self.limiters.get((scope["method"], scope["path"]))
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        now = time.monotonic()
+        deadline = request_deadline(scope, limiter.timeout, now)
+
+        # Gövde önceden okunur; kuyrukta beklerken receive() yalnızca kopmayı dinler
+        messages = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            messages.append(message)
+            if not message.get("more_body"):
+                break
+        disconnected = asyncio.ensure_future(receive())
+
+        try:
+            await limiter.acquire(client_id(scope), deadline, disconnected)
+        except ClientGone:
+            return
+        except Rejected as e:
+            disconnected.cancel()
+            response = JSONResponse(
+                status_code=e.status,
+                content=error_response(message=e.message, code=e.status),
+                headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+            )
+            await response(scope, receive, send)
+            return
+
+        async def replay():
+            if messages:
+                return messages.pop(0)
+            return await disconnected
+
+        token = _deadline.set(deadline)
+        started = time.monotonic()
+        try:
+            await self.app(scope, replay, send)
+        finally:
+            _deadline.reset(token)
+            if not disconnected.done():
+                disconnected.cancel()
+            limiter.release(time.monotonic() - started)
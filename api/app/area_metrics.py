@@ -0,0 +1,142 @@
+import json
+import math
+
+from fastapi import HTTPException
+
+CELL = 0.01  # derece; ingest tarafındaki grid ile aynı
+# Daha büyük alanlar için /metrics (ilçe bazlı) kullanılmalı; tüm İstanbul ~9000 hücre
+MAX_CELLS = 10_000
+
+POLYGON_TYPES = ("Polygon", "MultiPolygon")
+
+# Tam kapsanan hücreler city.cell_* ön-agregasyonlarından toplanır; yalnızca sınır
+# hücrelerinde hücreye kırpılmış parçalar / POI'ler çokgenle kesilir.
+AREA_METRICS_SQL = """
+WITH area AS (
+    SELECT ST_MakeValid(ST_SetSRID(ST_GeomFromGeoJSON(%(geometry)s), 4326)) AS geom
+),
+grid AS (
+    SELECT
+        cx AS cell_x,
+        cy AS cell_y,
+        ST_MakeEnvelope(cx * %(cell)s, cy * %(cell)s, (cx + 1) * %(cell)s, (cy + 1) * %(cell)s, 4326) AS env
+    FROM generate_series(%(x0)s, %(x1)s) cx, generate_series(%(y0)s, %(y1)s) cy
+),
+cells AS (
+    SELECT g.cell_x, g.cell_y, g.env, ST_Covers(a.geom, g.env) AS covered
+    FROM grid g, area a
+    WHERE ST_Intersects(a.geom, g.env)
+),
+full_metrics AS (
+    SELECT
+        COALESCE(SUM(m.green_area_m2), 0) AS green_area_m2,
+        COALESCE(SUM(m.bike_lane_km), 0) AS bike_lane_km,
+        COALESCE(SUM(m.pedestrian_length_m), 0) AS pedestrian_length_m
+    FROM cells c
+    JOIN city.cell_metrics m USING (cell_x, cell_y)
+    WHERE c.covered
+),
+edge_pieces AS (
+    SELECT p.layer, ST_Transform(ST_Intersection(p.geom, a.geom), 3857) AS geom
+    FROM cells c
+    JOIN city.cell_pieces p USING (cell_x, cell_y)
+    CROSS JOIN area a
+    WHERE NOT c.covered AND ST_Intersects(p.geom, a.geom)
+),
+edge_metrics AS (
+    -- Ölçüler pipeline'daki parçalarla aynı projeksiyonda (3857)
+    SELECT
+        COALESCE(SUM(ST_Area(geom)) FILTER (WHERE layer = 'green_area'), 0) AS green_area_m2,
+        COALESCE(SUM(ST_Length(geom)) FILTER (WHERE layer = 'bike_lane'), 0) / 1000 AS bike_lane_km,
+        COALESCE(SUM(ST_Length(geom)) FILTER (WHERE layer = 'pedestrian'), 0) AS pedestrian_length_m
+    FROM edge_pieces
+),
+poi_counts AS (
+    SELECT m.poi_type, m.poi_count
+    FROM cells c
+    JOIN city.cell_poi_counts m USING (cell_x, cell_y)
+    WHERE c.covered
+    UNION ALL
+    -- Sınır hücresi: POI, pipeline'daki floor kuralıyla yalnızca kendi hücresinde sayılır
+    SELECT p.poi_type, count(*)
+    FROM cells c
+    JOIN city.pois p
+      ON p.geom && c.env
+     AND floor(ST_X(p.geom) / %(cell)s) = c.cell_x
+     AND floor(ST_Y(p.geom) / %(cell)s) = c.cell_y
+    CROSS JOIN area a
+    WHERE NOT c.covered AND p.poi_type IS NOT NULL AND ST_Covers(a.geom, p.geom)
+    GROUP BY p.poi_type
+),
+poi_totals AS (
+    SELECT poi_type, SUM(poi_count)::bigint AS poi_count
+    FROM poi_counts
+    GROUP BY poi_type
+)
+SELECT
+    (SELECT ST_Area(geom::geography) / 1e6 FROM area) AS area_km2,
+    (SELECT count(*) FILTER (WHERE covered) FROM cells) AS covered_cells,
+    (SELECT count(*) FILTER (WHERE NOT covered) FROM cells) AS boundary_cells,
+    f.green_area_m2 + e.green_area_m2 AS green_area_m2,
+    f.bike_lane_km + e.bike_lane_km AS bike_lane_km,
+    f.pedestrian_length_m + e.pedestrian_length_m AS pedestrian_length_m,
+    (SELECT COALESCE(jsonb_object_agg(poi_type, poi_count), '{}'::jsonb) FROM poi_totals) AS poi_counts
+FROM full_metrics f, edge_metrics e;
+"""
+
+
+def bbox_polygon(minx, miny, maxx, maxy) -> dict:
+    ring = [[minx, miny], [maxx, miny], [maxx, maxy], [minx, maxy], [minx, miny]]
+    return {"type": "Polygon", "coordinates": [ring]}
+
+
+def area_geometry(payload) -> dict:
+    """Returns the (Multi)Polygon of a GeoJSON geometry or Feature body."""
+    if isinstance(payload, dict) and payload.get("type") == "Feature":
+        payload = payload.get("geometry")
+    if not isinstance(payload, dict) or payload.get("type") not in POLYGON_TYPES:
+        raise HTTPException(status_code=400, detail="body must be a GeoJSON Polygon/MultiPolygon or a Feature with one")
+    if not isinstance(payload.get("coordinates"), list) or not payload["coordinates"]:
+        raise HTTPException(status_code=400, detail="polygon coordinates are missing")
+    return payload
+
+
+def _positions(coords):
+    if coords and not isinstance(coords[0], list):
+        yield coords
+    else:
+        for c in coords:
+            yield from _positions(c)
+
+
+def cell_range(geometry: dict):
+    """Grid cell range (x0, x1, y0, y1) covering the geometry's bounding box."""
+    try:
+        xs, ys = zip(*((float(p[0]), float(p[1])) for p in _positions(geometry["coordinates"])))
+    except (TypeError, ValueError, IndexError):
+        raise HTTPException(status_code=400, detail="polygon coordinates must be [lon, lat] numbers")
+    x0, x1 = math.floor(min(xs) / CELL), math.floor(max(xs) / CELL)
+    y0, y1 = math.floor(min(ys) / CELL), math.floor(max(ys) / CELL)
+    if (x1 - x0 + 1) * (y1 - y0 + 1) > MAX_CELLS:
+        raise HTTPException(status_code=400, detail="area too large; use /metrics for district totals")
+    return x0, x1, y0, y1
+
+
+def area_metrics(cur, geometry: dict) -> dict:
+    x0, x1, y0, y1 = cell_range(geometry)
+    cur.execute(AREA_METRICS_SQL, {
+        "geometry": json.dumps(geometry),
+        "cell": CELL,
+        "x0": x0, "x1": x1, "y0": y0, "y1": y1,
+    })
+    row = cur.fetchone()
+    poi_counts = dict(sorted(row["poi_counts"].items()))
+    return {
+        "area_km2": round(row["area_km2"], 3),
+        "cells": {"covered": row["covered_cells"], "boundary": row["boundary_cells"]},
+        "green_area_m2": round(row["green_area_m2"], 2),
+        "bike_lane_km": round(row["bike_lane_km"], 2),
+        "pedestrian_length_m": round(row["pedestrian_length_m"], 2),
+        "total_pois": sum(poi_counts.values()),
+        "poi_counts": poi_counts,
+    }
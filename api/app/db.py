@@ -1,10 +1,14 @@
 import os
 import psycopg2
-from psycopg2.extras import RealDictCursor
 
-def get_connection():
+from .instrumentation import TimedCursor, timed
+
+def get_connection(**kwargs):
     db_url = os.getenv("DATABASE_URL")
     if not db_url:
         raise ValueError("DATABASE_URL environment variable is not set")
-    conn = psycopg2.connect(db_url, cursor_factory=RealDictCursor)
+    # TimedCursor bir RealDictCursor; sorgu süreleri /internal/stats'a yazılır
+    # kwargs libpq parametreleri olarak eklenir (ör. connect_timeout)
+    with timed("db_connect_duration_seconds"):
+        conn = psycopg2.connect(db_url, cursor_factory=TimedCursor, **kwargs)
     return conn
@@ -0,0 +1,256 @@
+import itertools
+import json
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from .db import get_connection
+from .instrumentation import TimedTupleCursor as TupleCursor
+from .utils import error_response
+
+# Desteklenen çıktı formatları
+GEOJSON = "geojson"
+FLATGEOBUF = "fgb"
+ARROW = "arrow"
+PARQUET = "parquet"
+
+FORMAT_ALIASES = {
+    "geojson": GEOJSON,
+    "json": GEOJSON,
+    "fgb": FLATGEOBUF,
+    "flatgeobuf": FLATGEOBUF,
+    "arrow": ARROW,
+    "geoarrow": ARROW,
+    "parquet": PARQUET,
+    "geoparquet": PARQUET,
+}
+
+ACCEPT_TYPES = {
+    "application/geo+json": GEOJSON,
+    "application/json": GEOJSON,
+    "application/flatgeobuf": FLATGEOBUF,
+    "application/vnd.apache.arrow.stream": ARROW,
+    "application/vnd.apache.parquet": PARQUET,
+    "application/x-parquet": PARQUET,
+}
+
+MEDIA_TYPES = {
+    FLATGEOBUF: "application/flatgeobuf",
+    ARROW: "application/vnd.apache.arrow.stream",
+    PARQUET: "application/vnd.apache.parquet",
+}
+
+EXTENSIONS = {
+    FLATGEOBUF: "fgb",
+    ARROW: "arrows",
+    PARQUET: "parquet",
+}
+
+BATCH_SIZE = 10_000
+
+# Format Accept başlığına göre seçildiği için cache'ler ayrı tutmalı
+VARY_HEADERS = {"Vary": "Accept"}
+
+DISTRICT_COLUMNS = [
+    ("district_id", pa.int32()),
+    ("district_name", pa.string()),
+]
+
+POI_COLUMNS = [
+    ("poi_id", pa.string()),
+    ("name", pa.string()),
+    ("poi_type", pa.string()),
+    ("subtype", pa.string()),
+    ("district_name", pa.string()),
+    ("address_text", pa.string()),
+]
+
+GREEN_AREA_COLUMNS = [
+    ("area_id", pa.string()),
+    ("name", pa.string()),
+    ("district_name", pa.string()),
+    ("district_id", pa.int32()),
+    ("area_m2", pa.float64()),
+]
+
+
+def negotiate_format(fmt: str | None, accept: str | None) -> str:
+    """
+    Picks the output format from the `format` query parameter, falling back
+    to the highest-q recognised media type in the Accept header and then GeoJSON.
+    """
+    if fmt:
+        key = FORMAT_ALIASES.get(fmt.lower())
+        if not key:
+            raise HTTPException(
+                status_code=400,
+                detail=f"format must be one of: {', '.join(sorted(FORMAT_ALIASES))}",
+            )
+        return key
+
+    if accept:
+        for media, _ in sorted(_accept_entries(accept), key=lambda e: -e[1]):
+            if media in ACCEPT_TYPES:
+                return ACCEPT_TYPES[media]
+
+    return GEOJSON
+
+
+def _accept_entries(accept: str):
+    """Yields (media type, q) pairs; entries with q=0 are not acceptable."""
+    for part in accept.split(","):
+        media, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media and q > 0:
+            yield media.lower(), q
+
+
+def export_layer(
+    fmt: str,
+    columns: list[tuple[str, pa.DataType]],
+    from_clause: str,
+    params: tuple,
+    geometry_types: list[str],
+    filename: str,
+    empty_message: str,
+):
+    """
+    Serves `SELECT <columns>, geom FROM <from_clause>` as a binary layer.
+
+    FlatGeobuf is built by PostGIS in one pass (the packed R-tree has to
+    precede the features). Arrow IPC and GeoParquet are streamed from a
+    server-side cursor in record batches with WKB geometries. An empty
+    layer gets the usual 404 error envelope instead of an empty file.
+    """
+    names = ", ".join(name for name, _ in columns)
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}.{EXTENSIONS[fmt]}"',
+        **VARY_HEADERS,
+    }
+    not_found = JSONResponse(
+        status_code=404,
+        content=error_response(message=empty_message, code=404),
+        headers=VARY_HEADERS,
+    )
+
+    if fmt == FLATGEOBUF:
+        sql = f"""
+            SELECT ST_AsFlatGeobuf(q, true, 'geom') AS fgb
+            FROM (SELECT {names}, geom FROM {from_clause}) AS q;
+        """
+        conn = get_connection()
+        cur = conn.cursor(cursor_factory=TupleCursor)
+        cur.execute(sql, params)
+        row = cur.fetchone()
+        cur.close()
+        conn.close()
+
+        if not row or not row[0]:
+            return not_found
+        return Response(content=bytes(row[0]), media_type=MEDIA_TYPES[fmt], headers=headers)
+
+    schema = _layer_schema(columns, geometry_types, geoparquet=(fmt == PARQUET))
+    sql = f"SELECT {names}, ST_AsBinary(geom) AS geometry FROM {from_clause};"
+    batches = _record_batches(sql, params, schema)
+
+    # İlk batch'i önceden çek: boş katman için 404 dönebilmek lazım
+    first = next(batches, None)
+    if first is None:
+        return not_found
+    batches = itertools.chain([first], batches)
+
+    if fmt == ARROW:
+        stream = _encode(batches, lambda sink: ipc.new_stream(sink, schema))
+    else:
+        stream = _encode(batches, lambda sink: pq.ParquetWriter(sink, schema, compression="zstd"))
+
+    return StreamingResponse(stream, media_type=MEDIA_TYPES[fmt], headers=headers)
+
+
+def _layer_schema(columns, geometry_types, geoparquet=False):
+    geometry = pa.field(
+        "geometry",
+        pa.binary(),
+        metadata={"ARROW:extension:name": "geoarrow.wkb", "ARROW:extension:metadata": "{}"},
+    )
+    schema = pa.schema([pa.field(name, type_) for name, type_ in columns] + [geometry])
+
+    if geoparquet:
+        geo = {
+            "version": "1.0.0",
+            "primary_column": "geometry",
+            "columns": {
+                "geometry": {"encoding": "WKB", "geometry_types": geometry_types},
+            },
+        }
+        schema = schema.with_metadata({"geo": json.dumps(geo)})
+
+    return schema
+
+
+def _record_batches(sql, params, schema):
+    conn = get_connection()
+    try:
+        cur = conn.cursor(name="layer_export", cursor_factory=TupleCursor)
+        cur.itersize = BATCH_SIZE
+        cur.execute(sql, params)
+
+        while True:
+            rows = cur.fetchmany(BATCH_SIZE)
+            if not rows:
+                break
+
+            columns = [list(col) for col in zip(*rows)]
+            columns[-1] = [bytes(g) if g is not None else None for g in columns[-1]]
+            yield pa.RecordBatch.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+                schema=schema,
+            )
+
+        cur.close()
+    finally:
+        conn.close()
+
+
+class _ChunkSink:
+    """Minimal writable file that hands written bytes back to the response stream."""
+
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _encode(batches, open_writer):
+    sink = _ChunkSink()
+    writer = open_writer(sink)
+
+    for batch in batches:
+        writer.write_batch(batch)
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+
+    writer.close()
+    yield sink.drain()
@@ -0,0 +1,333 @@
+"""
+In-process latency instrumentation, exported as Prometheus text on /internal/stats.
+
+- Endpoint latency and response size histograms (InstrumentationMiddleware)
+- DB connect/execute/fetch timings per normalized statement (TimedCursor)
+- Upstream (Elasticsearch, ORS, Gemini) and RAG stage timings (timed())
+- Cache hit/miss counters (count_cache())
+- Optional slow-request sampler (SLOW_REQUEST_PROFILE=1)
+
+Recording is one lock + a bisect per observation; no background work runs unless
+the sampler is enabled.
+"""
+import bisect
+import os
+import re
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+
+from psycopg2.extensions import cursor as TupleCursor
+from psycopg2.extras import RealDictCursor
+
+# saniye
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# bayt
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_SECONDS", "1.0"))
+SLOW_REQUEST_PROFILE = os.getenv("SLOW_REQUEST_PROFILE", "").lower() in ("1", "true", "yes")
+SAMPLE_INTERVAL = float(os.getenv("SLOW_REQUEST_SAMPLE_MS", "10")) / 1000
+
+HELP = {
+    "http_request_duration_seconds": "End-to-end request latency by route",
+    "http_response_size_bytes": "Response body size by route",
+    "db_connect_duration_seconds": "Time to open a PostgreSQL connection",
+    "db_query_duration_seconds": "PostgreSQL statement time by normalized statement and phase",
+    "upstream_request_duration_seconds": "Elasticsearch and upstream HTTP call latency",
+    "rag_stage_duration_seconds": "RAG pipeline stage latency",
+    "cache_requests_total": "Cache lookups by cache and result",
+    "slow_requests_total": "Requests slower than SLOW_REQUEST_SECONDS by route",
+}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms: dict[tuple, Histogram] = {}
+        self.counters: dict[tuple, float] = {}
+        self.collectors = []
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = Histogram(buckets)
+            hist.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def add_collector(self, fn):
+        """fn() -> iterable of (name, labels dict, value) gauges, evaluated at scrape time."""
+        self.collectors.append(fn)
+
+    def render(self) -> str:
+        with self.lock:
+            histograms = {k: (list(h.counts), h.sum, h.buckets) for k, h in self.histograms.items()}
+            counters = dict(self.counters)
+
+        lines, typed = [], set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                if name in HELP:
+                    lines.append(f"# HELP {name} {HELP[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), (counts, total, buckets) in sorted(histograms.items()):
+            header(name, "histogram")
+            cumulative = 0
+            for bound, count in zip(buckets, counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels, le=_number(bound))} {cumulative}")
+            cumulative += counts[-1]
+            lines.append(f"{name}_bucket{_labels(labels, le='+Inf')} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name, "counter")
+            lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+        # Aynı metriğin örnekleri text formatında art arda gelmeli
+        gauges = {}
+        for collect in self.collectors:
+            for name, labels, value in collect():
+                gauges.setdefault(name, []).append(f"{name}{_labels(tuple(sorted(labels.items())))} {_number(value)}")
+        for name, samples in gauges.items():
+            header(name, "gauge")
+            lines.extend(samples)
+
+        return "\n".join(lines) + "\n"
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def _labels(labels, **extra) -> str:
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+registry = Registry()
+
+
+@contextmanager
+def timed(name, **labels):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(name, time.perf_counter() - started, **labels)
+
+
+def count_cache(cache: str, hit: bool):
+    registry.inc("cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+
+def cache_ratios():
+    with registry.lock:
+        counters = dict(registry.counters)
+    totals = {}
+    for (name, labels), value in counters.items():
+        if name == "cache_requests_total":
+            label = dict(labels)
+            hits, total = totals.get(label["cache"], (0, 0))
+            totals[label["cache"]] = (hits + (value if label["result"] == "hit" else 0), total + value)
+    for cache, (hits, total) in sorted(totals.items()):
+        yield "cache_hit_ratio", {"cache": cache}, round(hits / total, 4) if total else 0
+
+
+registry.add_collector(cache_ratios)
+
+
+# --- DB ---------------------------------------------------------------------
+
+_TABLE_RE = re.compile(r"\b(?:FROM|INTO|UPDATE|JOIN)\s+(\w+\.\w+)", re.IGNORECASE)
+
+
+def normalize_statement(sql) -> str:
+    """Low-cardinality label for a statement: first keyword + first schema-qualified table."""
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", "replace")
+    words = str(sql).split(None, 1)
+    verb = words[0].upper() if words else "?"
+    table = _TABLE_RE.search(str(sql))
+    return f"{verb} {table.group(1).lower()}" if table else verb
+
+
+class TimedCursorMixin:
+    def execute(self, query, vars=None):
+        with timed("db_query_duration_seconds", statement=normalize_statement(query), phase="execute"):
+            return super().execute(query, vars)
+
+    def _timed_fetch(self, fetch, *args):
+        started = time.perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            registry.observe(
+                "db_query_duration_seconds", time.perf_counter() - started,
+                statement=normalize_statement(self.query or ""), phase="fetch",
+            )
+
+    def fetchone(self):
+        return self._timed_fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._timed_fetch(super().fetchmany, size if size is not None else self.arraysize)
+
+    def fetchall(self):
+        return self._timed_fetch(super().fetchall)
+
+
+class TimedCursor(TimedCursorMixin, RealDictCursor):
+    pass
+
+
+class TimedTupleCursor(TimedCursorMixin, TupleCursor):
+    pass
+
+
+# --- HTTP middleware ------------------------------------------------------------
+
+class SlowRequestSampler:
+    """
+    Samples the stacks of all threads while requests are in flight and, for
+    requests slower than SLOW_REQUEST_SECONDS, reports the most frequent app
+    frames seen during the request window to `hook` (default: stderr).
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL, hook=None, max_samples=20_000):
+        self.interval = interval
+        self.hook = hook or print_profile
+        self.samples = []  # (zaman, yığın)
+        self.max_samples = max_samples
+        self.in_flight = 0
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            if not self.in_flight:
+                self.wakeup.wait()
+                self.wakeup.clear()
+                continue
+            now = time.monotonic()
+            for ident, frame in sys._current_frames().items():
+                if ident != me:
+                    stack = _app_stack(frame)
+                    if stack:
+                        with self.lock:
+                            self.samples.append((now, stack))
+            time.sleep(self.interval)
+
+    def start(self):
+        with self.lock:
+            self.in_flight += 1
+        self.wakeup.set()
+        return time.monotonic()
+
+    def finish(self, route, started, elapsed):
+        with self.lock:
+            self.in_flight -= 1
+            window = [s for t, s in self.samples if t >= started] if elapsed >= SLOW_REQUEST_SECONDS else []
+            if not self.in_flight:
+                # Uçuşta istek yoksa eski örneklere gerek kalmaz
+                self.samples = []
+            elif len(self.samples) > self.max_samples:
+                self.samples = self.samples[len(self.samples) // 2:]
+        if window:
+            self.hook(route, elapsed, Counter(window))
+
+
+def _app_stack(frame):
+    """Innermost-last 'file:function:line' frames that belong to app/."""
+    stack = []
+    for fs in traceback.extract_stack(frame):
+        if f"{os.sep}app{os.sep}" in fs.filename and not fs.filename.endswith("instrumentation.py"):
+            stack.append(f"{os.path.basename(fs.filename)}:{fs.name}:{fs.lineno}")
+    return tuple(stack)
+
+
+def print_profile(route, elapsed, stacks: Counter):
+    print(f"---- SLOW REQUEST {route} {elapsed:.2f}s ({sum(stacks.values())} samples) ----", file=sys.stderr)
+    for stack, count in stacks.most_common(5):
+        print(f"{count:>5}  {' > '.join(stack)}", file=sys.stderr)
+
+
+class InstrumentationMiddleware:
+    """
+    Records latency, response size and slow requests per route template.
+    known_paths: (method, path) pairs answered before routing (admission 429/503),
+    recorded under their path instead of "unmatched".
+    """
+
+    def __init__(self, app, sampler=None, known_paths=()):
+        self.app = app
+        self.known_paths = set(known_paths)
+        self.sampler = sampler if sampler is not None else (SlowRequestSampler() if SLOW_REQUEST_PROFILE else None)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        sampled_at = self.sampler.start() if self.sampler else None
+        status, size = 500, 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            # Yönlendirici eşleşen route'u scope'a yazar; şablon yolu kardinaliteyi sınırlar
+            route = getattr(scope.get("route"), "path", None)
+            method = scope["method"]
+            if route is None:
+                route = scope["path"] if (method, scope["path"]) in self.known_paths else "unmatched"
+            registry.observe(
+                "http_request_duration_seconds", elapsed,
+                method=method, route=route, status=str(status),
+            )
+            registry.observe("http_response_size_bytes", size, buckets=SIZE_BUCKETS, method=method, route=route)
+            if elapsed >= SLOW_REQUEST_SECONDS:
+                registry.inc("slow_requests_total", method=method, route=route)
+            if self.sampler:
+                self.sampler.finish(f"{method} {route}", sampled_at, elapsed)
@@ -1,22 +1,45 @@
-from fastapi import FastAPI, Query, Request
+from fastapi import Body, FastAPI, Header, Query, Request, Response
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from psycopg2 import OperationalError
-from psycopg2.extras import RealDictCursor
 import json
 import requests
 from .db import get_connection
 from .es import get_es_client
-from .utils import success_response, error_response, parse_bbox, POI_LABELS
-from .rag import run_rag_pipeline
+from .utils import success_response, error_response, parse_bbox, cluster_level, CLUSTER_BASE_CELL, POI_LABELS
+from .formats import (
+    GEOJSON,
+    VARY_HEADERS,
+    DISTRICT_COLUMNS,
+    POI_COLUMNS,
+    GREEN_AREA_COLUMNS,
+    negotiate_format,
+    export_layer,
+)
+from .poi_index import get_poi_index, refresh_async, POI_INDEX_ENABLED
+from .area_metrics import area_geometry, area_metrics, bbox_polygon
+from .admission import AdmissionMiddleware, admission_metrics, build_limiters, remaining_seconds
+from .instrumentation import InstrumentationMiddleware, registry, timed
+from .rag import RAG_WARMUP, RagNotReady, rag_status, run_rag_pipeline, warm_up_async
+import asyncio
+import os
 import traceback
 import sys
+import time
+from starlette.concurrency import run_in_threadpool
 from .utils import get_secret
 
 app = FastAPI()
 
+# Pahalı endpoint'ler (RAG, directions, search) için eşzamanlılık/kuyruk sınırları;
+# CORS en dışta kalsın diye ondan önce eklenir (429/503 yanıtları da CORS başlığı alır)
+ADMISSION_LIMITERS = build_limiters()
+app.add_middleware(AdmissionMiddleware, limiters=ADMISSION_LIMITERS)
+# Ölçüm admission'ı sarar: kuyrukta bekleme ve 429/503 yanıtları da gecikmeye dahil
+app.add_middleware(InstrumentationMiddleware, known_paths=ADMISSION_LIMITERS)
+registry.add_collector(lambda: admission_metrics(ADMISSION_LIMITERS))
 
 origins = [
     "http://localhost:3000",
@@ -124,12 +147,93 @@ async def general_exception_handler(request: Request, exc: Exception):
     )
 
 
+@app.on_event("startup")
+def load_poi_index():
+    # Index arka planda yüklenir; hazır olana kadar istekler PostGIS'e gider
+    if POI_INDEX_ENABLED:
+        refresh_async()
+
+
+@app.on_event("startup")
+def warm_up_rag():
+    # Modeller arka planda yüklenir; coğrafi endpoint'ler beklemeden hizmet verir
+    if RAG_WARMUP:
+        warm_up_async()
+
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
+# Erişilemeyen bir bağımlılık probe'u orkestratörün zaman aşımını geçecek kadar bekletmesin
+READY_TIMEOUT_SECONDS = float(os.getenv("READY_TIMEOUT_SECONDS", "3"))
+
+async def check_component(check):
+    # Kontroller bloklayan I/O yapar: threadpool'da ve süre sınırıyla çalışır
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(run_in_threadpool(check), READY_TIMEOUT_SECONDS)
+        status = {"ready": True}
+    except asyncio.TimeoutError:
+        status = {"ready": False, "error": f"timed out after {READY_TIMEOUT_SECONDS:g}s"}
+    except Exception as e:
+        status = {"ready": False, "error": str(e)}
+    status["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return status
+
+def check_db():
+    # libpq connect_timeout tam saniye ve en az 2; sorgu da aynı süreyle sınırlı
+    timeout = max(2, int(READY_TIMEOUT_SECONDS))
+    conn = get_connection(connect_timeout=timeout, options=f"-c statement_timeout={timeout * 1000}")
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT 1;")
+        cur.close()
+    finally:
+        conn.close()
+
+def check_es():
+    if not get_es_client().options(request_timeout=2).ping():
+        raise ConnectionError("Elasticsearch ping failed")
+
+@app.get("/internal/stats")
+def internal_stats(authorization: str | None = Header(default=None)):
+    # INTERNAL_STATS_TOKEN ayarlıysa Prometheus scrape'i "Bearer <token>" göndermeli
+    token = get_secret("INTERNAL_STATS_TOKEN")
+    if token and authorization != f"Bearer {token}":
+        return JSONResponse(status_code=403, content=error_response(message="Forbidden", code=403))
+    return Response(content=registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/ready")
+async def ready(response: Response):
+    # /health süreç ayakta mı, /ready bağımlılıklar hazır mı sorusunu yanıtlar
+    db, es = await asyncio.gather(check_component(check_db), check_component(check_es))
+    components = {"db": db, "es": es, "rag": rag_status()}
+    if POI_INDEX_ENABLED:
+        index = get_poi_index(count=False)
+        components["poi_index"] = {"ready": index is not None, "size": index.size if index else 0}
+
+    # Harita endpoint'leri yalnızca DB'ye bağlı; arama ve RAG ayrı raporlanır
+    is_ready = components["db"]["ready"]
+    if not is_ready:
+        response.status_code = 503
+    return {"status": "ready" if is_ready else "not_ready", "components": components}
+
 @app.get("/districts")
-def get_districts():
+def get_districts(
+    response: Response,
+    fmt: str | None = Query(default=None, alias="format"),
+    accept: str | None = Header(default=None),
+):
+    output = negotiate_format(fmt, accept)
+    if output != GEOJSON:
+        return export_layer(
+            output, DISTRICT_COLUMNS, "city.districts", (), ["MultiPolygon"], "districts",
+            empty_message="No districts found",
+        )
+
+    response.headers.update(VARY_HEADERS)
+
     conn = get_connection()
     cur = conn.cursor()
     cur.execute("""
@@ -143,18 +247,20 @@ def get_districts():
     cur.close()
     conn.close()
 
-    features = []
-    for row in rows:
-        features.append({
+    return success_response({"type": "FeatureCollection", "features": district_features(rows)})
+
+def district_features(rows):
+    return [
+        {
             "type": "Feature",
             "geometry": json.loads(row['geometry']),
             "properties": {
                 "district_id": row['district_id'],
                 "district_name": row['district_name']
             }
-        })
-
-    return success_response({"type": "FeatureCollection", "features": features})
+        }
+        for row in rows
+    ]
 
 @app.get("/metrics")
 def get_district_metrics(district: str | None = Query(default=None, min_length=3, max_length=50)):
@@ -222,49 +328,100 @@ def get_district_metrics(district: str | None = Query(default=None, min_length=3
 
     return success_response({"districts": rows})
 
-@app.get("/poi")
-def get_pois(poi_type: str, bbox: str | None = None):
+def area_metrics_response(geometry):
     conn = get_connection()
     cur = conn.cursor()
+    result = area_metrics(cur, geometry)
+    cur.close()
+    conn.close()
+    return success_response(result)
 
-    if bbox:
-        minx, miny, maxx, maxy = parse_bbox(bbox)
-        cur.execute("""
-            SELECT 
-                poi_id,
-                name,
-                poi_type,
-                subtype,
-                district_name,
-                address_text,
-                ST_AsGeoJSON(geom) AS geometry
-            FROM city.pois
-            WHERE LOWER(poi_type) = LOWER(%s)
-              AND geom && ST_MakeEnvelope(%s, %s, %s, %s, 4326);
-        """, (poi_type, minx, miny, maxx, maxy))
+@app.get("/metrics/area")
+def get_area_metrics(bbox: str):
+    return area_metrics_response(bbox_polygon(*parse_bbox(bbox)))
+
+@app.post("/metrics/area")
+def post_area_metrics(payload: dict = Body(...)):
+    # Gövde: GeoJSON Polygon/MultiPolygon ya da bunlardan birini taşıyan Feature
+    return area_metrics_response(area_geometry(payload))
+
+@app.get("/poi")
+def get_pois(
+    response: Response,
+    poi_type: str,
+    bbox: str | None = None,
+    fmt: str | None = Query(default=None, alias="format"),
+    accept: str | None = Header(default=None),
+):
+    output = negotiate_format(fmt, accept)
+    if output != GEOJSON:
+        where = "WHERE LOWER(poi_type) = LOWER(%s)"
+        params = (poi_type,)
+        if bbox:
+            where += " AND geom && ST_MakeEnvelope(%s, %s, %s, %s, 4326)"
+            params += parse_bbox(bbox)
+        return export_layer(
+            output, POI_COLUMNS, f"city.pois {where}", params, ["Point"], "pois",
+            empty_message=f"No POIs found for type='{poi_type}'",
+        )
+
+    response.headers.update(VARY_HEADERS)
+    index = get_poi_index()
+    if index is not None:
+        # Bellek içi index: bağlantı ve SQL turu yok
+        rows = index.bbox(*parse_bbox(bbox), poi_type=poi_type) if bbox else index.all(poi_type)
+        for row in rows:
+            row["geometry"] = {"type": "Point", "coordinates": [row["lon"], row["lat"]]}
     else:
-        cur.execute("""
-            SELECT 
-                poi_id,
-                name,
-                poi_type,
-                subtype,
-                district_name,
-                address_text,
-                ST_AsGeoJSON(geom) AS geometry
-            FROM city.pois
-            WHERE LOWER(poi_type) = LOWER(%s);
-        """, (poi_type,))
+        conn = get_connection()
+        cur = conn.cursor()
+
+        if bbox:
+            minx, miny, maxx, maxy = parse_bbox(bbox)
+            cur.execute("""
+                SELECT 
+                    poi_id,
+                    name,
+                    poi_type,
+                    subtype,
+                    district_name,
+                    address_text,
+                    ST_AsGeoJSON(geom) AS geometry
+                FROM city.pois
+                WHERE LOWER(poi_type) = LOWER(%s)
+                  AND geom && ST_MakeEnvelope(%s, %s, %s, %s, 4326);
+            """, (poi_type, minx, miny, maxx, maxy))
+        else:
+            cur.execute("""
+                SELECT 
+                    poi_id,
+                    name,
+                    poi_type,
+                    subtype,
+                    district_name,
+                    address_text,
+                    ST_AsGeoJSON(geom) AS geometry
+                FROM city.pois
+                WHERE LOWER(poi_type) = LOWER(%s);
+            """, (poi_type,))
+
+        rows = cur.fetchall()
+        cur.close()
+        conn.close()
+        for row in rows:
+            row["geometry"] = json.loads(row["geometry"])
+
+    features = poi_features(rows)
+    if not features:
+        return error_response(message=f"No POIs found for type='{poi_type}'", code=404)
 
-    rows = cur.fetchall()
-    cur.close()
-    conn.close()
+    return success_response({"type": "FeatureCollection", "features": features})
 
-    features = []
-    for row in rows:
-        features.append({
+def poi_features(rows):
+    return [
+        {
             "type": "Feature",
-            "geometry": json.loads(row["geometry"]),
+            "geometry": row["geometry"],
             "properties": {
                 "poi_id": row["poi_id"],
                 "name": row["name"],
@@ -273,47 +430,64 @@ def get_pois(poi_type: str, bbox: str | None = None):
                 "district_name": row["district_name"],
                 "address": row["address_text"]
             }
-        })
-
-    if not features:
-        return error_response(message=f"No POIs found for type='{poi_type}'", code=404)
+        }
+        for row in rows
+    ]
 
-    return success_response({"type": "FeatureCollection", "features": features})
+@app.get("/poi/clusters")
+def get_poi_clusters(bbox: str, zoom: float, poi_type: str | None = None):
+    minx, miny, maxx, maxy = parse_bbox(bbox)
+    level = cluster_level(zoom)
+    size = CLUSTER_BASE_CELL * 2 ** level
 
-@app.get("/poi/nearby")
-def get_pois_nearby(lon: float, lat: float, r: int = 500, poi_type: str | None = None):
     conn = get_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur = conn.cursor()
 
+    # Hücreler bbox'a göre grid aralığıyla seçilir; tipler aynı hücrede birleştirilir
     cur.execute("""
-        SELECT 
-            poi_id, name, poi_type, subtype, district_name, address_text,
-            ST_AsGeoJSON(geom) AS geometry,
-            ROUND(
-                ST_Distance(
-                    geom::geography,
-                    ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography
-                )::numeric
-            ) AS distance_m
-        FROM city.pois
-        WHERE ST_DWithin(
-            geom::geography,
-            ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography,
-            %s
-        )
-        AND (%s IS NULL OR LOWER(poi_type) = LOWER(%s))
-        ORDER BY distance_m
-        LIMIT 100;
-    """, (lon, lat, lon, lat, r, poi_type, poi_type))
+        SELECT
+            cell_x,
+            cell_y,
+            SUM(poi_count)::int AS point_count,
+            jsonb_object_agg(poi_type, poi_count) AS types,
+            SUM(lon * poi_count) / SUM(poi_count) AS lon,
+            SUM(lat * poi_count) / SUM(poi_count) AS lat,
+            MIN(min_lon) AS min_lon,
+            MIN(min_lat) AS min_lat,
+            MAX(max_lon) AS max_lon,
+            MAX(max_lat) AS max_lat
+        FROM city.poi_clusters
+        WHERE level = %s
+          AND cell_x BETWEEN floor(%s / %s) AND floor(%s / %s)
+          AND cell_y BETWEEN floor(%s / %s) AND floor(%s / %s)
+          AND (%s IS NULL OR LOWER(poi_type) = LOWER(%s))
+        GROUP BY cell_x, cell_y;
+    """, (level, minx, size, maxx, size, miny, size, maxy, size, poi_type, poi_type))
 
     rows = cur.fetchall()
     cur.close()
     conn.close()
 
-    features = [
+    features = []
+    for row in rows:
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [row["lon"], row["lat"]]},
+            "properties": {
+                "cluster_id": f"{level}:{row['cell_x']}:{row['cell_y']}",
+                "point_count": row["point_count"],
+                "types": row["types"],
+                "bbox": [row["min_lon"], row["min_lat"], row["max_lon"], row["max_lat"]],
+            }
+        })
+
+    return success_response({"type": "FeatureCollection", "level": level, "features": features})
+
+def nearby_features(rows):
+    return [
         {
             "type": "Feature",
-            "geometry": json.loads(r["geometry"]),
+            "geometry": {"type": "Point", "coordinates": [r["lon"], r["lat"]]},
             "properties": {
                 "poi_id": r["poi_id"],
                 "name": r["name"],
@@ -328,12 +502,83 @@ def get_pois_nearby(lon: float, lat: float, r: int = 500, poi_type: str | None =
         for r in rows
     ]
 
-    return success_response({"type": "FeatureCollection", "features": features})
+
+@app.get("/poi/nearby")
+def get_pois_nearby(lon: float, lat: float, r: int = 500, poi_type: str | None = None):
+    index = get_poi_index()
+    if index is not None:
+        rows = index.radius(lon, lat, r, poi_type, limit=100)
+    else:
+        conn = get_connection()
+        cur = conn.cursor()
+
+        cur.execute("""
+            SELECT 
+                poi_id, name, poi_type, subtype, district_name, address_text,
+                ST_X(geom) AS lon,
+                ST_Y(geom) AS lat,
+                ROUND(
+                    ST_Distance(
+                        geom::geography,
+                        ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography
+                    )::numeric
+                ) AS distance_m
+            FROM city.pois
+            WHERE ST_DWithin(
+                geom::geography,
+                ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography,
+                %s
+            )
+            AND (%s IS NULL OR LOWER(poi_type) = LOWER(%s))
+            ORDER BY distance_m
+            LIMIT 100;
+        """, (lon, lat, lon, lat, r, poi_type, poi_type))
+
+        rows = cur.fetchall()
+        cur.close()
+        conn.close()
+
+    return success_response({"type": "FeatureCollection", "features": nearby_features(rows)})
+
+
+@app.get("/poi/nearest")
+def get_pois_nearest(lon: float, lat: float, k: int = Query(10, ge=1, le=100), poi_type: str | None = None):
+    index = get_poi_index()
+    if index is not None:
+        rows = index.nearest(lon, lat, k, poi_type)
+    else:
+        conn = get_connection()
+        cur = conn.cursor()
+
+        # KNN: GIST index üzerinde <-> ile aday sırası, mesafe geography ile
+        cur.execute("""
+            SELECT
+                poi_id, name, poi_type, subtype, district_name, address_text,
+                ST_X(geom) AS lon,
+                ST_Y(geom) AS lat,
+                ROUND(
+                    ST_Distance(
+                        geom::geography,
+                        ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography
+                    )::numeric
+                ) AS distance_m
+            FROM city.pois
+            WHERE (%s IS NULL OR LOWER(poi_type) = LOWER(%s))
+            ORDER BY geom <-> ST_SetSRID(ST_MakePoint(%s, %s), 4326)
+            LIMIT %s;
+        """, (lon, lat, poi_type, poi_type, lon, lat, k))
+
+        rows = cur.fetchall()
+        cur.close()
+        conn.close()
+
+    return success_response({"type": "FeatureCollection", "features": nearby_features(rows)})
 
 
 @app.get("/search")
 def search(q: str, size: int = 10, poi_type: str | None = None):
-    es = get_es_client()
+    # İsteğin kalan süresi (admission deadline) ES zaman aşımına aktarılır
+    es = get_es_client().options(request_timeout=remaining_seconds(10))
 
     # District araması
     district_body = {
@@ -347,7 +592,8 @@ def search(q: str, size: int = 10, poi_type: str | None = None):
         },
         "size": size
     }
-    district_res = es.search(index="districts", body=district_body)
+    with timed("upstream_request_duration_seconds", service="elasticsearch", operation="search_districts"):
+        district_res = es.search(index="districts", body=district_body)
     district_hits = district_res["hits"]["hits"]
 
     # POI araması
@@ -374,9 +620,13 @@ def search(q: str, size: int = 10, poi_type: str | None = None):
         "size": size
     }
 
-    poi_res = es.search(index="pois", body=poi_body)
+    with timed("upstream_request_duration_seconds", service="elasticsearch", operation="search_pois"):
+        poi_res = es.search(index="pois", body=poi_body)
     poi_hits = poi_res["hits"]["hits"]
 
+    return success_response({"results": merge_search_results(district_hits, poi_hits)})
+
+def merge_search_results(district_hits, poi_hits):
     results = []
 
     # District sonuçları
@@ -408,12 +658,30 @@ def search(q: str, size: int = 10, poi_type: str | None = None):
         })
 
     # Skorla sırala
-    results = sorted(results, key=lambda x: x["score"], reverse=True)
-
-    return success_response({"results": results})
+    return sorted(results, key=lambda x: x["score"], reverse=True)
 
 @app.get("/green_areas")
-def get_green_areas(bbox: str | None = None):
+def get_green_areas(
+    response: Response,
+    bbox: str | None = None,
+    fmt: str | None = Query(default=None, alias="format"),
+    accept: str | None = Header(default=None),
+):
+    output = negotiate_format(fmt, accept)
+    if output != GEOJSON:
+        # Toplu dışa aktarımda GeoJSON'daki "en büyük 70 alan" sınırı uygulanmaz
+        if bbox:
+            from_clause = "city.green_areas WHERE geom && ST_MakeEnvelope(%s, %s, %s, %s, 4326)"
+            params = parse_bbox(bbox)
+        else:
+            from_clause = "city.green_areas"
+            params = ()
+        return export_layer(
+            output, GREEN_AREA_COLUMNS, from_clause, params, ["MultiPolygon"], "green_areas",
+            empty_message="No green areas found",
+        )
+
+    response.headers.update(VARY_HEADERS)
     conn = get_connection()
     cur = conn.cursor()
 
@@ -467,6 +735,83 @@ def get_green_areas(bbox: str | None = None):
 
     return success_response({"type": "FeatureCollection", "features": features})
 
+@app.get("/accessibility")
+def get_accessibility(
+    district: str | None = Query(default=None, min_length=3, max_length=50),
+    poi_type: str | None = None,
+):
+    conn = get_connection()
+    cur = conn.cursor()
+
+    cur.execute("""
+        SELECT
+            district_id,
+            district_name,
+            poi_type,
+            cells,
+            median_dist_m,
+            p90_dist_m,
+            share_within_500m,
+            share_within_1000m,
+            population_within_500m,
+            population_within_1000m
+        FROM city.district_accessibility
+        WHERE (%s IS NULL OR LOWER(district_name) = LOWER(%s))
+          AND (%s IS NULL OR LOWER(poi_type) = LOWER(%s))
+        ORDER BY district_name, poi_type;
+    """, (district, district, poi_type, poi_type))
+
+    rows = cur.fetchall()
+    cur.close()
+    conn.close()
+
+    if (district or poi_type) and not rows:
+        return error_response(message="No accessibility data found", code=404)
+
+    for row in rows:
+        row["poi_type_label"] = POI_LABELS.get(row["poi_type"], row["poi_type"])
+
+    return success_response({"accessibility": rows})
+
+@app.get("/accessibility/grid")
+def get_accessibility_grid(poi_type: str, bbox: str | None = None):
+    conn = get_connection()
+    cur = conn.cursor()
+
+    # Isı haritası katmanı: hücre merkezleri ve en yakın POI mesafesi
+    if bbox:
+        minx, miny, maxx, maxy = parse_bbox(bbox)
+        cur.execute("""
+            SELECT district_id, dist_m, ST_X(geom) AS lon, ST_Y(geom) AS lat
+            FROM city.accessibility_grid
+            WHERE LOWER(poi_type) = LOWER(%s)
+              AND geom && ST_MakeEnvelope(%s, %s, %s, %s, 4326);
+        """, (poi_type, minx, miny, maxx, maxy))
+    else:
+        cur.execute("""
+            SELECT district_id, dist_m, ST_X(geom) AS lon, ST_Y(geom) AS lat
+            FROM city.accessibility_grid
+            WHERE LOWER(poi_type) = LOWER(%s);
+        """, (poi_type,))
+
+    rows = cur.fetchall()
+    cur.close()
+    conn.close()
+
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [r["lon"], r["lat"]]},
+            "properties": {"district_id": r["district_id"], "dist_m": r["dist_m"]},
+        }
+        for r in rows
+    ]
+
+    if not features:
+        return error_response(message=f"No accessibility grid for type='{poi_type}'", code=404)
+
+    return success_response({"type": "FeatureCollection", "features": features})
+
 
 @app.post("/directions")
 def get_directions(payload: DirectionsRequest):
@@ -491,19 +836,20 @@ def get_directions(payload: DirectionsRequest):
     ]
 
     try:
-        response = requests.post(
-            f"https://api.openrouteservice.org/v2/directions/{profile}",
-            headers={
-                "Authorization": ors_key,
-                "Content-Type": "application/json",
-            },
-            json={
-                "coordinates": coordinates,
-                "format": "geojson",
-                "instructions": False,
-            },
-            timeout=20,
-        )
+        with timed("upstream_request_duration_seconds", service="ors", operation="directions"):
+            response = requests.post(
+                f"https://api.openrouteservice.org/v2/directions/{profile}",
+                headers={
+                    "Authorization": ors_key,
+                    "Content-Type": "application/json",
+                },
+                json={
+                    "coordinates": coordinates,
+                    "format": "geojson",
+                    "instructions": False,
+                },
+                timeout=remaining_seconds(20),
+            )
     except requests.RequestException:
         return JSONResponse(
             status_code=502,
@@ -596,4 +942,11 @@ class RAGRequest(BaseModel):
 
 @app.post("/rag/query")
 def rag_query(req: RAGRequest):
-    return run_rag_pipeline(req.question, req.top_k)
+    try:
+        return run_rag_pipeline(req.question, req.top_k, timeout=remaining_seconds(30))
+    except RagNotReady as e:
+        return JSONResponse(
+            status_code=503,
+            content=error_response(message=f"RAG models are not ready ({e})", code=503),
+            headers={"Retry-After": "10"},
+        )
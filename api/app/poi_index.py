@@ -0,0 +1,257 @@
+import math
+import os
+import threading
+import time
+
+import numpy as np
+from psycopg2.extensions import cursor as TupleCursor
+
+from .db import get_connection
+from .instrumentation import count_cache
+
+# POI_INDEX=1 ile açılır; kapalıyken /poi ve /poi/nearby PostGIS'e gider
+POI_INDEX_ENABLED = os.getenv("POI_INDEX", "").lower() in ("1", "true", "yes")
+# city.data_version en fazla bu sıklıkta kontrol edilir
+VERSION_CHECK_SECONDS = float(os.getenv("POI_INDEX_CHECK_SECONDS", "30"))
+
+CELL = 0.01  # derece; ingest tarafındaki grid ile aynı
+EARTH_RADIUS_M = 6_371_008.8
+# Aday kutusu haversine ile aynı küreden türetilir (~111 195 m/derece)
+METERS_PER_DEG = math.radians(EARTH_RADIUS_M)
+# Kutu kenarında düzlem yaklaşımı ve float yuvarlaması için göreli pay
+BOX_PAD = 1e-5
+
+
+def haversine_m(lon, lat, lons, lats):
+    """Great-circle distance in meters from one point to arrays of points."""
+    lon1, lat1 = math.radians(lon), math.radians(lat)
+    lon2, lat2 = np.radians(lons), np.radians(lats)
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+def degree_span(lat, r):
+    """
+    (dlon, dlat) half-widths in degrees of a box containing every point within
+    r meters of latitude `lat`; longitude is scaled at the box's poleward edge.
+    """
+    dlat = r / METERS_PER_DEG * (1 + BOX_PAD)
+    poleward = min(abs(lat) + dlat, 90.0)
+    dlon = r / (METERS_PER_DEG * max(math.cos(math.radians(poleward)), 1e-6)) * (1 + BOX_PAD)
+    return dlon, dlat
+
+
+class PoiIndex:
+    """
+    Struct-of-arrays POI store with a uniform grid index.
+
+    Coordinates live in float64 arrays sorted by grid cell, so every cell is a
+    contiguous slice found with a binary search over the sorted cell keys.
+    poi_type and district names are interned into small integer codes.
+    """
+
+    def __init__(self, rows, version=0):
+        rows = sorted(rows, key=lambda r: self._cell_key(r[7], r[6]))
+        self.version = version
+        self.size = len(rows)
+
+        self.poi_id = [r[0] for r in rows]
+        self.name = [r[1] for r in rows]
+        self.subtype = [r[3] for r in rows]
+        self.address_text = [r[5] for r in rows]
+        self.lon = np.array([r[6] for r in rows], dtype=np.float64)
+        self.lat = np.array([r[7] for r in rows], dtype=np.float64)
+
+        self.types, type_codes = self._intern([r[2] for r in rows])
+        self.districts, district_codes = self._intern([r[4] for r in rows])
+        self.type_code = np.array(type_codes, dtype=np.int16)
+        self.district_code = np.array(district_codes, dtype=np.int16)
+        self._type_lookup = {t.lower(): i for i, t in enumerate(self.types) if t is not None}
+
+        keys = np.array([self._cell_key(la, lo) for la, lo in zip(self.lat, self.lon)], dtype=np.int64)
+        self.cell_keys, self.cell_start = np.unique(keys, return_index=True)
+        self.cell_end = np.append(self.cell_start[1:], self.size)
+
+    @staticmethod
+    def _cell_key(lat, lon):
+        return math.floor(lon / CELL) * 100_000 + math.floor(lat / CELL)
+
+    @staticmethod
+    def _intern(values):
+        table, codes = {}, []
+        for v in values:
+            codes.append(table.setdefault(v, len(table)))
+        return list(table), codes
+
+    def _type_filter(self, poi_type):
+        """Returns None (no filter), -1 (unknown type) or the type code."""
+        if poi_type is None:
+            return None
+        return self._type_lookup.get(poi_type.lower(), -1)
+
+    def _candidates(self, minx, miny, maxx, maxy):
+        """Indices of POIs in the grid cells overlapping the box (a superset of the box)."""
+        x0, x1 = math.floor(minx / CELL), math.floor(maxx / CELL)
+        y0, y1 = math.floor(miny / CELL), math.floor(maxy / CELL)
+        parts = []
+        for cx in range(x0, x1 + 1):
+            # Aynı sütundaki hücreler anahtar sırasında ardışık
+            lo = np.searchsorted(self.cell_keys, cx * 100_000 + y0)
+            hi = np.searchsorted(self.cell_keys, cx * 100_000 + y1, side="right")
+            if lo < hi:
+                parts.append(np.arange(self.cell_start[lo], self.cell_end[hi - 1]))
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(parts)
+
+    def _select(self, idx, code):
+        if code is None:
+            return idx
+        return idx[self.type_code[idx] == code]
+
+    def bbox(self, minx, miny, maxx, maxy, poi_type=None):
+        code = self._type_filter(poi_type)
+        if code == -1:
+            return []
+        if (maxx - minx) * (maxy - miny) > 1.0:
+            # Çok büyük kutu: hücre taramak yerine tüm dizi üzerinde maske
+            idx = np.arange(self.size)
+        else:
+            idx = self._candidates(minx, miny, maxx, maxy)
+        idx = self._select(idx, code)
+        lon, lat = self.lon[idx], self.lat[idx]
+        idx = idx[(lon >= minx) & (lon <= maxx) & (lat >= miny) & (lat <= maxy)]
+        return [self.row(i) for i in idx]
+
+    def all(self, poi_type=None):
+        code = self._type_filter(poi_type)
+        if code == -1:
+            return []
+        idx = self._select(np.arange(self.size), code)
+        return [self.row(i) for i in idx]
+
+    def radius(self, lon, lat, r, poi_type=None, limit=100):
+        code = self._type_filter(poi_type)
+        if code == -1:
+            return []
+        dlon, dlat = degree_span(lat, r)
+        idx = self._select(self._candidates(lon - dlon, lat - dlat, lon + dlon, lat + dlat), code)
+        dist = haversine_m(lon, lat, self.lon[idx], self.lat[idx])
+        keep = dist <= r
+        idx, dist = idx[keep], dist[keep]
+        order = np.argsort(dist, kind="stable")[:limit]
+        return [self.row(idx[i], dist[i]) for i in order]
+
+    def nearest(self, lon, lat, k=10, poi_type=None, max_rings=64):
+        """k nearest POIs: grows a ring of cells until the k-th hit is closer than the ring."""
+        code = self._type_filter(poi_type)
+        if code == -1 or self.size == 0:
+            return []
+        for ring in range(max_rings + 1):
+            half = (ring + 1) * CELL
+            idx = self._select(self._candidates(lon - half, lat - half, lon + half, lat + half), code)
+            if len(idx) >= k or ring == max_rings:
+                dist = haversine_m(lon, lat, self.lon[idx], self.lat[idx])
+                order = np.argsort(dist, kind="stable")[:k]
+                # Halka içindeki garanti yarıçapı: kenara en az ring hücre; boylam
+                # kutunun kutba yakın kenarındaki enlemde ölçülür
+                poleward = min(abs(lat) + half, 90.0)
+                covered_m = ring * CELL * METERS_PER_DEG * math.cos(math.radians(poleward)) / (1 + BOX_PAD)
+                if ring == max_rings or (len(order) and dist[order[-1]] <= covered_m):
+                    return [self.row(idx[i], dist[i]) for i in order]
+        return []
+
+    def row(self, i, distance=None):
+        row = {
+            "poi_id": self.poi_id[i],
+            "name": self.name[i],
+            "poi_type": self.types[self.type_code[i]],
+            "subtype": self.subtype[i],
+            "district_name": self.districts[self.district_code[i]],
+            "address_text": self.address_text[i],
+            "lon": float(self.lon[i]),
+            "lat": float(self.lat[i]),
+        }
+        if distance is not None:
+            row["distance_m"] = round(float(distance))
+        return row
+
+
+def data_version(cur) -> int:
+    try:
+        cur.execute("SELECT version FROM city.data_version;")
+        row = cur.fetchone()
+        return row[0] if row else 0
+    except Exception:
+        # Eski şemada data_version tablosu yok
+        cur.connection.rollback()
+        return 0
+
+
+def load_index() -> PoiIndex:
+    conn = get_connection()
+    try:
+        cur = conn.cursor(cursor_factory=TupleCursor)
+        version = data_version(cur)
+        cur.execute("""
+            SELECT poi_id, name, poi_type, subtype, district_name, address_text,
+                   ST_X(geom), ST_Y(geom)
+            FROM city.pois
+            WHERE geom IS NOT NULL;
+        """)
+        rows = cur.fetchall()
+        cur.close()
+    finally:
+        conn.close()
+    return PoiIndex(rows, version)
+
+
+_index: PoiIndex | None = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _refresh():
+    global _index
+    try:
+        conn = get_connection()
+        try:
+            cur = conn.cursor(cursor_factory=TupleCursor)
+            version = data_version(cur)
+            cur.close()
+        finally:
+            conn.close()
+        if _index is None or version != _index.version:
+            # Yeni index tamamen kurulduktan sonra tek atamayla devreye girer
+            _index = load_index()
+            print(f"POI index loaded: {_index.size} POIs (data version {_index.version})")
+    except Exception as e:
+        print("POI index refresh failed:", e)
+    finally:
+        _lock.release()
+
+
+def refresh_async():
+    """Starts a background reload unless one is already running."""
+    global _checked_at
+    if _lock.acquire(blocking=False):
+        _checked_at = time.monotonic()
+        threading.Thread(target=_refresh, daemon=True).start()
+
+
+def get_poi_index(count: bool = True) -> PoiIndex | None:
+    """
+    Returns the current in-memory index, or None when it is disabled or not
+    loaded yet (callers fall back to PostGIS). Schedules a version check at most
+    every VERSION_CHECK_SECONDS.
+    """
+    if not POI_INDEX_ENABLED:
+        return None
+    if _index is None or time.monotonic() - _checked_at > VERSION_CHECK_SECONDS:
+        refresh_async()
+    if count:
+        count_cache("poi_index", _index is not None)
+    return _index
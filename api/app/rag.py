@@ -1,16 +1,90 @@
 import math
-import faiss
-import pandas as pd
+import os
+import threading
+import time
 from collections import defaultdict
-from sentence_transformers import SentenceTransformer, CrossEncoder
 import requests
 from .utils import get_secret
+from .instrumentation import timed
+
+# torch/sentence-transformers/faiss burada import edilmez: API açılışını bekletmemek
+# için modeller ilk kullanımda ya da arka plandaki warm-up ile yüklenir
+EMBEDDING_MODEL = "intfloat/multilingual-e5-base"
+RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+INDEX_PATH = "data/rag_knowledge.index"
+METADATA_PATH = "data/rag_knowledge_metadata.parquet"
+# RAG_WARMUP=0 ile açılışta yükleme yapılmaz, ilk /rag/query tetikler
+RAG_WARMUP = os.getenv("RAG_WARMUP", "1").lower() in ("1", "true", "yes")
+
+
+class RagNotReady(Exception):
+    """Raised while the models are still loading (or failed to load)."""
+
+
+class RagComponents:
+    def __init__(self):
+        timings = {}
+
+        started = time.perf_counter()
+        import faiss
+        import pandas as pd
+        from sentence_transformers import SentenceTransformer, CrossEncoder
+        timings["imports"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        self.model = SentenceTransformer(EMBEDDING_MODEL)
+        self.reranker = CrossEncoder(RERANKER_MODEL)
+        timings["models"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        self.index = faiss.read_index(INDEX_PATH)
+        self.metadata = pd.read_parquet(METADATA_PATH)
+        timings["index"] = time.perf_counter() - started
+
+        self.timings = {k: round(v, 2) for k, v in timings.items()}
+
+
+_components: RagComponents | None = None
+_error: str | None = None
+_lock = threading.Lock()
+
+
+def _load():
+    global _components, _error
+    try:
+        _error = None
+        _components = RagComponents()
+        print(f"RAG components loaded: {_components.timings}")
+    except Exception as e:
+        _error = str(e)
+        print("RAG warm-up failed:", e)
+    finally:
+        _lock.release()
+
+
+def warm_up_async():
+    """Starts loading the models in a background thread unless loaded or loading."""
+    if _components is None and _lock.acquire(blocking=False):
+        threading.Thread(target=_load, daemon=True).start()
+
+
+def rag_status() -> dict:
+    if _components is not None:
+        return {"ready": True, "status": "ready", "load_seconds": _components.timings}
+    if _lock.locked():
+        return {"ready": False, "status": "loading"}
+    if _error is not None:
+        return {"ready": False, "status": "failed", "error": _error}
+    return {"ready": False, "status": "idle"}
+
+
+def get_components() -> RagComponents:
+    """Returns the loaded components; otherwise starts the warm-up and raises RagNotReady."""
+    if _components is None:
+        warm_up_async()
+        raise RagNotReady(rag_status()["status"])
+    return _components
 
-# Modeller ve index global load
-model = SentenceTransformer("intfloat/multilingual-e5-base")
-reranker = CrossEncoder("cross-encoder/ms-marco-MiniLM-L-6-v2")
-index = faiss.read_index("data/rag_knowledge.index")
-metadata = pd.read_parquet("data/rag_knowledge_metadata.parquet")
 
 GEMINI_API_KEY = get_secret("GEMINI_KEY")
 
@@ -28,13 +102,17 @@ def diversify_snippets(ranked_snippets, top_k=15, max_per_metric=2):
     return unique_snippets[:top_k]
 
 
-def run_rag_pipeline(question: str, top_k: int = 15):
+def run_rag_pipeline(question: str, top_k: int = 15, timeout: float = 30):
+    rag = get_components()
+
     # 1. Encode query
-    q_emb = model.encode([question]).astype("float32")
+    with timed("rag_stage_duration_seconds", stage="encode"):
+        q_emb = rag.model.encode([question]).astype("float32")
 
     # 2. FAISS search
-    D, I = index.search(q_emb, 30)
-    snippets = metadata.iloc[I[0]].to_dict(orient="records")
+    with timed("rag_stage_duration_seconds", stage="search"):
+        D, I = rag.index.search(q_emb, 30)
+    snippets = rag.metadata.iloc[I[0]].to_dict(orient="records")
 
     # NaN temizleme
     for s in snippets:
@@ -44,7 +122,8 @@ def run_rag_pipeline(question: str, top_k: int = 15):
 
     # Re-ranking
     pairs = [(question, s["text"]) for s in snippets]
-    scores = reranker.predict(pairs)
+    with timed("rag_stage_duration_seconds", stage="rerank"):
+        scores = rag.reranker.predict(pairs)
     ranked = sorted(zip(snippets, scores), key=lambda x: x[1], reverse=True)
 
     # Threshold + diversify
@@ -81,7 +160,8 @@ def run_rag_pipeline(question: str, top_k: int = 15):
     headers = {"Content-Type": "application/json"}
     params = {"key": GEMINI_API_KEY}
     body = {"contents": [{"parts": [{"text": prompt}]}]}
-    resp = requests.post(GEMINI_URL, headers=headers, params=params, json=body)
+    with timed("rag_stage_duration_seconds", stage="generate"):
+        resp = requests.post(GEMINI_URL, headers=headers, params=params, json=body, timeout=timeout)
     data = resp.json()
 
     if "candidates" in data:
@@ -1,5 +1,6 @@
 from fastapi import HTTPException
 from pathlib import Path
+import math
 import os
 
 def success_response(data, message = "ok", code = 200):
@@ -30,6 +31,18 @@ def parse_bbox(bbox: str):
         raise HTTPException(status_code=400, detail="bbox must satisfy minx<maxx and miny<maxy")
     return minx, miny, maxx, maxy
 
+# city.poi_clusters seviyeleri: hücre boyu CLUSTER_BASE_CELL * 2^level derece
+CLUSTER_BASE_CELL = 0.01
+CLUSTER_MAX_LEVEL = 5
+CLUSTER_MIN_ZOOM = 12  # bu zoom ve üstünde tekil POI'ler gösterilir
+CLUSTER_CELL_PX = 80
+
+def cluster_level(zoom: float) -> int:
+    """Picks the cluster grid level whose cells are roughly CLUSTER_CELL_PX wide at `zoom`."""
+    cell_deg = CLUSTER_CELL_PX * 360 / (256 * 2 ** zoom)
+    level = round(math.log2(cell_deg / CLUSTER_BASE_CELL))
+    return min(max(level, 0), CLUSTER_MAX_LEVEL)
+
 POI_LABELS = {
     "bus_stop": "Otobüs Durağı",
     "metro_station": "Metro İstasyonu",
@@ -0,0 +1,243 @@
+"""
+API'nin sıcak yollarının mikro benchmark'ı (DB/ES olmadan, sentetik veriyle).
+
+Girdiler scripts/generate_synthetic_data.py çıktısından okunur; yanıt gövdeleri
+FastAPI'nin yaptığı gibi jsonable_encoder + JSONResponse ile serileştirilir.
+
+    python scripts/generate_synthetic_data.py --scale small
+    cd api && python -m scripts.bench_hot_paths                     # tümü, data/bench/ altına kaydeder
+    cd api && python -m scripts.bench_hot_paths --only geojson --min-time 2
+    cd api && python -m scripts.bench_report ../data/bench/hot_paths-a.json ../data/bench/hot_paths-b.json
+"""
+import argparse
+import csv
+import gc
+import json
+import random
+import time
+import tracemalloc
+from pathlib import Path
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.main import decode_polyline, district_features, merge_search_results, nearby_features, poi_features
+from app.rag import diversify_snippets
+from app.utils import POI_LABELS, parse_bbox, success_response
+
+from .bench_report import latency_summary, print_table, run_metadata, save
+
+DEFAULT_DATA = Path(__file__).resolve().parents[2] / "data" / "synthetic" / "small"
+
+
+def encode_polyline(coordinates, precision: int = 5) -> str:
+    """Inverse of decode_polyline for [lon, lat] pairs (Google polyline format)."""
+    factor = 10 ** precision
+    out, prev_lat, prev_lon = [], 0, 0
+    for lon, lat in coordinates:
+        lat_i, lon_i = round(lat * factor), round(lon * factor)
+        for delta in (lat_i - prev_lat, lon_i - prev_lon):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                out.append(chr((0x20 | (value & 0x1F)) + 63))
+                value >>= 5
+            out.append(chr(value + 63))
+        prev_lat, prev_lon = lat_i, lon_i
+    return "".join(out)
+
+
+def render(payload) -> bytes:
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+# --- Girdiler ---------------------------------------------------------------------
+
+class Dataset:
+    def __init__(self, data_dir: Path, max_pois: int = 20_000, seed: int = 7):
+        if not (data_dir / "manifest.json").exists():
+            raise SystemExit(f"{data_dir} has no synthetic dataset; run scripts/generate_synthetic_data.py first")
+        csv.field_size_limit(1 << 30)
+        self.rng = random.Random(seed)
+        with open(data_dir / "districts.csv", encoding="utf-8") as f:
+            self.districts = list(csv.DictReader(f))
+        with open(data_dir / "pois.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            self.pois = [row for _, row in zip(range(max_pois), reader)]
+        for row in self.pois:
+            row["lon"], row["lat"] = float(row["lon"]), float(row["lat"])
+            row["subtype"] = row["subtype"] or None
+        self.docs = self._docs(data_dir / "rag_knowledge.parquet")
+
+    @staticmethod
+    def _docs(path: Path):
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path).to_pylist()
+
+    def route(self, points: int):
+        """Random walk with street-like steps (~20-60 m), as ORS returns."""
+        poi = self.rng.choice(self.pois)
+        lon, lat = poi["lon"], poi["lat"]
+        coords = []
+        for _ in range(points):
+            lon += self.rng.uniform(-0.0006, 0.0006)
+            lat += self.rng.uniform(-0.0004, 0.0004)
+            coords.append([round(lon, 5), round(lat, 5)])
+        return coords
+
+    def bbox(self):
+        poi = self.rng.choice(self.pois)
+        w, h = self.rng.uniform(0.005, 0.05), self.rng.uniform(0.004, 0.04)
+        return f"{poi['lon'] - w:.6f},{poi['lat'] - h:.6f},{poi['lon'] + w:.6f},{poi['lat'] + h:.6f}"
+
+    def poi_rows(self, n: int):
+        rows = []
+        for row in self.rng.sample(self.pois, min(n, len(self.pois))):
+            rows.append({**row, "geometry": {"type": "Point", "coordinates": [row["lon"], row["lat"]]}})
+        return rows
+
+    def nearby_rows(self, n: int):
+        rows = [dict(r) for r in self.rng.sample(self.pois, min(n, len(self.pois)))]
+        for i, row in enumerate(rows):
+            row["distance_m"] = 5 * i
+        return rows
+
+    def snippets(self, n: int = 30):
+        # FAISS top-30 + rerank sonrası: skora göre sıralı, aynı metrikten çok sayıda
+        docs = self.rng.sample(self.docs, min(n, len(self.docs)))
+        for rank, doc in enumerate(docs):
+            doc["score"] = 1 - rank / n
+        return docs
+
+    def search_hits(self, size: int = 10):
+        district_hits = [
+            {"_score": self.rng.uniform(1, 12), "_source": {
+                "district_id": int(d["district_id"]), "district_name": d["district_name"],
+                "bbox": [28.9, 41.0, 29.0, 41.1],
+            }}
+            for d in self.rng.sample(self.districts, min(size, len(self.districts)))
+        ]
+        poi_hits = [
+            {"_score": self.rng.uniform(1, 12), "_source": {
+                **{k: p[k] for k in ("poi_id", "name", "poi_type", "subtype", "district_name", "address_text", "lon", "lat")},
+                "poi_type_label": POI_LABELS.get(p["poi_type"]),
+            }}
+            for p in self.rng.sample(self.pois, size)
+        ]
+        return district_hits, poi_hits
+
+
+# --- Benchmark'lar -------------------------------------------------------------------
+# isim -> dataset'ten (fonksiyon, girdi listesi) kuran kurulum; her çağrı fn(*girdi)
+
+def _district_rows(ds):
+    return [
+        {"district_id": int(d["district_id"]), "district_name": d["district_name"], "geometry": d["geometry"]}
+        for d in ds.districts
+    ]
+
+
+BENCHMARKS = {
+    "decode_polyline/walk_300": lambda ds: (decode_polyline, [(encode_polyline(ds.route(300)),) for _ in range(20)]),
+    "decode_polyline/drive_3000": lambda ds: (decode_polyline, [(encode_polyline(ds.route(3000)),) for _ in range(5)]),
+    "parse_bbox": lambda ds: (parse_bbox, [(ds.bbox(),) for _ in range(1000)]),
+    "geojson/districts": lambda ds: (
+        lambda rows: render(success_response({"type": "FeatureCollection", "features": district_features(rows)})),
+        [(_district_rows(ds),)],
+    ),
+    "geojson/poi_bbox_2000": lambda ds: (
+        lambda rows: render(success_response({"type": "FeatureCollection", "features": poi_features(rows)})),
+        [(ds.poi_rows(2000),) for _ in range(3)],
+    ),
+    "geojson/poi_all_20000": lambda ds: (
+        lambda rows: render(success_response({"type": "FeatureCollection", "features": poi_features(rows)})),
+        [(ds.poi_rows(20_000),)],
+    ),
+    "geojson/nearby_100": lambda ds: (
+        lambda rows: render(success_response({"type": "FeatureCollection", "features": nearby_features(rows)})),
+        [(ds.nearby_rows(100),) for _ in range(10)],
+    ),
+    "diversify_snippets": lambda ds: (diversify_snippets, [(ds.snippets(),) for _ in range(50)]),
+    "search/merge": lambda ds: (merge_search_results, [ds.search_hits() for _ in range(50)]),
+    "search/merge_render": lambda ds: (
+        lambda d, p: render(success_response({"results": merge_search_results(d, p)})),
+        [ds.search_hits() for _ in range(50)],
+    ),
+}
+
+
+def measure(fn, inputs, min_time: float = 1.0, batch_time: float = 0.002) -> dict:
+    """
+    Calls fn over `inputs` in batches sized to take ~batch_time each, until
+    min_time has passed. Latency percentiles are over per-call batch means
+    (timer overhead stays negligible for microsecond calls).
+    """
+    for args in inputs:  # ısınma
+        fn(*args)
+
+    started = time.perf_counter()
+    n = 0
+    while time.perf_counter() - started < batch_time:
+        fn(*inputs[n % len(inputs)])
+        n += 1
+    batch = max(n, 1)
+
+    samples, calls, i = [], 0, 0
+    gc.collect()
+    total_started = time.perf_counter()
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(batch):
+            fn(*inputs[i])
+            i = (i + 1) % len(inputs)
+        samples.append((time.perf_counter() - t0) / batch)
+        calls += batch
+        if time.perf_counter() - total_started >= min_time and len(samples) >= 5:
+            break
+    elapsed = time.perf_counter() - total_started
+
+    # Tek çağrının tepe bellek ayak izi (ölçüm süresinin dışında)
+    gc.collect()
+    tracemalloc.start()
+    fn(*inputs[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "ops_per_s": round(calls / elapsed, 2),
+        **latency_summary(samples),
+        "calls": calls,
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run(data_dir: Path, only=None, min_time: float = 1.0) -> dict:
+    ds = Dataset(data_dir)
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if only and not any(o in name for o in only):
+            continue
+        fn, inputs = setup(ds)
+        results[name] = measure(fn, inputs, min_time)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the API hot paths")
+    parser.add_argument("--data", type=Path, default=DEFAULT_DATA, help="synthetic dataset directory")
+    parser.add_argument("--only", action="append", help="run benchmarks whose name contains this (repeatable)")
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds per benchmark")
+    parser.add_argument("--out", type=Path, help="result file (default data/bench/hot_paths-<git>-<time>.json)")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    results = run(args.data, args.only, args.min_time)
+    print_table(results)
+    if not args.no_save:
+        manifest = json.loads((args.data / "manifest.json").read_text())
+        meta = run_metadata(dataset=str(args.data), dataset_manifest=manifest, min_time=args.min_time)
+        print(f"saved {save('hot_paths', results, meta, args.out)}")
+
+
+if __name__ == "__main__":
+    main()
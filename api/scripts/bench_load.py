@@ -0,0 +1,276 @@
+"""
+Çalışan bir API'ye karşı uçtan uca yük senaryoları.
+
+Sorgular sentetik veri setinden üretilir (gerçek ilçe adları, POI konumları ve
+isimleri); API'nin arkasında aynı setle doldurulmuş PostGIS/ES olmalı (README:
+Benchmarks). Kapalı döngü (--concurrency işçi) ya da açık döngü (--rate istek/s,
+Poisson varışlar) çalışır; açık döngüde gecikme planlanan gönderim anından
+ölçülür, böylece sunucu yavaşladığında kuyrukta geçen süre gizlenmez.
+
+    cd api && python -m scripts.bench_load --scenario map --concurrency 32 --duration 30
+    cd api && python -m scripts.bench_load --scenario mixed --rate 200 --pid $(pgrep -f "uvicorn app.main")
+"""
+import argparse
+import asyncio
+import csv
+import json
+import random
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+from app.utils import POI_LABELS
+
+from .bench_report import latency_summary, print_table, run_metadata, save
+
+DEFAULT_DATA = Path(__file__).resolve().parents[2] / "data" / "synthetic" / "small"
+
+RAG_QUESTIONS = [
+    "{district} ilçesinin nüfusu nedir?",
+    "{district} ilçesinde kaç otobüs durağı var?",
+    "{district} ilçesinde kişi başına yeşil alan ne kadar?",
+    "{district} ile {other} ilçelerinin kira ortalamalarını karşılaştır.",
+]
+
+
+class Queries:
+    """Random, dataset-grounded requests: (label, method, path, params, json)."""
+
+    def __init__(self, data_dir: Path, seed: int = 11, sample: int = 50_000):
+        if not (data_dir / "manifest.json").exists():
+            raise SystemExit(f"{data_dir} has no synthetic dataset; run scripts/generate_synthetic_data.py first")
+        self.rng = random.Random(seed)
+        with open(data_dir / "district_metrics.csv", encoding="utf-8") as f:
+            self.districts = [row["district_name"] for row in csv.DictReader(f)]
+        with open(data_dir / "pois.csv", encoding="utf-8") as f:
+            rows = [row for _, row in zip(range(sample), csv.DictReader(f))]
+        self.points = [(float(r["lon"]), float(r["lat"])) for r in rows]
+        self.names = [r["name"] for r in rows]
+        self.types = list(POI_LABELS)
+
+    def _around(self, w_range=(0.005, 0.04)):
+        lon, lat = self.rng.choice(self.points)
+        w = self.rng.uniform(*w_range)
+        return lon - w, lat - w * 0.75, lon + w, lat + w * 0.75
+
+    def _bbox(self, w_range=(0.005, 0.04)):
+        return ",".join(f"{v:.6f}" for v in self._around(w_range))
+
+    def districts_layer(self):
+        return "/districts", "GET", "/districts", None, None
+
+    def poi_bbox(self):
+        return "/poi", "GET", "/poi", {"poi_type": self.rng.choice(self.types), "bbox": self._bbox()}, None
+
+    def poi_clusters(self):
+        params = {"bbox": self._bbox((0.1, 0.4)), "zoom": self.rng.choice([9, 10, 11])}
+        return "/poi/clusters", "GET", "/poi/clusters", params, None
+
+    def green_areas(self):
+        return "/green_areas", "GET", "/green_areas", {"bbox": self._bbox()}, None
+
+    def metrics(self):
+        return "/metrics", "GET", "/metrics", {"district": self.rng.choice(self.districts)}, None
+
+    def nearby(self):
+        lon, lat = self.rng.choice(self.points)
+        params = {"lon": lon, "lat": lat, "r": self.rng.choice([250, 500, 1000])}
+        if self.rng.random() < 0.5:
+            params["poi_type"] = self.rng.choice(self.types)
+        return "/poi/nearby", "GET", "/poi/nearby", params, None
+
+    def nearest(self):
+        lon, lat = self.rng.choice(self.points)
+        return "/poi/nearest", "GET", "/poi/nearest", {"lon": lon, "lat": lat, "k": 10}, None
+
+    def search(self):
+        text = self.rng.choice(self.districts) if self.rng.random() < 0.3 else self.rng.choice(self.names)
+        # Kullanıcılar genelde kelimenin başını yazar
+        return "/search", "GET", "/search", {"q": text[: self.rng.randint(3, len(text))]}, None
+
+    def area(self):
+        if self.rng.random() < 0.5:
+            return "/metrics/area", "GET", "/metrics/area", {"bbox": self._bbox((0.01, 0.05))}, None
+        minx, miny, maxx, maxy = self._around((0.01, 0.05))
+        ring = [[minx, miny], [maxx, miny], [(minx + maxx) / 2, maxy], [minx, miny]]
+        return "/metrics/area", "POST", "/metrics/area", None, {"type": "Polygon", "coordinates": [ring]}
+
+    def rag(self):
+        a, b = self.rng.sample(self.districts, 2)
+        question = self.rng.choice(RAG_QUESTIONS).format(district=a, other=b)
+        return "/rag/query", "POST", "/rag/query", None, {"question": question}
+
+
+# senaryo -> [(Queries metodu, ağırlık)]
+SCENARIOS = {
+    "map": [("districts_layer", 1), ("poi_bbox", 5), ("poi_clusters", 3), ("green_areas", 2), ("metrics", 1)],
+    "nearby": [("nearby", 3), ("nearest", 2)],
+    "search": [("search", 1)],
+    "area": [("area", 1)],
+    "rag": [("rag", 1)],
+    "mixed": [
+        ("districts_layer", 1), ("poi_bbox", 6), ("poi_clusters", 4), ("green_areas", 2), ("metrics", 1),
+        ("nearby", 3), ("nearest", 2), ("search", 3), ("area", 1),
+    ],
+}
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.bytes = defaultdict(int)
+
+    def add(self, label, status, seconds, size=0):
+        self.latencies[label].append(seconds)
+        self.statuses[label][str(status)] += 1
+        self.bytes[label] += size
+
+    def results(self, elapsed: float) -> dict:
+        out = {}
+        labels = sorted(self.latencies)
+        for label in labels + ["total"]:
+            if label == "total":
+                latencies = [v for lab in labels for v in self.latencies[lab]]
+                statuses = defaultdict(int)
+                for lab in labels:
+                    for status, count in self.statuses[lab].items():
+                        statuses[status] += count
+                size = sum(self.bytes.values())
+            else:
+                latencies, statuses, size = self.latencies[label], self.statuses[label], self.bytes[label]
+            errors = sum(c for s, c in statuses.items() if not s.startswith("2"))
+            out[label] = {
+                "ops_per_s": round(len(latencies) / elapsed, 2),
+                **latency_summary(latencies),
+                "error_rate": round(errors / len(latencies), 4) if latencies else 0.0,
+                "statuses": dict(statuses),
+                "mb_received": round(size / 1e6, 2),
+            }
+        return out
+
+
+def read_rss_mb(pid: int) -> float | None:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+async def sample_rss(pid: int, samples: list, interval: float = 0.5):
+    while True:
+        rss = read_rss_mb(pid)
+        if rss is not None:
+            samples.append(rss)
+        await asyncio.sleep(interval)
+
+
+async def send(client, recorder, request, scheduled: float | None = None):
+    label, method, path, params, body = request
+    started = scheduled if scheduled is not None else time.perf_counter()
+    try:
+        res = await client.request(method, path, params=params, json=body)
+        recorder.add(label, res.status_code, time.perf_counter() - started, len(res.content))
+    except httpx.HTTPError as e:
+        recorder.add(label, type(e).__name__, time.perf_counter() - started)
+
+
+def pick(queries: Queries, scenario: str):
+    methods, weights = zip(*SCENARIOS[scenario])
+    return lambda: getattr(queries, queries.rng.choices(methods, weights)[0])()
+
+
+async def closed_loop(client, recorder, next_request, concurrency: int, until: float):
+    async def worker():
+        while time.perf_counter() < until:
+            await send(client, recorder, next_request())
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def open_loop(client, recorder, next_request, rate: float, until: float, rng):
+    tasks = set()
+    scheduled = time.perf_counter()
+    while scheduled < until:
+        scheduled += rng.expovariate(rate)
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(send(client, recorder, next_request(), scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
+async def run(args, transport=None) -> tuple[dict, dict]:
+    queries = Queries(args.data, seed=args.seed)
+    next_request = pick(queries, args.scenario)
+    limits = httpx.Limits(max_connections=max(args.concurrency, 100), max_keepalive_connections=max(args.concurrency, 100))
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits, transport=transport) as client:
+        if args.warmup:
+            await closed_loop(client, Recorder(), next_request, args.concurrency, time.perf_counter() + args.warmup)
+
+        rss_samples = []
+        sampler = asyncio.create_task(sample_rss(args.pid, rss_samples)) if args.pid else None
+        recorder = Recorder()
+        started = time.perf_counter()
+        until = started + args.duration
+        if args.rate:
+            await open_loop(client, recorder, next_request, args.rate, until, queries.rng)
+        else:
+            await closed_loop(client, recorder, next_request, args.concurrency, until)
+        elapsed = time.perf_counter() - started
+        if sampler:
+            sampler.cancel()
+
+    results = recorder.results(elapsed)
+    server = {}
+    if rss_samples:
+        server = {"rss_start_mb": round(rss_samples[0], 1), "rss_peak_mb": round(max(rss_samples), 1),
+                  "rss_end_mb": round(rss_samples[-1], 1)}
+        results["total"]["rss_peak_mb"] = server["rss_peak_mb"]
+    return results, server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load scenarios against a running API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--data", type=Path, default=DEFAULT_DATA, help="synthetic dataset the API was loaded with")
+    parser.add_argument("--concurrency", type=int, default=16, help="closed-loop workers")
+    parser.add_argument("--rate", type=float, help="open-loop arrival rate (requests/s) instead of workers")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--pid", type=int, help="API process id, to sample its RSS from /proc")
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--out", type=Path)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    results, server = asyncio.run(run(args))
+    print_table({name: {**r, "peak_kb": None} for name, r in results.items()})
+    for name, r in results.items():
+        if r["error_rate"]:
+            print(f"  {name}: error rate {r['error_rate']:.2%} {r['statuses']}")
+    if server:
+        print(f"server RSS: start {server['rss_start_mb']} MB, peak {server['rss_peak_mb']} MB, end {server['rss_end_mb']} MB")
+
+    if not args.no_save:
+        meta = run_metadata(
+            url=args.url, scenario=args.scenario, concurrency=None if args.rate else args.concurrency,
+            rate=args.rate, duration=args.duration, dataset=str(args.data),
+            dataset_manifest=json.loads((args.data / "manifest.json").read_text()), server=server,
+        )
+        print(f"saved {save(f'load_{args.scenario}', results, meta, args.out)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Bellek içi POI index'i ile PostGIS yolunu karşılaştırır.
+
+    cd api && python -m scripts.bench_poi_index            # DATABASE_URL'deki city.pois
+    cd api && python -m scripts.bench_poi_index --synthetic 200000   # yalnızca index, DB'siz
+"""
+import argparse
+import random
+import statistics
+import time
+
+from psycopg2.extras import RealDictCursor
+
+from app.db import get_connection
+from app.poi_index import PoiIndex, load_index
+
+# İstanbul kabaca
+BOUNDS = (28.5, 40.8, 29.5, 41.3)
+TYPES = ["bus_stop", "metro_station", "ev_charger", "kiosk", "toilet", "health"]
+
+NEARBY_SQL = """
+    SELECT poi_id, name, poi_type, subtype, district_name, address_text,
+           ST_X(geom) AS lon, ST_Y(geom) AS lat,
+           ROUND(ST_Distance(geom::geography, ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography)::numeric) AS distance_m
+    FROM city.pois
+    WHERE ST_DWithin(geom::geography, ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography, %s)
+      AND (%s IS NULL OR LOWER(poi_type) = LOWER(%s))
+    ORDER BY distance_m
+    LIMIT 100;
+"""
+
+BBOX_SQL = """
+    SELECT poi_id, name, poi_type, subtype, district_name, address_text, ST_AsGeoJSON(geom) AS geometry
+    FROM city.pois
+    WHERE LOWER(poi_type) = LOWER(%s)
+      AND geom && ST_MakeEnvelope(%s, %s, %s, %s, 4326);
+"""
+
+
+def synthetic_index(n: int) -> PoiIndex:
+    rng = random.Random(42)
+    rows = [
+        (
+            f"poi-{i}", f"POI {i}", rng.choice(TYPES), None, f"District {i % 39}", None,
+            rng.uniform(BOUNDS[0], BOUNDS[2]), rng.uniform(BOUNDS[1], BOUNDS[3]),
+        )
+        for i in range(n)
+    ]
+    return PoiIndex(rows)
+
+
+def queries(n: int):
+    rng = random.Random(7)
+    for _ in range(n):
+        lon = rng.uniform(BOUNDS[0], BOUNDS[2])
+        lat = rng.uniform(BOUNDS[1], BOUNDS[3])
+        yield lon, lat, rng.choice(TYPES)
+
+
+def timed(fn, args_list):
+    times = []
+    for args in args_list:
+        started = time.perf_counter()
+        fn(*args)
+        times.append((time.perf_counter() - started) * 1000)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.95) - 1]
+
+
+def report(label, p50_p95):
+    p50, p95 = p50_p95
+    print(f"  {label:<28} p50 {p50:8.3f} ms   p95 {p95:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--synthetic", type=int, help="benchmark only the index on N random POIs")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--radius", type=int, default=500)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = synthetic_index(args.synthetic) if args.synthetic else load_index()
+    print(f"Index: {index.size} POIs built in {time.perf_counter() - started:.2f}s")
+
+    qs = list(queries(args.queries))
+    nearby = [(lon, lat, args.radius, t) for lon, lat, t in qs]
+    boxes = [(t, lon - 0.02, lat - 0.015, lon + 0.02, lat + 0.015) for lon, lat, t in qs]
+    knn = [(lon, lat, 10, t) for lon, lat, t in qs]
+
+    print("In-memory index")
+    report("radius", timed(lambda lon, lat, r, t: index.radius(lon, lat, r, t), nearby))
+    report("bbox", timed(lambda t, *b: index.bbox(*b, poi_type=t), boxes))
+    report("k-nearest (k=10)", timed(lambda lon, lat, k, t: index.nearest(lon, lat, k, t), knn))
+
+    if args.synthetic:
+        return
+
+    # PostGIS yolu: API'deki gibi istek başına bağlantı + RealDictCursor
+    def pg(sql, params):
+        conn = get_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(sql, params)
+        cur.fetchall()
+        cur.close()
+        conn.close()
+
+    print("PostGIS")
+    report("radius", timed(lambda lon, lat, r, t: pg(NEARBY_SQL, (lon, lat, lon, lat, r, t, t)), nearby))
+    report("bbox", timed(lambda t, *b: pg(BBOX_SQL, (t, *b)), boxes))
+
+
+if __name__ == "__main__":
+    main()
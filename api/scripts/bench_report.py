@@ -0,0 +1,144 @@
+"""
+Benchmark sonuçlarının ortak formatı ve koşular arası karşılaştırma.
+
+bench_hot_paths ve bench_load sonuçlarını aynı JSON yapısında yazar:
+{"suite", "meta": {git, python, cpu, ...}, "results": {isim: {ops_per_s, p50_ms, ...}}}
+
+    cd api && python -m scripts.bench_report results/base.json results/new.json
+    cd api && python -m scripts.bench_report base.json new.json --threshold 15   # %15'ten kötü ise exit 1
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).resolve().parents[2] / "data" / "bench"
+
+# Karşılaştırılan metrikler: isim -> büyük değer daha mı iyi
+METRICS = {
+    "ops_per_s": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "peak_kb": False,
+    "error_rate": False,
+    "rss_peak_mb": False,
+}
+
+
+def percentile(sorted_values, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list (q in 0..100)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def latency_summary(seconds) -> dict:
+    values = sorted(seconds)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 6),
+        "p95_ms": round(percentile(values, 95) * 1000, 6),
+        "p99_ms": round(percentile(values, 99) * 1000, 6),
+        "max_ms": round(values[-1] * 1000, 6) if values else 0.0,
+    }
+
+
+def _git_revision():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=Path(__file__).resolve().parent, timeout=5,
+        )
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True,
+            cwd=Path(__file__).resolve().parent, timeout=5,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if out.returncode != 0:
+        return None
+    return out.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "")
+
+
+def run_metadata(**extra) -> dict:
+    return {
+        "git": _git_revision(),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        **extra,
+    }
+
+
+def save(suite: str, results: dict, meta: dict, out: Path | None = None) -> Path:
+    if out is None:
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        out = RESULTS_DIR / f"{suite}-{meta.get('git') or 'nogit'}-{stamp}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({"suite": suite, "meta": meta, "results": results}, indent=2, ensure_ascii=False))
+    return out
+
+
+def print_table(results: dict):
+    print(f"{'benchmark':<34}{'ops/s':>12}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'peak KB':>10}")
+    for name, r in results.items():
+        peak = f"{r['peak_kb']:>10.0f}" if r.get("peak_kb") is not None else f"{'-':>10}"
+        print(f"{name:<34}{r['ops_per_s']:>12.1f}{r['p50_ms']:>11.3f}{r['p95_ms']:>11.3f}{r['p99_ms']:>11.3f}{peak}")
+
+
+def compare(base: dict, new: dict, threshold: float):
+    """
+    Yields (benchmark, metric, base, new, change %, regressed) for the metrics
+    both runs have; `regressed` when the change is worse than `threshold` percent.
+    """
+    for name, new_result in new["results"].items():
+        base_result = base["results"].get(name)
+        if base_result is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, cur = base_result.get(metric), new_result.get(metric)
+            if old is None or cur is None:
+                continue
+            if old == 0:
+                change = 0.0 if cur == 0 else math.inf
+            else:
+                change = (cur - old) / old * 100
+            worse = -change if higher_is_better else change
+            yield name, metric, old, cur, change, worse > threshold
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("base", type=Path)
+    parser.add_argument("new", type=Path)
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    args = parser.parse_args()
+
+    base, new = (json.loads(p.read_text()) for p in (args.base, args.new))
+    if base["suite"] != new["suite"]:
+        sys.exit(f"suites differ: {base['suite']} vs {new['suite']}")
+    print(f"base {base['meta'].get('git')} ({base['meta'].get('started_at')})")
+    print(f"new  {new['meta'].get('git')} ({new['meta'].get('started_at')})")
+
+    regressions = 0
+    print(f"{'benchmark':<34}{'metric':<12}{'base':>12}{'new':>12}{'change':>10}")
+    for name, metric, old, cur, change, regressed in compare(base, new, args.threshold):
+        regressions += regressed
+        flag = "  ⚠️" if regressed else ""
+        print(f"{name:<34}{metric:<12}{old:>12.3f}{cur:>12.3f}{change:>+9.1f}%{flag}")
+
+    if regressions:
+        print(f"{regressions} metric(s) regressed by more than {args.threshold:.0f}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
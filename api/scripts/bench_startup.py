@@ -0,0 +1,113 @@
+"""
+API açılış maliyetini ölçer: her ölçüm temiz bir Python sürecinde yapılır.
+
+    cd api && python -m scripts.bench_startup            # app.main + ağır bağımlılıkların import süresi/belleği
+    cd api && python -m scripts.bench_startup --serve    # uvicorn'u başlatıp ilk /health ve /ready yanıtına kadar geçen süre
+    cd api && python -m scripts.bench_startup --rag      # RAG modellerinin yükleme süresi (warm-up'ın maliyeti)
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+# Tek modül için: import süresi (s) ve süreç tepe belleği (MB, Linux'ta ru_maxrss KB)
+IMPORT_PROBE = """
+import json, resource, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))
+"""
+
+RAG_PROBE = """
+import json, time
+from app.rag import RagComponents
+started = time.perf_counter()
+rag = RagComponents()
+print(json.dumps({"seconds": time.perf_counter() - started, "timings": rag.timings}))
+"""
+
+MODULES = ["app.main", "app.rag", "pandas", "faiss", "torch", "sentence_transformers"]
+
+
+def probe(code: str):
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if out.returncode != 0:
+        return {"error": out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "failed"}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def wait_for(url: str, timeout: float, proc):
+    """Seconds until `url` answers (any HTTP status), or None on timeout or server exit."""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout and proc.poll() is None:
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return time.perf_counter() - started
+        except urllib.error.HTTPError:
+            return time.perf_counter() - started
+        except OSError:
+            time.sleep(0.05)
+    return None
+
+
+def bench_serve(port: int, timeout: float):
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    try:
+        health = wait_for(f"http://127.0.0.1:{port}/health", timeout, proc)
+        boot = time.perf_counter() - started
+        ready = None
+        if health is not None:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/ready", timeout=10) as res:
+                ready = json.loads(res.read())
+    except urllib.error.HTTPError as e:
+        ready = json.loads(e.read())
+    finally:
+        proc.terminate()
+        _, stderr = proc.communicate()
+    if health is None:
+        print(f"/health not answered ({stderr.strip().splitlines()[-1] if stderr.strip() else 'timeout'})")
+        return
+    print(f"first /health: {boot:.2f}s")
+    if ready:
+        for name, status in ready["components"].items():
+            print(f"  {name:<10} {'ready' if status.get('ready') else status.get('status', 'not ready')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API boot time and import cost")
+    parser.add_argument("--serve", action="store_true", help="start uvicorn and time the first /health")
+    parser.add_argument("--rag", action="store_true", help="time loading the RAG models and index")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    print(f"{'module':<24}{'import s':>10}{'max RSS MB':>12}")
+    for module in MODULES:
+        result = probe(IMPORT_PROBE.format(module=module))
+        if "error" in result:
+            print(f"{module:<24}{'-':>10}{'-':>12}  ({result['error']})")
+        else:
+            print(f"{module:<24}{result['seconds']:>10.2f}{result['max_rss_mb']:>12.0f}")
+
+    if args.rag:
+        result = probe(RAG_PROBE)
+        if "error" in result:
+            print(f"RAG load failed: {result['error']}")
+        else:
+            print(f"RAG load: {result['seconds']:.1f}s {result['timings']}")
+
+    if args.serve:
+        # Açılışta warm-up arka planda sürer; /health bunu beklememeli
+        bench_serve(args.port, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"use client";
+
+import { useEffect } from "react";
+import { useMap } from "react-map-gl/maplibre";
+
+type Props = {
+  poiType: string;
+};
+
+// En yakın POI'ye uzak hücreler "sıcak": ağırlık 0 m -> 0, 2000 m ve üstü -> 1
+const MAX_DIST_M = 2000;
+
+export default function AccessibilityLayer({ poiType }: Props) {
+  const { current: mapRef } = useMap();
+  const map = mapRef?.getMap();
+  const API_URL = process.env.NEXT_PUBLIC_API_URL;
+
+  useEffect(() => {
+    if (!map) return;
+
+    const sourceId = "accessibility";
+    const layerId = "accessibility-heat";
+
+    const fetchGrid = () => {
+      const bounds = map.getBounds();
+      const bbox = [
+        bounds.getWest(),
+        bounds.getSouth(),
+        bounds.getEast(),
+        bounds.getNorth(),
+      ].join(",");
+
+      fetch(`${API_URL}/accessibility/grid?poi_type=${poiType}&bbox=${bbox}`)
+        .then((res) => res.json())
+        .then((json) => {
+          const data = json.data ?? { type: "FeatureCollection", features: [] };
+          if (map.getSource(sourceId)) {
+            (map.getSource(sourceId) as any).setData(data);
+          } else {
+            map.addSource(sourceId, { type: "geojson", data });
+
+            map.addLayer({
+              id: layerId,
+              type: "heatmap",
+              source: sourceId,
+              paint: {
+                "heatmap-weight": [
+                  "interpolate", ["linear"], ["get", "dist_m"],
+                  0, 0,
+                  MAX_DIST_M, 1,
+                ],
+                // Hücreler 500 m aralıklı: yakınlaştıkça yarıçap büyür
+                "heatmap-radius": [
+                  "interpolate", ["exponential", 2], ["zoom"],
+                  9, 6,
+                  15, 200,
+                ],
+                "heatmap-color": [
+                  "interpolate", ["linear"], ["heatmap-density"],
+                  0, "rgba(34,197,94,0)",
+                  0.2, "#86efac",
+                  0.5, "#facc15",
+                  0.8, "#f97316",
+                  1, "#dc2626",
+                ],
+                "heatmap-opacity": 0.6,
+              },
+            });
+          }
+        });
+    };
+
+    // İlk yükleme
+    fetchGrid();
+
+    // Harita hareket edince güncelle
+    map.on("moveend", fetchGrid);
+
+    return () => {
+      map.off("moveend", fetchGrid);
+      if (map.getLayer(layerId)) map.removeLayer(layerId);
+      if (map.getSource(sourceId)) map.removeSource(sourceId);
+    };
+  }, [map, poiType]);
+
+  return null;
+}
@@ -5,6 +5,7 @@ import Map from "react-map-gl/maplibre";
 import type { MapRef } from "react-map-gl/maplibre";
 import DistrictLayer from "@/components/DistrictLayer";
 import PoiLayer from "@/components/PoiLayer";
+import AccessibilityLayer from "@/components/AccessibilityLayer";
 import UserLocationLayer from "@/components/UserLocationLayer";
 import SearchBar, { SelectedPoi } from "@/components/SearchBar";
 import SelectedPoiLayer from "@/components/SelectedPoiLayer";
@@ -13,7 +14,7 @@ import RouteLayer from "@/components/RouteLayer";
 import DirectionsSidebar, {
   DirectionsSheet,
 } from "@/components/DirectionsSidebar";
-import { POI_CATEGORIES, POI_COLORS } from "@/components/poi-config";
+import { POI_CATEGORIES, POI_COLORS, POI_LABELS } from "@/components/poi-config";
 import { useState, useEffect } from "react";
 import type { Feature, LineString, BBox } from "geojson";
 import type { TravelMode } from "@/components/directions-utils";
@@ -39,6 +40,7 @@ import {
 
 export default function BaseMap() {
   const [activeTypes, setActiveTypes] = useState<string[]>([]);
+  const [accessibilityType, setAccessibilityType] = useState<string>("");
   const [mapRef, setMapRef] = useState<MapRef | null>(null);
   const [selectedPoiId, setSelectedPoiId] = useState<string | null>(null);
   const [selectedPoi, setSelectedPoi] = useState<SelectedPoi | null>(null);
@@ -264,6 +266,9 @@ export default function BaseMap() {
       >
         <DistrictLayer />
 
+        {/* Erişilebilirlik ısı haritası */}
+        {accessibilityType && <AccessibilityLayer poiType={accessibilityType} />}
+
         {/* POI Katmanları */}
         {activeTypes.map((type) => (
           <PoiLayer
@@ -405,6 +410,22 @@ export default function BaseMap() {
                   </div>
                 );
               })}
+
+              <div className="space-y-2 border-t border-gray-100 pt-3">
+                <p className="font-semibold text-gray-800">Erişilebilirlik</p>
+                <select
+                  value={accessibilityType}
+                  onChange={(e) => setAccessibilityType(e.target.value)}
+                  className="w-full rounded-md border border-gray-300 p-2 text-sm"
+                >
+                  <option value="">Kapalı</option>
+                  {Object.entries(POI_LABELS).map(([key, label]) => (
+                    <option key={key} value={key}>
+                      {label}
+                    </option>
+                  ))}
+                </select>
+              </div>
             </div>
           </SheetContent>
         </Sheet>
@@ -468,6 +489,22 @@ export default function BaseMap() {
                 </div>
               );
             })}
+
+            <div className="border-t border-gray-100 pt-2">
+              <p className="font-semibold text-gray-800 text-sm mb-1">Erişilebilirlik</p>
+              <select
+                value={accessibilityType}
+                onChange={(e) => setAccessibilityType(e.target.value)}
+                className="w-full rounded-md border border-gray-300 p-2 text-sm"
+              >
+                <option value="">Kapalı</option>
+                {Object.entries(POI_LABELS).map(([key, label]) => (
+                  <option key={key} value={key}>
+                    {label}
+                  </option>
+                ))}
+              </select>
+            </div>
           </CollapsibleContent>
         </Collapsible>
       </div>
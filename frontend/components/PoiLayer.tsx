@@ -21,6 +21,9 @@ interface PoiLayerProps {
   }) => void;
 }
 
+// Bu zoom'un altında kümeler sunucudan gelir (/poi/clusters), üstünde tekil POI'ler
+const CLUSTER_MAX_ZOOM = 12;
+
 export default function PoiLayer({ poiType, selectedPoiId, onSelectPoi }: PoiLayerProps) {
   const { current: mapRef } = useMap();
   const map = mapRef?.getMap();
@@ -38,7 +41,13 @@ export default function PoiLayer({ poiType, selectedPoiId, onSelectPoi }: PoiLay
       bounds.getNorth(),
     ].join(",");
 
-    fetch(`${API_URL}/poi?poi_type=${poiType}&bbox=${bbox}`)
+    const zoom = map.getZoom();
+    const url =
+      zoom < CLUSTER_MAX_ZOOM
+        ? `${API_URL}/poi/clusters?poi_type=${poiType}&bbox=${bbox}&zoom=${zoom.toFixed(2)}`
+        : `${API_URL}/poi?poi_type=${poiType}&bbox=${bbox}`;
+
+    fetch(url)
       .then((res) => res.json())
       .then((json) => setPoiData(json.data))
       .catch((e) => console.error("POI fetch error:", e));
@@ -70,9 +79,6 @@ export default function PoiLayer({ poiType, selectedPoiId, onSelectPoi }: PoiLay
       map.addSource(sourceId, {
         type: "geojson",
         data: poiData,
-        cluster: true,
-        clusterMaxZoom: 11,
-        clusterRadius: 70,
       });
 
       map.addLayer({
@@ -99,7 +105,7 @@ export default function PoiLayer({ poiType, selectedPoiId, onSelectPoi }: PoiLay
         source: sourceId,
         filter: ["has", "point_count"],
         layout: {
-          "text-field": "{point_count_abbreviated}",
+          "text-field": ["to-string", ["get", "point_count"]],
           "text-font": ["Open Sans Bold"],
           "text-size": 12,
         },
@@ -170,10 +176,27 @@ export default function PoiLayer({ poiType, selectedPoiId, onSelectPoi }: PoiLay
       });
     };
 
+    // Kümeye tıklanınca kapsadığı POI'lerin kutusuna yakınlaş
+    const onClusterClick = (e: maplibregl.MapLayerMouseEvent) => {
+      const f = e.features?.[0];
+      if (!f) return;
+      const raw = (f.properties as any).bbox;
+      const [minLon, minLat, maxLon, maxLat] = typeof raw === "string" ? JSON.parse(raw) : raw;
+      map.fitBounds(
+        [
+          [minLon, minLat],
+          [maxLon, maxLat],
+        ],
+        { padding: 60, maxZoom: 16 }
+      );
+    };
+
     map.on("click", onClick);
+    map.on("click", `${sourceId}-clusters`, onClusterClick);
 
     return () => {
       map.off("click", onClick);
+      map.off("click", `${sourceId}-clusters`, onClusterClick);
       if (map.getLayer(highlightId)) map.removeLayer(highlightId);
       if (map.getLayer(`${sourceId}-clusters`)) map.removeLayer(`${sourceId}-clusters`);
       if (map.getLayer(`${sourceId}-cluster-count`)) map.removeLayer(`${sourceId}-cluster-count`);
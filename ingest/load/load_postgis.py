@@ -0,0 +1,268 @@
+import argparse
+import os
+import re
+import struct
+import time
+from pathlib import Path
+
+import duckdb
+import psycopg2
+
+# Ortam değişkenlerinden bağlantı bilgileri
+DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://citistanbul:citistanbul@db:5432/citistanbul")
+DUCKDB_PATH = os.getenv("DUCKDB_PATH", "data/interim/citistanbul.duckdb")
+# dbt-duckdb varsayılanı: <target şeması>_<model şeması>
+MART_SCHEMA = os.getenv("DBT_MART_SCHEMA", "main_mart")
+
+WAREHOUSE_DIR = Path(__file__).resolve().parents[2] / "warehouse" / "postgis"
+STAGE_SCHEMA = "city_load"
+BATCH_SIZE = 50_000
+SRID = 4326
+
+# city.<tablo> -> DuckDB kaynağı; kolonlar PostGIS tablosundan okunur
+TABLES = [
+    ("districts", "raw.dim_district"),
+    ("pois", "raw.pois_pcd"),
+    ("poi_merges", "raw.poi_merges"),
+    ("green_areas", "raw.green_areas_pcd"),
+    ("district_metrics", f"{MART_SCHEMA}.mart_district_metrics"),
+    ("district_scores", f"{MART_SCHEMA}.mart_district_scores"),
+    ("district_rankings", f"{MART_SCHEMA}.mart_district_rankings"),
+    ("poi_summary", f"{MART_SCHEMA}.mart_poi_summary"),
+    ("accessibility_grid", "raw.accessibility_grid"),
+    ("district_accessibility", "raw.district_accessibility"),
+    ("cell_metrics", "raw.cell_metrics"),
+    ("cell_poi_counts", "raw.cell_poi_counts"),
+    ("cell_pieces", "raw.cell_pieces"),
+]
+
+# PostGIS içinde, yüklenen tablodan türetilen tablolar: tablo -> (kaynak tablo, SQL dosyası)
+DERIVED = {
+    "poi_clusters": ("pois", "refresh_poi_clusters.sql"),
+}
+
+# Multi* kolonlar: ST_Multi GeometryCollection'ı olduğu gibi bırakır (07 overlay'i
+# üretebiliyor); önce kolonun boyutundaki parçalar çıkarılır
+MULTI_EXTRACT = {"multipoint": 1, "multilinestring": 2, "multipolygon": 3}
+
+# PostGIS tipi -> (DuckDB cast tipi, binary COPY kodlayıcı)
+PG_TYPES = {
+    "integer": ("INTEGER", lambda v: struct.pack(">i", v)),
+    "bigint": ("BIGINT", lambda v: struct.pack(">q", v)),
+    "double precision": ("DOUBLE", lambda v: struct.pack(">d", v)),
+    "text": ("VARCHAR", lambda v: v.encode("utf-8")),
+    "boolean": ("BOOLEAN", lambda v: b"\x01" if v else b"\x00"),
+}
+
+COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+COPY_TRAILER = struct.pack(">h", -1)
+
+
+def in_schema(sql: str, schema: str) -> str:
+    """Rewrites `city.` references (and the schema DDL) of a warehouse script to `schema`."""
+    return re.sub(r"\bcity\b(?=[.;])", schema, sql)
+
+
+def ewkb(wkb: bytes, srid: int = SRID) -> bytes:
+    """Adds the SRID to a 2D WKB geometry so PostGIS accepts it into a typmod'ed column."""
+    order = "<" if wkb[0] == 1 else ">"
+    (geom_type,) = struct.unpack(order + "I", wkb[1:5])
+    return wkb[:1] + struct.pack(order + "II", geom_type | 0x20000000, srid) + wkb[5:]
+
+
+def table_columns(cur, schema: str, table: str):
+    """Returns [(name, format_type)] of a PostGIS table in column order."""
+    cur.execute(
+        """
+        SELECT a.attname, format_type(a.atttypid, a.atttypmod)
+        FROM pg_attribute a
+        JOIN pg_class c ON c.oid = a.attrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = %s AND c.relname = %s AND a.attnum > 0 AND NOT a.attisdropped
+        ORDER BY a.attnum;
+        """,
+        (schema, table),
+    )
+    return cur.fetchall()
+
+
+def primary_key(cur, schema: str, table: str):
+    cur.execute(
+        """
+        SELECT a.attname
+        FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+        WHERE i.indrelid = %s::regclass AND i.indisprimary;
+        """,
+        (f"{schema}.{table}",),
+    )
+    return [r[0] for r in cur.fetchall()]
+
+
+def source_query(columns, source: str, pk: list[str]) -> tuple[str, list]:
+    """
+    Builds the DuckDB SELECT that yields rows already cast to the PostGIS column
+    types, plus the per-column encoders. Rows are deduplicated on the primary key.
+    """
+    exprs, encoders = [], []
+    for name, pg_type in columns:
+        if pg_type.startswith("geometry"):
+            multi = next((d for t, d in MULTI_EXTRACT.items() if t in pg_type.lower()), None)
+            geom = f"ST_Multi(ST_CollectionExtract({name}, {multi}))" if multi else name
+            exprs.append(f"ST_AsWKB({geom})::BLOB AS {name}")
+            encoders.append(ewkb)
+        else:
+            duck_type, encode = PG_TYPES[pg_type]
+            exprs.append(f"CAST({name} AS {duck_type}) AS {name}")
+            encoders.append(encode)
+
+    sql = f"SELECT {', '.join(exprs)} FROM {source}"
+    if pk:
+        sql += f" QUALIFY row_number() OVER (PARTITION BY {', '.join(pk)}) = 1"
+    return sql, encoders
+
+
+def copy_rows(rows, encoders):
+    """Yields a PostgreSQL binary COPY stream for the given rows."""
+    yield COPY_HEADER
+    count = struct.pack(">h", len(encoders))
+    for row in rows:
+        parts = [count]
+        for value, encode in zip(row, encoders):
+            if value is None:
+                parts.append(b"\xff\xff\xff\xff")
+            else:
+                data = encode(value)
+                parts.append(struct.pack(">i", len(data)) + data)
+        yield b"".join(parts)
+    yield COPY_TRAILER
+
+
+def fetch_batches(cur, batch_size=BATCH_SIZE):
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            break
+        yield from rows
+
+
+class CopyStream:
+    """File-like wrapper so copy_expert can pull the generated COPY stream."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.buffer = b""
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.buffer += chunk
+        if size < 0:
+            data, self.buffer = self.buffer, b""
+        else:
+            data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def load_table(duck, pg, table: str, source: str) -> int:
+    cur = pg.cursor()
+    columns = table_columns(cur, STAGE_SCHEMA, table)
+    pk = primary_key(cur, STAGE_SCHEMA, table)
+    sql, encoders = source_query(columns, source, pk)
+
+    total = duck.execute(f"SELECT count(*) FROM {source}").fetchone()[0]
+    rows = duck.execute(sql)
+    stream = CopyStream(copy_rows(fetch_batches(rows), encoders))
+    names = ", ".join(name for name, _ in columns)
+    cur.copy_expert(f"COPY {STAGE_SCHEMA}.{table} ({names}) FROM STDIN WITH (FORMAT binary)", stream)
+    loaded = cur.rowcount
+    cur.close()
+
+    if loaded < total:
+        print(f"⚠️ {table}: {total - loaded} rows with duplicate {', '.join(pk)} skipped")
+    return loaded
+
+
+def swap(pg, tables) -> int:
+    """Moves the staged tables into city.* and bumps the data version in one transaction."""
+    cur = pg.cursor()
+    for table in tables:
+        cur.execute(f"DROP TABLE IF EXISTS city.{table};")
+        cur.execute(f"ALTER TABLE {STAGE_SCHEMA}.{table} SET SCHEMA city;")
+    cur.execute(
+        """
+        INSERT INTO city.data_version (id, version, loaded_at)
+        VALUES (true, 1, now())
+        ON CONFLICT (id) DO UPDATE
+        SET version = city.data_version.version + 1, loaded_at = now()
+        RETURNING version;
+        """
+    )
+    version = cur.fetchone()[0]
+    cur.execute(f"DROP SCHEMA {STAGE_SCHEMA} CASCADE;")
+    pg.commit()
+    cur.close()
+    return version
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load DuckDB outputs into PostGIS city.* tables")
+    parser.add_argument("--duckdb", default=DUCKDB_PATH)
+    parser.add_argument("--tables", nargs="+", choices=[t for t, _ in TABLES], help="subset to reload")
+    args = parser.parse_args()
+
+    tables = [(t, s) for t, s in TABLES if not args.tables or t in args.tables]
+    init_sql = (WAREHOUSE_DIR / "init.sql").read_text()
+    index_sql = (WAREHOUSE_DIR / "create_indexes.sql").read_text()
+
+    print(f"Connecting to Postgres: {DATABASE_URL}")
+    print(f"Reading DuckDB: {args.duckdb}")
+    duck = duckdb.connect(args.duckdb, read_only=True)
+    duck.execute("LOAD spatial;")
+    pg = psycopg2.connect(DATABASE_URL)
+
+    try:
+        cur = pg.cursor()
+        # city şeması yoksa oluştur; staging şemasını sıfırdan kur
+        cur.execute(init_sql)
+        cur.execute(f"DROP SCHEMA IF EXISTS {STAGE_SCHEMA} CASCADE;")
+        cur.execute(in_schema(init_sql, STAGE_SCHEMA))
+        pg.commit()
+
+        for table, source in tables:
+            started = time.perf_counter()
+            count = load_table(duck, pg, table, source)
+            pg.commit()
+            print(f"  {table}: {count} rows ({time.perf_counter() - started:.1f}s)")
+
+        loaded = [t for t, _ in tables]
+        for table, (base, sql_file) in DERIVED.items():
+            if base in loaded:
+                cur.execute(in_schema((WAREHOUSE_DIR / sql_file).read_text(), STAGE_SCHEMA))
+                pg.commit()
+                loaded.append(table)
+                print(f"  {table}: refreshed from {base}")
+
+        # İndeksler veri yüklendikten sonra, tek seferde kurulur
+        for stmt in in_schema(index_sql, STAGE_SCHEMA).split(";"):
+            match = re.search(rf"ON\s+{STAGE_SCHEMA}\.(\w+)", stmt)
+            if match and match.group(1) in loaded:
+                cur.execute(stmt)
+        for table in loaded:
+            cur.execute(f"ANALYZE {STAGE_SCHEMA}.{table};")
+        pg.commit()
+
+        version = swap(pg, loaded)
+        print(f"✅ Loaded {len(loaded)} tables into city.* (data version {version})")
+    except Exception:
+        pg.rollback()
+        raise
+    finally:
+        pg.close()
+        duck.close()
+
+
+if __name__ == "__main__":
+    main()
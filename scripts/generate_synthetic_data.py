@@ -0,0 +1,590 @@
+"""
+Sentetik İstanbul veri seti üretici (benchmark'lar için).
+
+Gerçek veri olmadan pipeline'ı, PostGIS/ES yüklemesini ve API'yi ölçeklenebilir
+bir veri setiyle çalıştırmak için:
+
+- 39 ilçe poligonu: İstanbul sınırları içinde, kenarları paylaşılan (boşluksuz,
+  örtüşmesiz) titreşimli bir ızgara mozaiği
+- POI'ler: POI_LABELS tiplerinde, Boğaz çevresinde yoğunlaşan ve ilçe içinde
+  odaklar etrafında kümelenen noktalar
+- Yeşil alan poligonları, ilçe metrikleri ve RAG bilgi dosyası (rag_knowledge.parquet)
+
+Aynı --seed ve ölçek her zaman aynı veriyi üretir. Çıktılar CSV'dir; geometri
+kolonları GeoJSON metnidir. --duckdb, load_postgis.py'nin okuduğu raw.* / mart
+tablolarını içeren bir DuckDB dosyası da yazar:
+
+    python scripts/generate_synthetic_data.py --scale medium
+    python scripts/generate_synthetic_data.py --pois 500000 --duckdb data/synthetic/bench.duckdb
+    DUCKDB_PATH=data/synthetic/bench.duckdb python ingest/load/load_postgis.py
+"""
+import argparse
+import csv
+import hashlib
+import json
+import math
+import random
+import time
+from pathlib import Path
+
+BOUNDS = (28.5, 40.85, 29.45, 41.25)  # İstanbul kabaca (minx, miny, maxx, maxy)
+CENTER = (29.0, 41.04)  # Boğaz; yoğunluk buradan uzaklaştıkça azalır
+GRID = (13, 3)  # 39 ilçe
+
+DISTRICT_NAMES = [
+    "Adalar", "Arnavutköy", "Ataşehir", "Avcılar", "Bağcılar", "Bahçelievler", "Bakırköy",
+    "Başakşehir", "Bayrampaşa", "Beşiktaş", "Beykoz", "Beylikdüzü", "Beyoğlu", "Büyükçekmece",
+    "Çatalca", "Çekmeköy", "Esenler", "Esenyurt", "Eyüpsultan", "Fatih", "Gaziosmanpaşa",
+    "Güngören", "Kadıköy", "Kağıthane", "Kartal", "Küçükçekmece", "Maltepe", "Pendik",
+    "Sancaktepe", "Sarıyer", "Silivri", "Sultanbeyli", "Sultangazi", "Şile", "Şişli",
+    "Tuzla", "Ümraniye", "Üsküdar", "Zeytinburnu",
+]
+
+# Tip -> (pay, isim şablonu); paylar gerçek veri setindeki dağılıma yakın
+POI_TYPES = {
+    "bus_stop": (0.46, "{place} Durağı"),
+    "micro_mobility_parking": (0.11, "{place} Mikro Mobilite Parkı"),
+    "kiosk": (0.08, "{place} Büfe"),
+    "health": (0.08, "{place} Aile Sağlığı Merkezi"),
+    "bike_parking": (0.07, "{place} Bisiklet Parkı"),
+    "ev_charger": (0.06, "{place} Şarj İstasyonu"),
+    "toilet": (0.05, "{place} Umumi Tuvalet"),
+    "museum": (0.03, "{place} Müzesi"),
+    "metro_station": (0.03, "{place} Metro İstasyonu"),
+    "theater": (0.02, "{place} Sahnesi"),
+    "tram_station": (0.01, "{place} Tramvay Durağı"),
+}
+
+PLACES = [
+    "Cumhuriyet", "Atatürk", "Fatih", "Yıldız", "Çamlık", "Gül", "Merkez", "İstiklal", "Barbaros",
+    "Yenimahalle", "Çiçek", "Sahil", "Çarşı", "Hürriyet", "Bağlar", "Köprü", "Pınar", "Saray",
+    "Yavuz Selim", "Mimar Sinan", "Kuleli", "Çınar", "Ihlamur", "Zambak", "Lale", "Şehitler",
+]
+STREETS = ["Cad.", "Sok.", "Bulvarı"]
+GREEN_SUBTYPES = [("park", "Parkı", 0.7), ("koru", "Korusu", 0.1), ("yesil_alan", "Yeşil Alanı", 0.2)]
+
+SCALES = {
+    "small": {"pois": 20_000, "green_areas": 1_000, "rag_notes": 0},
+    "medium": {"pois": 250_000, "green_areas": 8_000, "rag_notes": 2_000},
+    "large": {"pois": 1_000_000, "green_areas": 25_000, "rag_notes": 20_000},
+}
+
+EARTH_M = 111_320  # 1 derece enlem ~ metre
+
+
+def _md5(*parts) -> str:
+    return hashlib.md5("|".join(map(str, parts)).encode("utf-8")).hexdigest()
+
+
+def ring_area_m2(ring) -> float:
+    """Shoelace area of a lon/lat ring in a local equirectangular projection."""
+    lat0 = math.radians(sum(p[1] for p in ring) / len(ring))
+    kx, ky = EARTH_M * math.cos(lat0), EARTH_M
+    total = 0.0
+    for (x1, y1), (x2, y2) in zip(ring, ring[1:]):
+        total += (x1 * kx) * (y2 * ky) - (x2 * kx) * (y1 * ky)
+    return abs(total) / 2
+
+
+# --- İlçeler ----------------------------------------------------------------------
+
+def _edge(a, b, vertices, rng, segments=6, wiggle=0.03):
+    """Jittered polyline between two lattice vertices; endpoints are shared exactly."""
+    (ax, ay), (bx, by) = vertices[a], vertices[b]
+    nx, ny = -(by - ay), bx - ax  # kenara dik
+    points = [(ax, ay)]
+    for i in range(1, segments):
+        t = i / segments
+        offset = rng.uniform(-wiggle, wiggle) * math.sin(math.pi * t)
+        points.append((ax + (bx - ax) * t + nx * offset, ay + (by - ay) * t + ny * offset))
+    points.append((bx, by))
+    return points
+
+
+def districts(rng):
+    """39 districts tiling BOUNDS; each keeps its lattice corners for point sampling."""
+    cols, rows = GRID
+    minx, miny, maxx, maxy = BOUNDS
+    dx, dy = (maxx - minx) / cols, (maxy - miny) / rows
+
+    vertices = {}
+    for i in range(cols + 1):
+        for j in range(rows + 1):
+            # İç köşeler titreşir; dış sınır düz kalır
+            jx = rng.uniform(-0.2, 0.2) * dx if 0 < i < cols else 0
+            jy = rng.uniform(-0.2, 0.2) * dy if 0 < j < rows else 0
+            vertices[i, j] = (minx + i * dx + jx, miny + j * dy + jy)
+
+    edges = {}
+
+    def edge(a, b):
+        if (b, a) in edges:
+            return edges[b, a][::-1]
+        if (a, b) not in edges:
+            edges[a, b] = _edge(a, b, vertices, rng)
+        return edges[a, b]
+
+    names = sorted(DISTRICT_NAMES, key=lambda n: rng.random())
+    result = []
+    for k, (i, j) in enumerate((i, j) for j in range(rows) for i in range(cols)):
+        corners = [(i, j), (i + 1, j), (i + 1, j + 1), (i, j + 1)]
+        ring = []
+        for a, b in zip(corners, corners[1:] + corners[:1]):
+            ring.extend(edge(a, b)[:-1])
+        ring.append(ring[0])
+        ring = [[round(x, 6), round(y, 6)] for x, y in ring]
+
+        cx, cy = (sum(vertices[c][0] for c in corners) / 4, sum(vertices[c][1] for c in corners) / 4)
+        # Boğaz'a yakın ilçeler daha yoğun
+        distance = math.hypot((cx - CENTER[0]) * 0.75, cy - CENTER[1])
+        density = math.exp(-distance / 0.18) * rng.lognormvariate(0, 0.35)
+        result.append({
+            "district_id": 1001 + k,
+            "district_name": names[k],
+            "corners": [vertices[c] for c in corners],
+            "ring": ring,
+            "density": density,
+            "area_km2": ring_area_m2(ring) / 1e6,
+        })
+    return result
+
+
+def _point_in(district, u, v):
+    """Bilinear point of the district's lattice quad; u, v in [0, 1]."""
+    (x0, y0), (x1, y1), (x2, y2), (x3, y3) = district["corners"]
+    x = (1 - u) * (1 - v) * x0 + u * (1 - v) * x1 + u * v * x2 + (1 - u) * v * x3
+    y = (1 - u) * (1 - v) * y0 + u * (1 - v) * y1 + u * v * y2 + (1 - u) * v * y3
+    return x, y
+
+
+def _sample_uv(rng, hotspots):
+    # Kenarlardaki titreşime düşmemek için kenar payı bırakılır
+    if hotspots and rng.random() < 0.7:
+        hu, hv = rng.choice(hotspots)
+        u, v = rng.gauss(hu, 0.06), rng.gauss(hv, 0.06)
+    else:
+        u, v = rng.random(), rng.random()
+    return min(max(u, 0.05), 0.95), min(max(v, 0.05), 0.95)
+
+
+def _allocate(total, weights):
+    weight_sum = sum(weights)
+    counts = [int(total * w / weight_sum) for w in weights]
+    for i in range(total - sum(counts)):
+        counts[i % len(counts)] += 1
+    return counts
+
+
+# --- POI ve yeşil alanlar -----------------------------------------------------------
+
+def pois(rng, district_list, n):
+    types = list(POI_TYPES)
+    type_weights = [POI_TYPES[t][0] for t in types]
+    counts = _allocate(n, [d["density"] for d in district_list])
+
+    poi_id = 0
+    for district, count in zip(district_list, counts):
+        hotspots = [(rng.uniform(0.15, 0.85), rng.uniform(0.15, 0.85)) for _ in range(rng.randint(3, 8))]
+        for _ in range(count):
+            poi_type = rng.choices(types, type_weights)[0]
+            lon, lat = _point_in(district, *_sample_uv(rng, hotspots))
+            place = rng.choice(PLACES)
+            poi_id += 1
+            yield {
+                "district_id": district["district_id"],
+                "poi_id": f"syn-{poi_id:07d}",
+                "name": POI_TYPES[poi_type][1].format(place=place),
+                "poi_type": poi_type,
+                "source": rng.choice(("ibb", "osm")),
+                "district_name": district["district_name"],
+                "address_text": f"{place} Mah. {rng.choice(PLACES)} {rng.choice(STREETS)} No:{rng.randint(1, 250)}",
+                "lon": round(lon, 6),
+                "lat": round(lat, 6),
+                "subtype": None,
+            }
+
+
+def green_areas(rng, district_list, n):
+    counts = _allocate(n, [d["density"] ** 0.5 for d in district_list])
+    subtypes, suffixes, weights = zip(*GREEN_SUBTYPES)
+    area_id = 0
+    for district, count in zip(district_list, counts):
+        for _ in range(count):
+            cx, cy = _point_in(district, rng.uniform(0.08, 0.92), rng.uniform(0.08, 0.92))
+            radius_m = min(rng.lognormvariate(math.log(90), 0.7), 600)
+            kx = EARTH_M * math.cos(math.radians(cy))
+            vertices = rng.randint(8, 16)
+            ring = []
+            for k in range(vertices):
+                angle = 2 * math.pi * k / vertices
+                r = radius_m * rng.uniform(0.7, 1.0)
+                ring.append([round(cx + r * math.cos(angle) / kx, 6), round(cy + r * math.sin(angle) / EARTH_M, 6)])
+            ring.append(ring[0])
+            index = rng.choices(range(len(subtypes)), weights)[0]
+            area_id += 1
+            yield {
+                "area_id": f"syn-green-{area_id:06d}",
+                "name": f"{rng.choice(PLACES)} {suffixes[index]}",
+                "subtype": subtypes[index],
+                "district_name": district["district_name"],
+                "district_id": district["district_id"],
+                "area_m2": round(ring_area_m2(ring), 2),
+                "geometry": {"type": "MultiPolygon", "coordinates": [[ring]]},
+                "source": "synthetic",
+                "poi_type": "green_area",
+            }
+
+
+def district_metrics(rng, district_list, green_m2):
+    for d in district_list:
+        population = round(120_000 * d["density"] * d["area_km2"] / 20 * rng.uniform(0.8, 1.2)) + 15_000
+        yield {
+            "district_id": d["district_id"],
+            "district_name": d["district_name"],
+            "population": population,
+            "household_size": round(rng.uniform(2.6, 3.7), 2),
+            "avg_price_m2": int(rng.uniform(20_000, 60_000) * (0.6 + d["density"])),
+            "avg_rent": round(rng.uniform(12_000, 40_000) * (0.6 + d["density"]), -2),
+            "green_area_m2": round(green_m2.get(d["district_id"], 0.0), 2),
+            "bike_lane_km": round(rng.uniform(0, 80), 2),
+            "pedestrian_length_m": round(rng.uniform(0, 15_000), 1),
+            "area_km2": round(d["area_km2"], 2),
+        }
+
+
+# --- RAG bilgi dosyası ----------------------------------------------------------------
+
+METRIC_TEXTS = {
+    "population": "{name} ilçesinin toplam nüfusu {value:.0f} kişidir.",
+    "household_size": "{name} ilçesinin ortalama hane büyüklüğü {value} kişidir.",
+    "avg_price_m2": "{name} ilçesinde evlerin ortalama metrekare fiyatı {value} ₺’dir.",
+    "avg_rent": "{name} ilçesinde evlerin ortalama kira fiyatı {value:.0f} ₺’dir.",
+    "green_area_m2": "{name} ilçesindeki toplam yeşil alan {value:.0f} metrekaredir.",
+    "bike_lane_km": "{name} ilçesinde toplam bisiklet yolu uzunluğu {value} km’dir.",
+    "pedestrian_length_m": "{name} ilçesindeki toplam yaya yolu uzunluğu {value} metredir.",
+    "area_km2": "{name} ilçesinin yüzölçümü {value} km²’dir.",
+}
+
+POI_TEXTS = {
+    "metro_station": "metro istasyonu",
+    "bus_stop": "otobüs durağı",
+    "tram_station": "tramvay istasyonu",
+    "ev_charger": "elektrikli araç şarj istasyonu",
+    "health": "sağlık tesisi",
+    "kiosk": "büfe",
+    "bike_parking": "bisiklet park yeri",
+    "micro_mobility_parking": "mikromobilite park alanı",
+    "museum": "müze",
+    "theater": "tiyatro",
+    "toilet": "umumi tuvalet",
+}
+
+FAQ = {
+    "year": "Bu sistemde kullanılan tüm veriler sentetik olarak üretilmiştir.",
+    "coverage": "Sistem İstanbul’un 39 ilçesini kapsamaktadır.",
+    "scope": "Her ilçe için demografi, konut, ulaşım, yeşil alan ve hizmet noktaları verileri bulunmaktadır.",
+}
+
+
+def rag_knowledge(rng, metrics, poi_counts, notes):
+    """Rows in the schema of the rag_knowledge mart (see transform/dbt/models/marts)."""
+
+    def doc(district_id, district_name, doc_type, metric_key, text):
+        return {
+            "doc_id": _md5(district_id, doc_type, metric_key, text),
+            "district_id": float(district_id) if district_id is not None else None,
+            "district_name": district_name,
+            "doc_type": doc_type,
+            "metric_key": metric_key,
+            "text": text,
+        }
+
+    docs = []
+    for m in metrics:
+        did, name = m["district_id"], m["district_name"]
+        for key, template in METRIC_TEXTS.items():
+            docs.append(doc(did, name, "district_metric", key, template.format(name=name, value=m[key])))
+        counts = poi_counts.get(did, {})
+        total = sum(counts.values())
+        docs.append(doc(did, name, "district_score", "total_pois",
+                        f"{name} ilçesinde toplam {total} hizmet noktası/mekan bulunmaktadır."))
+        for poi_type, label in POI_TEXTS.items():
+            docs.append(doc(did, name, "district_poi", f"{poi_type}_count",
+                            f"{name} ilçesinde toplam {counts.get(poi_type, 0)} {label} bulunmaktadır."))
+
+    # Ölçek için ek notlar: retrieval'ı büyük bir index üzerinde ölçmeye yarar
+    for i in range(notes):
+        m = rng.choice(metrics)
+        place = rng.choice(PLACES)
+        label = rng.choice(list(POI_TEXTS.values()))
+        docs.append(doc(
+            m["district_id"], m["district_name"], "district_note", f"note_{i}",
+            f"{m['district_name']} ilçesinin {place} Mahallesi'nde {rng.randint(1, 40)} {label} bulunmaktadır.",
+        ))
+
+    for key, text in FAQ.items():
+        docs.append(doc(None, None, "faq", key, text))
+    return docs
+
+
+# --- Yazma -------------------------------------------------------------------------------
+
+def write_csv(path: Path, rows, columns) -> int:
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for row in rows:
+            if "geometry" in row:
+                row = {**row, "geometry": json.dumps(row["geometry"], separators=(",", ":"))}
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_parquet(path: Path, rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    pq.write_table(pa.Table.from_pylist(rows), path)
+
+
+def generate(out: Path, pois_n: int, green_n: int, rag_notes: int, seed: int = 42) -> dict:
+    """Writes the dataset into `out` and returns its manifest."""
+    out.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    started = time.perf_counter()
+
+    district_list = districts(rng)
+    write_csv(out / "districts.csv", (
+        {
+            "district_id": d["district_id"],
+            "district_name": d["district_name"],
+            "geometry": {"type": "MultiPolygon", "coordinates": [[d["ring"]]]},
+        }
+        for d in district_list
+    ), ["district_id", "district_name", "geometry"])
+
+    # Sayımlar yazarken toplanır; POI listesi bellekte tutulmaz
+    poi_counts: dict[int, dict[str, int]] = {}
+
+    def counted(rows):
+        for row in rows:
+            counts = poi_counts.setdefault(row["district_id"], {})
+            counts[row["poi_type"]] = counts.get(row["poi_type"], 0) + 1
+            yield row
+
+    poi_columns = ["district_id", "poi_id", "name", "poi_type", "source", "district_name",
+                   "address_text", "lon", "lat", "subtype"]
+    n_pois = write_csv(out / "pois.csv", counted(pois(rng, district_list, pois_n)), poi_columns)
+
+    green_m2: dict[int, float] = {}
+
+    def summed(rows):
+        for row in rows:
+            green_m2[row["district_id"]] = green_m2.get(row["district_id"], 0.0) + row["area_m2"]
+            yield row
+
+    green_columns = ["area_id", "name", "subtype", "district_name", "district_id", "area_m2",
+                     "geometry", "source", "poi_type"]
+    n_green = write_csv(out / "green_areas.csv", summed(green_areas(rng, district_list, green_n)), green_columns)
+
+    metrics = list(district_metrics(rng, district_list, green_m2))
+    write_csv(out / "district_metrics.csv", metrics, list(metrics[0]))
+
+    docs = rag_knowledge(rng, metrics, poi_counts, rag_notes)
+    write_parquet(out / "rag_knowledge.parquet", docs)
+
+    manifest = {
+        "seed": seed,
+        "bounds": BOUNDS,
+        "districts": len(district_list),
+        "pois": n_pois,
+        "green_areas": n_green,
+        "rag_docs": len(docs),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+    (out / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+# load_postgis.py'nin TABLES kaynakları; kolonlar city.* tablolarıyla aynı adlarda
+DUCKDB_SQL = """
+INSTALL spatial;
+LOAD spatial;
+CREATE SCHEMA IF NOT EXISTS raw;
+CREATE SCHEMA IF NOT EXISTS {mart};
+
+CREATE OR REPLACE TABLE raw.dim_district AS
+SELECT district_id, district_name, ST_GeomFromGeoJSON(geometry) AS geom
+FROM read_csv('{dir}/districts.csv', header = true);
+
+CREATE OR REPLACE TABLE raw.pois_pcd AS
+SELECT *, ST_Point(lon, lat) AS geom
+FROM read_csv('{dir}/pois.csv', header = true, types = {{'subtype': 'VARCHAR'}});
+
+CREATE OR REPLACE TABLE raw.green_areas_pcd AS
+SELECT * EXCLUDE (geometry), ST_GeomFromGeoJSON(geometry) AS geom
+FROM read_csv('{dir}/green_areas.csv', header = true);
+
+CREATE OR REPLACE TABLE {mart}.mart_district_metrics AS
+SELECT * FROM read_csv('{dir}/district_metrics.csv', header = true);
+
+CREATE OR REPLACE TABLE {mart}.mart_poi_summary AS
+SELECT
+  d.district_id,
+  d.district_name,
+  count(p.poi_id) AS total_pois,
+  {poi_counts}
+FROM raw.dim_district d
+LEFT JOIN raw.pois_pcd p USING (district_id)
+GROUP BY d.district_id, d.district_name;
+
+CREATE OR REPLACE TABLE {mart}.mart_district_scores AS
+SELECT
+  m.district_id,
+  m.district_name,
+  m.green_area_m2 / m.population AS green_per_capita_m2,
+  m.bike_lane_km / m.area_km2 AS bike_lane_density,
+  m.pedestrian_length_m / m.area_km2 AS pedestrian_length_density,
+  s.total_pois
+FROM {mart}.mart_district_metrics m
+JOIN {mart}.mart_poi_summary s USING (district_id);
+
+CREATE OR REPLACE TABLE {mart}.mart_district_rankings AS
+SELECT
+  m.district_id,
+  m.district_name,
+  rank() OVER (ORDER BY m.population DESC) AS rank_population,
+  rank() OVER (ORDER BY m.household_size DESC) AS rank_household_size,
+  rank() OVER (ORDER BY m.avg_rent) AS rank_rent_affordability,
+  rank() OVER (ORDER BY m.avg_price_m2) AS rank_house_price_affordability,
+  rank() OVER (ORDER BY m.green_area_m2 DESC) AS rank_total_green_area,
+  rank() OVER (ORDER BY m.bike_lane_km DESC) AS rank_total_bike_lane,
+  rank() OVER (ORDER BY m.pedestrian_length_m DESC) AS rank_total_pedestrian,
+  rank() OVER (ORDER BY s.green_per_capita_m2 DESC) AS rank_green_per_capita,
+  rank() OVER (ORDER BY s.bike_lane_density DESC) AS rank_bike_lane_density,
+  rank() OVER (ORDER BY s.pedestrian_length_density DESC) AS rank_pedestrian_density,
+  rank() OVER (ORDER BY s.total_pois / m.population DESC) AS rank_poi_per_capita,
+  rank() OVER (ORDER BY s.total_pois / m.area_km2 DESC) AS rank_poi_density,
+  rank() OVER (ORDER BY s.green_per_capita_m2 DESC) AS rank_environment,
+  rank() OVER (ORDER BY s.bike_lane_density + s.total_pois / m.area_km2 DESC) AS rank_mobility,
+  rank() OVER (ORDER BY m.avg_rent + m.avg_price_m2 / 100) AS rank_housing,
+  rank() OVER (ORDER BY s.green_per_capita_m2 + s.total_pois / m.area_km2 DESC) AS rank_overall
+FROM {mart}.mart_district_metrics m
+JOIN {mart}.mart_district_scores s USING (district_id);
+
+-- Hücre ön-agregasyonları: 10_cell_aggregates gibi yeşil alanlar 0.01° hücrelere kırpılır;
+-- parça alanı, alanın m² değerinin derece alanındaki payı (küçük parçalarda yeterli)
+CREATE OR REPLACE TABLE raw.cell_poi_counts AS
+SELECT
+  CAST(floor(lon / 0.01) AS INTEGER) AS cell_x,
+  CAST(floor(lat / 0.01) AS INTEGER) AS cell_y,
+  poi_type,
+  count(*) AS poi_count
+FROM raw.pois_pcd
+GROUP BY ALL;
+
+CREATE OR REPLACE TABLE raw.cell_pieces AS
+WITH xs AS (
+  SELECT
+    geom,
+    area_m2,
+    UNNEST(range(CAST(floor(ST_XMin(geom) / 0.01) AS INTEGER), CAST(floor(ST_XMax(geom) / 0.01) AS INTEGER) + 1)) AS cell_x,
+    CAST(floor(ST_YMin(geom) / 0.01) AS INTEGER) AS y0,
+    CAST(floor(ST_YMax(geom) / 0.01) AS INTEGER) AS y1
+  FROM raw.green_areas_pcd
+),
+cells AS (
+  SELECT geom, area_m2, cell_x, UNNEST(range(y0, y1 + 1)) AS cell_y
+  FROM xs
+),
+clipped AS (
+  SELECT
+    cell_x,
+    cell_y,
+    area_m2,
+    ST_Area(geom) AS full_area,
+    ST_Intersection(geom, ST_MakeEnvelope(cell_x * 0.01, cell_y * 0.01, (cell_x + 1) * 0.01, (cell_y + 1) * 0.01)) AS geom
+  FROM cells
+)
+SELECT
+  CAST(cell_x AS INTEGER) AS cell_x,
+  CAST(cell_y AS INTEGER) AS cell_y,
+  'green_area' AS layer,
+  geom,
+  area_m2 * ST_Area(geom) / full_area AS area_m2
+FROM clipped
+WHERE ST_Area(geom) > 0;
+
+CREATE OR REPLACE TABLE raw.cell_metrics AS
+SELECT
+  cell_x,
+  cell_y,
+  SUM(area_m2) AS green_area_m2,
+  0.0::DOUBLE AS bike_lane_km,
+  0.0::DOUBLE AS pedestrian_length_m
+FROM raw.cell_pieces
+GROUP BY cell_x, cell_y;
+
+-- Erişilebilirlik yüzeyi UTM dönüşümü ister; sentetik sette boş bırakılır
+CREATE OR REPLACE TABLE raw.accessibility_grid (
+  cell_x INTEGER, cell_y INTEGER, district_id INTEGER, poi_type VARCHAR, dist_m DOUBLE, geom GEOMETRY
+);
+CREATE OR REPLACE TABLE raw.district_accessibility (
+  district_id INTEGER, district_name VARCHAR, poi_type VARCHAR, cells INTEGER,
+  median_dist_m DOUBLE, p90_dist_m DOUBLE, share_within_500m DOUBLE, share_within_1000m DOUBLE,
+  population_within_500m DOUBLE, population_within_1000m DOUBLE
+);
+-- Üretilen POI'ler birbirinin kopyası değil; birleştirme kaydı yok
+CREATE OR REPLACE TABLE raw.poi_merges (
+  poi_id VARCHAR, member_poi_id VARCHAR, is_canonical BOOLEAN, source VARCHAR, name VARCHAR,
+  address_text VARCHAR, subtype VARCHAR, district_name VARCHAR, lon DOUBLE, lat DOUBLE,
+  distance_m DOUBLE, name_similarity DOUBLE, member_rank INTEGER
+);
+"""
+
+
+def write_duckdb(data_dir: Path, db_path: Path, mart_schema: str = "main_mart"):
+    import duckdb
+
+    poi_counts = ",\n  ".join(f"count(*) FILTER (WHERE p.poi_type = '{t}') AS {t}_count" for t in POI_TYPES)
+    sql = DUCKDB_SQL.format(dir=data_dir.as_posix(), mart=mart_schema, poi_counts=poi_counts)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    con = duckdb.connect(str(db_path))
+    try:
+        con.execute(sql)
+    finally:
+        con.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Istanbul dataset for benchmarks")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="medium")
+    parser.add_argument("--pois", type=int, help="override the POI count of --scale")
+    parser.add_argument("--green-areas", type=int, help="override the green area count of --scale")
+    parser.add_argument("--rag-notes", type=int, help="extra RAG documents beyond the per-district facts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", type=Path, help="output directory (default data/synthetic/<scale>)")
+    parser.add_argument("--duckdb", type=Path, help="also write the load_postgis.py source tables to this DuckDB file")
+    args = parser.parse_args()
+
+    scale = SCALES[args.scale]
+    out = args.out or Path("data/synthetic") / args.scale
+    manifest = generate(
+        out,
+        pois_n=args.pois if args.pois is not None else scale["pois"],
+        green_n=args.green_areas if args.green_areas is not None else scale["green_areas"],
+        rag_notes=args.rag_notes if args.rag_notes is not None else scale["rag_notes"],
+        seed=args.seed,
+    )
+    print(f"✅ {out}: {manifest['districts']} districts, {manifest['pois']} POIs, "
+          f"{manifest['green_areas']} green areas, {manifest['rag_docs']} RAG docs ({manifest['seconds']}s)")
+
+    if args.duckdb:
+        write_duckdb(out.resolve(), args.duckdb)
+        print(f"✅ DuckDB sources written to {args.duckdb}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+"""
+DuckDB pipeline runner.
+
+Runs the `transform/duckdb` stages against a single DuckDB database as a DAG
+instead of one `duckdb` CLI process per file:
+
+- Every statement is a node. Its output tables/views/macros and the
+  `raw.* / stg.* / util.*` relations it reads are inferred from the SQL, and
+  file inputs from the `'data/...'` paths it mentions.
+- Independent nodes (e.g. the materializations in 01_1) run in parallel on
+  cursors of the same connection.
+- A node is skipped when its SQL, its input files and everything upstream
+  are unchanged since the last successful run (content hashes are kept in
+  `util.pipeline_state`).
+- Timings and row counts of every run land in `util.pipeline_runs`.
+- A `.py` stage is a single node: it declares `READS` / `OUTPUTS` at module
+  level and its `run(cur)` is called with a cursor of the pipeline connection.
+
+Usage: python scripts/refresh_duckdb.py [--force] [--workers N] [--dry-run]
+"""
+import argparse
+import ast
+import hashlib
+import importlib.util
+import re
+import sys
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import duckdb
+
+DB_PATH = "data/interim/citistanbul.duckdb"
+SQL_DIR = Path("transform/duckdb")
+ROOT_SQL_DIR = Path(__file__).resolve().parents[1] / SQL_DIR
+
+STEPS = [
+    "01_setup.sql",
+    "01_1_materialize_data.sql",
+    "02_load_points.sql",
+    "03_normalize_points.sql",
+    "03_1_dedupe_points.py",
+    "04_load_districts.sql",
+    "04_1_subdivide_districts.sql",
+    "05_pois_with_district.sql",
+    "06_snap_missing_pois_step1.sql",
+    "06_snap_missing_pois_step2.sql",
+    "07_normalize_areas_lines.sql",
+    "08_agg_metrics.sql",
+    "09_accessibility_grid.py",
+    "09_1_district_accessibility.sql",
+    "10_cell_aggregates.sql",
+]
+
+# INSTALL/LOAD/SET/CREATE SCHEMA her cursor'da tekrar çalıştırılan oturum ayarları
+SESSION_RE = re.compile(r"^\s*(INSTALL|LOAD|SET|CREATE\s+SCHEMA)\b", re.IGNORECASE)
+OUTPUT_RE = re.compile(
+    r"CREATE\s+(?:OR\s+REPLACE\s+)?(TABLE|VIEW|MACRO)\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+\.\w+)",
+    re.IGNORECASE,
+)
+RELATION_RE = re.compile(r"\b((?:raw|stg|util)\.\w+)", re.IGNORECASE)
+FILE_RE = re.compile(r"'(data/[^']+)'")
+
+STATE_DDL = [
+    "CREATE SCHEMA IF NOT EXISTS util;",
+    """
+    CREATE TABLE IF NOT EXISTS util.pipeline_state (
+        step        VARCHAR PRIMARY KEY,
+        input_hash  VARCHAR,
+        finished_at TIMESTAMP
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS util.pipeline_runs (
+        run_id     VARCHAR,
+        step       VARCHAR,
+        status     VARCHAR,
+        started_at TIMESTAMP,
+        seconds    DOUBLE,
+        outputs    VARCHAR,
+        row_count  BIGINT,
+        error      VARCHAR
+    );
+    """,
+]
+
+
+@dataclass
+class Node:
+    name: str
+    file: str
+    sql: str
+    outputs: dict                                 # relation -> TABLE | VIEW | MACRO
+    reads: set
+    files: list
+    deps: set = field(default_factory=set)        # data dependencies (part of the hash)
+    after: set = field(default_factory=set)       # ordering only (write-after-read/write)
+    rewrites: set = field(default_factory=set)    # earlier writers of a table rewritten in place
+    externals: set = field(default_factory=set)   # relations read but written by no step
+    key: str = ""
+    script: Path | None = None                    # Python stage (run(cur) instead of sql)
+
+
+def split_statements(sql: str) -> list[str]:
+    """Splits a script on `;`, ignoring quoted strings and dropping `--` comments."""
+    statements, buf = [], []
+    in_quote = False
+    i, n = 0, len(sql)
+
+    while i < n:
+        c = sql[i]
+        if in_quote:
+            buf.append(c)
+            if c == "'":
+                in_quote = False
+        elif c == "'":
+            in_quote = True
+            buf.append(c)
+        elif sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        elif c == ";":
+            stmt = "".join(buf).strip()
+            if stmt:
+                statements.append(stmt)
+            buf = []
+        else:
+            buf.append(c)
+        i += 1
+
+    stmt = "".join(buf).strip()
+    if stmt:
+        statements.append(stmt)
+    return statements
+
+
+def python_step(path: Path) -> Node:
+    """A Python stage is one node; READS / OUTPUTS are read from the module without importing it."""
+    source = path.read_text()
+    declared = {}
+    for stmt in ast.parse(source).body:
+        if isinstance(stmt, ast.Assign) and len(stmt.targets) == 1:
+            target = stmt.targets[0]
+            if isinstance(target, ast.Name) and target.id in ("READS", "OUTPUTS"):
+                declared[target.id] = ast.literal_eval(stmt.value)
+
+    outputs = {rel.lower(): kind.upper() for rel, kind in declared.get("OUTPUTS", {}).items()}
+    reads = {rel.lower() for rel in declared.get("READS", [])}
+    name = f"{path.name}:{next(iter(outputs))}" if outputs else path.name
+    return Node(name, path.name, source, outputs, reads, [], script=path)
+
+
+def step_nodes(path: Path, session: list[str]):
+    """Yields the nodes of one stage; session statements are collected into `session`."""
+    if path.suffix == ".py":
+        yield python_step(path)
+        return
+
+    for i, stmt in enumerate(split_statements(path.read_text())):
+        if SESSION_RE.match(stmt):
+            if stmt not in session:
+                session.append(stmt)
+            continue
+
+        outputs = {m.group(2).lower(): m.group(1).upper() for m in OUTPUT_RE.finditer(stmt)}
+        refs = Counter(r.lower() for r in RELATION_RE.findall(stmt))
+        # CREATE OR REPLACE TABLE x AS ... FROM x: x hem okunur hem yazılır
+        reads = {r for r, count in refs.items() if count > (1 if r in outputs else 0)}
+
+        name = f"{path.name}:{next(iter(outputs))}" if outputs else f"{path.name}#{i}"
+        yield Node(name, path.name, stmt, outputs, reads, sorted(set(FILE_RE.findall(stmt))))
+
+
+def build_graph(sql_dir: Path, steps: list[str]):
+    session, nodes = [], []
+    last_writer, readers, view_reads = {}, {}, {}
+
+    for step in steps:
+        for i, node in enumerate(step_nodes(sql_dir / step, session)):
+            if any(n.name == node.name for n in nodes):
+                node.name = f"{node.name}#{i}"
+            outputs, reads = node.outputs, node.reads
+
+            # Views are evaluated lazily, so reading a view also reads what it reads
+            touched = set()
+            for rel in reads:
+                touched |= {rel} | view_reads.get(rel, set())
+
+            for rel in reads:
+                if rel in last_writer:
+                    node.deps.add(last_writer[rel])
+                else:
+                    node.externals.add(rel)
+            for rel in touched:
+                if rel in last_writer and rel not in reads:
+                    node.after.add(last_writer[rel])
+            for rel in outputs:
+                if rel in last_writer:
+                    node.after.add(last_writer[rel])
+                    if rel in reads:
+                        node.rewrites.add(last_writer[rel])
+                node.after |= readers.get(rel, set())
+            node.after -= node.deps | {node.name}
+
+            for rel in touched:
+                readers.setdefault(rel, set()).add(node.name)
+            for rel, kind in outputs.items():
+                last_writer[rel] = node.name
+                readers[rel] = set()
+                view_reads[rel] = touched if kind == "VIEW" else set()
+
+            nodes.append(node)
+
+    return session, nodes
+
+
+def file_digest(path: str, cache: dict) -> str:
+    if path not in cache:
+        p = Path(path)
+        if p.exists():
+            with p.open("rb") as f:
+                cache[path] = hashlib.file_digest(f, "sha256").hexdigest()
+        else:
+            cache[path] = "missing"
+    return cache[path]
+
+
+def relation_fingerprint(con, rel: str, cache: dict) -> str:
+    """Row count + order-independent row hash of a relation no step produces."""
+    if rel not in cache:
+        try:
+            row = con.execute(f"SELECT count(*), bit_xor(hash(COLUMNS(*))) FROM {rel}").fetchone()
+            cache[rel] = ",".join(str(v) for v in row)
+        except duckdb.Error:
+            cache[rel] = "missing"
+        if cache[rel] == "missing":
+            print(f"!!! {rel} is read but no step produces it and it does not exist", file=sys.stderr)
+        else:
+            print(f"!!! {rel} is read but no step produces it; using its current contents as input")
+    return cache[rel]
+
+
+def compute_keys(nodes: list[Node], con):
+    by_name, digests, fingerprints = {}, {}, {}
+    for node in nodes:
+        h = hashlib.sha256(node.sql.encode())
+        for path in node.files:
+            h.update(f"{path}={file_digest(path, digests)}".encode())
+        for rel in sorted(node.externals):
+            h.update(f"{rel}={relation_fingerprint(con, rel, fingerprints)}".encode())
+        for dep in sorted(node.deps):
+            h.update(by_name[dep].key.encode())
+        node.key = h.hexdigest()
+        by_name[node.name] = node
+
+
+def existing_relations(con) -> set:
+    rows = con.execute("""
+        SELECT schema_name || '.' || table_name FROM duckdb_tables()
+        UNION ALL
+        SELECT schema_name || '.' || view_name FROM duckdb_views()
+        UNION ALL
+        SELECT schema_name || '.' || function_name FROM duckdb_functions() WHERE function_type LIKE '%macro%'
+    """).fetchall()
+    return {r[0].lower() for r in rows}
+
+
+def plan(con, nodes: list[Node], force: bool) -> set:
+    state = dict(con.execute("SELECT step, input_hash FROM util.pipeline_state").fetchall())
+    existing = existing_relations(con)
+
+    dirty = {
+        n.name for n in nodes
+        if force or state.get(n.name) != n.key or any(o not in existing for o in n.outputs)
+    }
+
+    # Yerinde yeniden yazılan tablolar (raw.pois_pcd gibi) önceki yazarın çıktısına
+    # ihtiyaç duyar; aşağı akış da kirlenir.
+    changed = True
+    while changed:
+        changed = False
+        for n in nodes:
+            if n.name in dirty:
+                missing = n.rewrites - dirty
+                if missing:
+                    dirty |= missing
+                    changed = True
+            elif n.deps & dirty:
+                dirty.add(n.name)
+                changed = True
+
+    return dirty
+
+
+def execute_node(con, session: list[str], node: Node):
+    cur = con.cursor()
+    try:
+        for stmt in session:
+            if not stmt.upper().startswith("INSTALL"):
+                cur.execute(stmt)
+
+        started = time.time()
+        if node.script:
+            spec = importlib.util.spec_from_file_location(node.script.stem, node.script)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            module.run(cur)
+        else:
+            cur.execute(node.sql)
+        seconds = time.time() - started
+
+        row_count = None
+        tables = [rel for rel, kind in node.outputs.items() if kind == "TABLE"]
+        if tables:
+            row_count = cur.execute(f"SELECT count(*) FROM {tables[0]}").fetchone()[0]
+        return seconds, row_count
+    finally:
+        cur.close()
+
+
+def run(db_path: str, sql_dir: Path, steps: list[str], workers: int, force: bool, dry_run: bool) -> int:
+    session, nodes = build_graph(sql_dir, steps)
+
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    con = duckdb.connect(db_path)
+    for stmt in STATE_DDL + session:
+        con.execute(stmt)
+    compute_keys(nodes, con)
+
+    dirty = plan(con, nodes, force)
+    print(f">>> {len(nodes)} steps, {len(dirty)} to run, {len(nodes) - len(dirty)} unchanged")
+    if dry_run:
+        for n in nodes:
+            print(f"    {'run ' if n.name in dirty else 'skip'}  {n.name}")
+        return 0
+
+    run_id = uuid.uuid4().hex[:12]
+    by_name = {n.name: n for n in nodes}
+    done, failed = set(), None
+    pending = [n.name for n in nodes]
+
+    def log(name, status, started_at, seconds=None, row_count=None, error=None):
+        con.execute(
+            "INSERT INTO util.pipeline_runs VALUES (?, ?, ?, to_timestamp(?), ?, ?, ?, ?)",
+            [run_id, name, status, started_at, seconds, ",".join(by_name[name].outputs),
+             row_count, error],
+        )
+
+    total_started = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        running = {}
+        while pending or running:
+            if failed is None:
+                for name in list(pending):
+                    node = by_name[name]
+                    if not (node.deps | node.after) <= done:
+                        continue
+                    pending.remove(name)
+                    if name not in dirty:
+                        done.add(name)
+                        log(name, "skipped", time.time())
+                        continue
+                    print(f">>> Running {name}")
+                    running[pool.submit(execute_node, con, session, node)] = (name, time.time())
+            else:
+                pending.clear()
+
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, started_at = running.pop(future)
+                try:
+                    seconds, row_count = future.result()
+                except Exception as exc:
+                    failed = failed or name
+                    log(name, "failed", started_at, time.time() - started_at, error=str(exc))
+                    print(f"!!! {name} failed: {exc}", file=sys.stderr)
+                    continue
+
+                done.add(name)
+                con.execute(
+                    "INSERT OR REPLACE INTO util.pipeline_state VALUES (?, ?, now())",
+                    [name, by_name[name].key],
+                )
+                log(name, "ran", started_at, seconds, row_count)
+                rows = f", {row_count} rows" if row_count is not None else ""
+                print(f"    {name} ({seconds:.2f}s{rows})")
+
+    con.close()
+    status = "failed" if failed else "done"
+    print(f">>> Pipeline {status} in {time.time() - total_started:.2f}s (run {run_id})")
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the DuckDB transform pipeline.")
+    parser.add_argument("--db", default=DB_PATH, help="DuckDB database file")
+    parser.add_argument("--sql-dir", default=str(SQL_DIR), help="directory of the SQL stages")
+    parser.add_argument("--workers", type=int, default=4, help="parallel steps")
+    parser.add_argument("--force", action="store_true", help="ignore hashes and rerun every step")
+    parser.add_argument("--dry-run", action="store_true", help="only print what would run")
+    args = parser.parse_args()
+
+    sys.exit(run(args.db, Path(args.sql_dir), STEPS, args.workers, args.force, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,6 @@
 set -e  # hata olursa script dursun
 
-DB_PATH="data/interim/citistanbul.duckdb"
-
-STEPS=(
-  "01_setup.sql"
-  "01_1_materialize_data.sql"
-  "02_load_points.sql"
-  "03_normalize_points.sql"
-  "04_load_districts.sql"
-  "05_pois_with_district.sql"
-  "06_snap_missing_pois_step1.sql"
-  "06_snap_missing_pois_step2.sql"
-  "07_normalize_areas_lines.sql"
-  "08_agg_metrics.sql"
-)
-
-for step in "${STEPS[@]}"; do
-  echo ">>> Running $step"
-  duckdb $DB_PATH -c ".read transform/duckdb/$step"
-done
+# Adımlar artık scripts/refresh_duckdb.py içinde DAG olarak çalışıyor
+# (paralel adımlar + değişmeyen adımları atlama). Argümanlar aynen iletilir:
+#   bash scripts/refresh_duckdb.sh --force
+exec python scripts/refresh_duckdb.py "$@"
@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# scripts/, api/ ve ingest/load/ paket değil; testler modülleri doğrudan import ediyor
+for path in (ROOT / "scripts", ROOT / "api", ROOT / "ingest" / "load"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
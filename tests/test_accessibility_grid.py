@@ -0,0 +1,41 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+STEP = Path(__file__).resolve().parents[1] / "transform" / "duckdb" / "09_accessibility_grid.py"
+
+
+@pytest.fixture(scope="module")
+def step():
+    spec = importlib.util.spec_from_file_location("accessibility_grid", STEP)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_nearest_distances_match_brute_force(step):
+    rng = np.random.default_rng(0)
+    cells = rng.uniform(0, 20_000, size=(500, 2))
+    pois = {
+        "poi_type": np.array(["metro_station"] * 40 + ["health"] * 200, dtype=object),
+        "x_m": rng.uniform(0, 20_000, 240),
+        "y_m": rng.uniform(0, 20_000, 240),
+    }
+
+    result = dict(step.nearest_distances(cells, pois))
+    assert sorted(result) == ["health", "metro_station"]
+
+    for poi_type, dist in result.items():
+        mask = pois["poi_type"] == poi_type
+        xy = np.column_stack([pois["x_m"][mask], pois["y_m"][mask]])
+        brute = np.sqrt(((cells[:, None, :] - xy[None, :, :]) ** 2).sum(-1)).min(axis=1)
+        np.testing.assert_allclose(dist, brute)
+
+
+def test_step_declares_its_io(step):
+    assert step.OUTPUTS == {"raw.accessibility_grid": "TABLE"}
+    assert "raw.pois_pcd" in step.READS
@@ -0,0 +1,160 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+httpx = pytest.importorskip("httpx")
+
+from fastapi import FastAPI  # noqa: E402
+
+from app.admission import (  # noqa: E402
+    AdmissionMiddleware,
+    ClientGone,
+    Limiter,
+    Rejected,
+    TokenBuckets,
+    parse_limit,
+    remaining_seconds,
+)
+
+
+def test_parse_limit_overrides_defaults():
+    limit = parse_limit("concurrency=4, rate=0.5", {"concurrency": 2, "queue": 8, "timeout": 60})
+    assert limit == {"concurrency": 4.0, "queue": 8, "timeout": 60, "rate": 0.5}
+    with pytest.raises(ValueError):
+        parse_limit("threads=3", {})
+
+
+def test_token_bucket_refills_over_time():
+    buckets = TokenBuckets(rate=1.0, burst=2)
+    assert buckets.take("a", 0.0) == 0
+    assert buckets.take("a", 0.0) == 0
+    assert buckets.take("a", 0.0) == pytest.approx(1.0)
+    assert buckets.take("b", 0.0) == 0  # istemciler birbirinden bağımsız
+    assert buckets.take("a", 1.5) == 0
+
+
+def run_limiter(scenario):
+    return asyncio.run(scenario())
+
+
+def test_limiter_queues_then_sheds():
+    async def scenario():
+        limiter = Limiter("t", concurrency=1, queue=1, timeout=5)
+        never = asyncio.get_running_loop().create_future()
+        deadline = time.monotonic() + 5
+
+        await limiter.acquire("c", deadline, never)
+        queued = asyncio.ensure_future(limiter.acquire("c", deadline, never))
+        await asyncio.sleep(0)
+        with pytest.raises(Rejected) as exc:
+            await limiter.acquire("c", deadline, never)
+        assert exc.value.status == 503 and exc.value.retry_after > 0
+
+        limiter.release(0.1)
+        await queued  # slot sıradakine devredildi
+        assert limiter.active == 1
+        limiter.release(0.1)
+        assert limiter.active == 0
+        return limiter.stats
+
+    stats = run_limiter(scenario)
+    assert stats["admitted"] == 2 and stats["queue_full"] == 1
+
+
+def test_limiter_drops_expired_and_abandoned_waiters():
+    async def scenario():
+        limiter = Limiter("t", concurrency=1, queue=4, timeout=5)
+        loop = asyncio.get_running_loop()
+        never = loop.create_future()
+        await limiter.acquire("c", time.monotonic() + 5, never)
+
+        with pytest.raises(Rejected):
+            await limiter.acquire("c", time.monotonic() + 0.01, never)
+
+        gone = loop.create_future()
+        waiter = asyncio.ensure_future(limiter.acquire("c", time.monotonic() + 5, gone))
+        await asyncio.sleep(0)
+        gone.set_result({"type": "http.disconnect"})
+        with pytest.raises(ClientGone):
+            await waiter
+        assert not limiter.waiters
+        limiter.release()
+        return limiter
+
+    limiter = run_limiter(scenario)
+    assert limiter.active == 0
+    assert limiter.stats["expired"] == 1 and limiter.stats["abandoned"] == 1
+
+
+def test_cancelled_waiter_returns_a_handed_off_slot():
+    async def scenario():
+        limiter = Limiter("t", concurrency=1, queue=4, timeout=5)
+        never = asyncio.get_running_loop().create_future()
+        deadline = time.monotonic() + 5
+        await limiter.acquire("c", deadline, never)
+
+        first = asyncio.ensure_future(limiter.acquire("c", deadline, never))
+        second = asyncio.ensure_future(limiter.acquire("c", deadline, never))
+        await asyncio.sleep(0)
+
+        limiter.release(0.1)  # slot first'e devredildi, first henüz uyanmadı
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        await second  # iptal edilen first'ün slotu sıradakine geçer
+        assert limiter.active == 1
+        limiter.release(0.1)
+        return limiter
+
+    limiter = run_limiter(scenario)
+    assert limiter.active == 0 and not limiter.waiters
+
+
+def test_rate_limited_client_gets_429():
+    async def scenario():
+        limiter = Limiter("t", concurrency=4, queue=4, timeout=5, rate=0.5, burst=1)
+        never = asyncio.get_running_loop().create_future()
+        await limiter.acquire("c", time.monotonic() + 5, never)
+        limiter.release()
+        with pytest.raises(Rejected) as exc:
+            await limiter.acquire("c", time.monotonic() + 5, never)
+        return exc.value
+
+    rejected = run_limiter(scenario)
+    assert rejected.status == 429 and rejected.retry_after == pytest.approx(2.0, abs=0.1)
+
+
+def test_middleware_sheds_only_limited_route():
+    app = FastAPI()
+    limiter = Limiter("slow", concurrency=1, queue=1, timeout=5)
+    app.add_middleware(AdmissionMiddleware, limiters={("POST", "/slow"): limiter})
+
+    @app.post("/slow")
+    def slow(body: dict):
+        time.sleep(0.2)
+        return {"remaining": remaining_seconds(100), "body": body}
+
+    @app.get("/fast")
+    def fast():
+        return {"ok": True}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(
+                *[client.post("/slow", json={"i": i}, headers={"X-Request-Timeout": "2"}) for i in range(3)],
+                client.get("/fast"),
+            )
+
+    *slow_responses, fast_response = asyncio.run(scenario())
+    codes = sorted(r.status_code for r in slow_responses)
+    assert codes == [200, 200, 503]
+    shed = next(r for r in slow_responses if r.status_code == 503)
+    assert int(shed.headers["retry-after"]) >= 1
+
+    ok = [r.json() for r in slow_responses if r.status_code == 200]
+    assert {r["body"]["i"] for r in ok} <= {0, 1, 2}
+    assert all(r["remaining"] <= 2 for r in ok)  # istemci bütçesi deadline'a yansır
+    assert fast_response.status_code == 200
@@ -0,0 +1,55 @@
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import HTTPException  # noqa: E402
+
+from app.area_metrics import MAX_CELLS, area_geometry, bbox_polygon, cell_range  # noqa: E402
+
+
+def test_bbox_polygon_is_closed_ring():
+    ring = bbox_polygon(28.9, 41.0, 29.0, 41.1)["coordinates"][0]
+    assert ring[0] == ring[-1] == [28.9, 41.0]
+    assert len(ring) == 5
+
+
+def test_area_geometry_unwraps_feature():
+    polygon = bbox_polygon(28.9, 41.0, 29.0, 41.1)
+    assert area_geometry({"type": "Feature", "properties": {}, "geometry": polygon}) is polygon
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"type": "Point", "coordinates": [29.0, 41.0]},
+        {"type": "Feature", "geometry": None},
+        {"type": "Polygon", "coordinates": []},
+        [],
+    ],
+)
+def test_area_geometry_rejects_non_polygons(payload):
+    with pytest.raises(HTTPException) as exc:
+        area_geometry(payload)
+    assert exc.value.status_code == 400
+
+
+def test_cell_range_covers_multipolygon_bounds():
+    geometry = {
+        "type": "MultiPolygon",
+        "coordinates": [
+            bbox_polygon(28.905, 41.005, 28.915, 41.012)["coordinates"],
+            bbox_polygon(28.951, 41.031, 28.955, 41.035)["coordinates"],
+        ],
+    }
+    assert cell_range(geometry) == (2890, 2895, 4100, 4103)
+
+
+def test_cell_range_rejects_huge_areas():
+    side = int(MAX_CELLS ** 0.5) + 2
+    with pytest.raises(HTTPException):
+        cell_range(bbox_polygon(28.0, 40.0, 28.0 + side * 0.01, 40.0 + side * 0.01))
+
+
+def test_cell_range_rejects_bad_coordinates():
+    with pytest.raises(HTTPException):
+        cell_range({"type": "Polygon", "coordinates": [[["a", "b"]]]})
@@ -0,0 +1,133 @@
+import csv
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("pyarrow")
+
+import generate_synthetic_data as synthetic
+from app.main import decode_polyline, merge_search_results
+from app.utils import POI_LABELS
+from scripts import bench_hot_paths, bench_load
+from scripts.bench_report import compare, latency_summary, percentile
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    out = tmp_path_factory.mktemp("synthetic")
+    synthetic.generate(out, pois_n=3000, green_n=60, rag_notes=10, seed=3)
+    return out
+
+
+def read_csv(path):
+    with open(path, encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def inside(x, y, ring):
+    hit = False
+    for (x1, y1), (x2, y2) in zip(ring, ring[1:]):
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            hit = not hit
+    return hit
+
+
+def test_generator_is_reproducible(dataset, tmp_path):
+    synthetic.generate(tmp_path, pois_n=3000, green_n=60, rag_notes=10, seed=3)
+    for name in ("districts.csv", "pois.csv", "green_areas.csv", "district_metrics.csv"):
+        assert (tmp_path / name).read_bytes() == (dataset / name).read_bytes()
+
+
+def test_districts_tile_the_bounds(dataset):
+    districts = read_csv(dataset / "districts.csv")
+    assert len(districts) == 39
+    assert len({d["district_name"] for d in districts}) == 39
+
+    minx, miny, maxx, maxy = synthetic.BOUNDS
+    bounds = [[minx, miny], [maxx, miny], [maxx, maxy], [minx, maxy], [minx, miny]]
+    total = sum(
+        synthetic.ring_area_m2(json.loads(d["geometry"])["coordinates"][0][0]) for d in districts
+    )
+    # Ortak kenarlar: boşluk ya da örtüşme yoksa alanlar sınır kutusuna toplanır
+    assert total == pytest.approx(synthetic.ring_area_m2(bounds), rel=0.01)
+
+
+def test_pois_fall_inside_their_district(dataset):
+    rings = {
+        d["district_id"]: json.loads(d["geometry"])["coordinates"][0][0]
+        for d in read_csv(dataset / "districts.csv")
+    }
+    pois = read_csv(dataset / "pois.csv")
+    assert len(pois) == 3000
+    assert {p["poi_type"] for p in pois} <= set(POI_LABELS)
+    assert len({p["poi_id"] for p in pois}) == len(pois)
+    assert all(inside(float(p["lon"]), float(p["lat"]), rings[p["district_id"]]) for p in pois)
+
+
+def test_rag_knowledge_matches_the_metadata_schema(dataset):
+    import pyarrow.parquet as pq
+
+    docs = pq.read_table(dataset / "rag_knowledge.parquet")
+    assert docs.column_names == ["doc_id", "district_id", "district_name", "doc_type", "metric_key", "text"]
+    manifest = json.loads((dataset / "manifest.json").read_text())
+    assert docs.num_rows == manifest["rag_docs"]
+    texts = docs.column("text").to_pylist()
+    assert any("ilçesinin toplam nüfusu" in t for t in texts)
+
+
+def test_encode_polyline_round_trips():
+    coords = [[28.97953, 41.01513], [28.98012, 41.01499], [29.00001, 40.99], [28.5, 41.2]]
+    assert decode_polyline(bench_hot_paths.encode_polyline(coords)) == coords
+
+
+def test_merge_search_results_sorts_by_score():
+    district_hits = [{"_score": 2.0, "_source": {"district_id": 1, "district_name": "Fatih"}}]
+    poi_hits = [
+        {"_score": s, "_source": {"poi_id": f"p{s}", "name": "x", "poi_type": "kiosk", "district_name": "Fatih"}}
+        for s in (1.0, 3.0)
+    ]
+    results = merge_search_results(district_hits, poi_hits)
+    assert [r["score"] for r in results] == [3.0, 2.0, 1.0]
+    assert results[1]["type"] == "district"
+
+
+def test_hot_paths_run_on_the_dataset(dataset):
+    results = bench_hot_paths.run(dataset, only=["parse_bbox", "search/merge", "nearby"], min_time=0.01)
+    assert set(results) == {"parse_bbox", "search/merge", "search/merge_render", "geojson/nearby_100"}
+    for r in results.values():
+        assert r["ops_per_s"] > 0
+        assert r["p50_ms"] <= r["p95_ms"] <= r["p99_ms"]
+        assert r["peak_kb"] >= 0
+
+
+def test_percentiles_are_nearest_rank():
+    values = [i / 1000 for i in range(1, 101)]
+    assert percentile(values, 50) == 0.05
+    assert percentile(values, 99) == 0.099
+    summary = latency_summary(reversed(values))
+    assert (summary["count"], summary["p95_ms"], summary["max_ms"]) == (100, 95.0, 100.0)
+
+
+def test_compare_flags_regressions():
+    base = {"results": {"a": {"ops_per_s": 100.0, "p99_ms": 10.0}, "gone": {"ops_per_s": 1.0}}}
+    new = {"results": {"a": {"ops_per_s": 95.0, "p99_ms": 13.0}, "added": {"ops_per_s": 1.0}}}
+    rows = {(name, metric): regressed for name, metric, *_, regressed in compare(base, new, threshold=10)}
+    assert rows == {("a", "ops_per_s"): False, ("a", "p99_ms"): True}
+
+
+def test_load_queries_and_recorder(dataset):
+    queries = bench_load.Queries(dataset, seed=1)
+    for scenario in bench_load.SCENARIOS:
+        label, method, path, params, body = bench_load.pick(queries, scenario)()
+        assert path.startswith("/") and method in ("GET", "POST")
+
+    recorder = bench_load.Recorder()
+    for i in range(10):
+        recorder.add("/poi", 200 if i < 9 else 500, 0.001 * (i + 1), 100)
+    recorder.add("/search", "ReadTimeout", 5.0)
+    results = recorder.results(elapsed=2.0)
+    assert results["/poi"]["error_rate"] == 0.1
+    assert results["/poi"]["p50_ms"] == 5.0
+    assert results["total"]["count"] == 11
+    assert results["total"]["statuses"] == {"200": 9, "500": 1, "ReadTimeout": 1}
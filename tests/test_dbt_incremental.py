@@ -0,0 +1,105 @@
+from pathlib import Path
+
+import pytest
+
+jinja2 = pytest.importorskip("jinja2")
+duckdb = pytest.importorskip("duckdb")
+
+DBT = Path(__file__).resolve().parents[1] / "transform" / "dbt"
+
+
+def render(model: str, incremental: bool) -> str:
+    """Renders a staging model with the repo macros and a minimal dbt context."""
+    macros = (DBT / "macros" / "incremental.sql").read_text()
+    body = (DBT / "models" / "stg" / f"{model}.sql").read_text()
+    env = jinja2.Environment()
+    return env.from_string(macros + body).render(
+        config=lambda **kw: "",
+        source=lambda schema, table: f"{schema}.{table}",
+        is_incremental=lambda: incremental,
+        this=model,
+    )
+
+
+def touched(con, model: str) -> set:
+    return {r[0] for r in con.execute(f"SELECT DISTINCT district_id FROM {model}_delta").fetchall()}
+
+
+def run_stage(con, model: str, key: str):
+    """First run creates the model; later runs compute the delta and delete+insert it."""
+    exists = con.execute(
+        "SELECT count(*) FROM information_schema.tables WHERE table_name = ?", [model]
+    ).fetchone()[0]
+    if not exists:
+        con.execute(f"CREATE TABLE {model} AS {render(model, False)}")
+        con.execute(f"CREATE OR REPLACE TABLE {model}_delta AS SELECT * FROM {model}")
+        return
+    con.execute(f"CREATE OR REPLACE TABLE {model}_delta AS {render(model, True)}")
+    con.execute(f"DELETE FROM {model} WHERE {key} IN (SELECT {key} FROM {model}_delta)")
+    con.execute(f"INSERT INTO {model} BY NAME SELECT * FROM {model}_delta")
+
+
+def write_pois(con, jitter: float = 0.0):
+    # 03 her çalıştırmada updated_at = now() yazar
+    con.execute(
+        f"""
+        CREATE OR REPLACE TABLE raw.pois_pcd AS
+        SELECT * FROM (VALUES
+          ('p1', 'Kadıköy İskele', 'bus_stop', 'iett_bus_stops', NULL, 'Rıhtım Cd.', 'Kadıköy', 22, 29.02::DOUBLE + {jitter}, 40.99::DOUBLE),
+          ('p2', 'Moda', 'kiosk', 'ibb_kiosks', NULL, NULL, 'Kadıköy', 22, 29.03, 40.98),
+          ('p3', 'Taksim', 'metro_station', 'ibb_metro', 'M2', NULL, 'Beyoğlu', 7, 28.98, 41.03)
+        ) t(poi_id, name, poi_type, source, subtype, address_text, district_name, district_id, lon, lat),
+        LATERAL (SELECT now() + INTERVAL (random() * 1000) SECOND AS updated_at)
+        """
+    )
+
+
+def write_green_areas(con, noise: float = 0.0):
+    # 07 alanı parçalardan SUM ve ST_Union_Agg ile yeniden kurar: son haneler ve geometri oynar
+    con.execute(
+        f"""
+        CREATE OR REPLACE TABLE raw.green_areas_pcd AS
+        SELECT * FROM (VALUES
+          ('g1', 'Yoğurtçu Parkı', NULL, 'Kadıköy', 22, 18250.37::DOUBLE + {noise}, 'ibb_parks', 'park'),
+          ('g2', 'Maçka Parkı', NULL, 'Şişli', 31, 95012.11 - {noise}, 'ibb_parks', 'park')
+        ) t(area_id, name, subtype, district_name, district_id, area_m2, source, poi_type),
+        LATERAL (SELECT random()::VARCHAR AS geom)
+        """
+    )
+
+
+@pytest.fixture
+def con():
+    con = duckdb.connect()
+    con.execute("CREATE SCHEMA raw")
+    yield con
+    con.close()
+
+
+def test_unchanged_pois_touch_no_district(con):
+    write_pois(con)
+    run_stage(con, "stg_pois", "poi_id")
+    assert touched(con, "stg_pois") == {7, 22}
+
+    write_pois(con)
+    run_stage(con, "stg_pois", "poi_id")
+    assert touched(con, "stg_pois") == set()
+
+    write_pois(con, jitter=0.001)
+    run_stage(con, "stg_pois", "poi_id")
+    assert touched(con, "stg_pois") == {22}
+    assert con.execute("SELECT count(*) FROM stg_pois").fetchone()[0] == 3
+
+
+def test_reaggregated_areas_touch_no_district(con):
+    write_green_areas(con)
+    run_stage(con, "stg_green_areas", "row_hash")
+    assert touched(con, "stg_green_areas") == {22, 31}
+
+    write_green_areas(con, noise=1e-9)
+    run_stage(con, "stg_green_areas", "row_hash")
+    assert touched(con, "stg_green_areas") == set()
+
+    write_green_areas(con, noise=12.0)
+    run_stage(con, "stg_green_areas", "row_hash")
+    assert touched(con, "stg_green_areas") == {22, 31}
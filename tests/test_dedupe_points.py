@@ -0,0 +1,124 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+duckdb = pytest.importorskip("duckdb")
+
+import refresh_duckdb as runner  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[1]
+STEP = ROOT / "transform" / "duckdb" / "03_1_dedupe_points.py"
+
+
+@pytest.fixture(scope="module")
+def step():
+    spec = importlib.util.spec_from_file_location("dedupe_points", STEP)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def con():
+    con = duckdb.connect()
+    con.execute("CREATE SCHEMA raw; CREATE SCHEMA util;")
+    # Yalnızca isim makroları; spatial gerektiren kısımlar atlanır
+    for stmt in runner.split_statements((ROOT / "transform" / "duckdb" / "01_setup.sql").read_text()):
+        if "util.tr_fold(s)" in stmt or "util.poi_name_key(name)" in stmt:
+            con.execute(stmt)
+    yield con
+    con.close()
+
+
+def test_name_key_folds_turkish_and_drops_type_words(con):
+    rows = con.execute(
+        """
+        SELECT util.poi_name_key(n) FROM (VALUES
+          ('Kadıköy İskele Durağı'), ('KADIKÖY İSKELE'), ('İskele (Kadıköy)'),
+          ('Bağdat Caddesi Şarj İstasyonu'), ('Bağdat Cd.'), ('Metro'), (NULL)
+        ) t(n)
+        """
+    ).fetchall()
+    assert [r[0] for r in rows] == [
+        "kadikoy iskele", "kadikoy iskele", "iskele kadikoy", "bagdat cad", "bagdat cad", "", "",
+    ]
+
+
+def test_cluster_pairs_merges_in_distance_order(step):
+    x = np.array([0.0, 10.0, 500.0, 5.0])
+    y = np.zeros(4)
+    roots = step.cluster_pairs(4, np.array([0, 0]), np.array([3, 1]), np.array([40.0, 40.0]), x, y)
+    assert roots[0] == roots[1] == roots[3]
+    assert roots[2] == 2
+
+
+def test_cluster_pairs_does_not_chain_far_points(step):
+    # 0-1-2-3 her biri 30 m arayla: çiftler tek tek yarıçap içinde; 60 m'lik küme
+    # (1.5 x 40) 3'ü alamaz
+    x = np.array([0.0, 30.0, 60.0, 90.0])
+    y = np.zeros(4)
+    a, b = np.array([0, 1, 2]), np.array([1, 2, 3])
+    roots = step.cluster_pairs(4, a, b, np.full(3, 40.0), x, y)
+    assert roots[0] == roots[1] == roots[2]
+    assert roots[3] == 3
+
+
+def build_points(con, step, pois):
+    """raw.pois_pcd + dedupe_points without spatial: x/y are given in metres."""
+    con.execute(
+        """
+        CREATE TABLE raw.pois_pcd (
+          poi_id VARCHAR, name VARCHAR, poi_type VARCHAR, source VARCHAR, subtype VARCHAR,
+          address_text VARCHAR, district_name VARCHAR, lon DOUBLE, lat DOUBLE, x_m DOUBLE, y_m DOUBLE
+        )
+        """
+    )
+    con.executemany("INSERT INTO raw.pois_pcd VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", pois)
+    points_sql = step.POINTS_SQL.replace("util.to_metric(p.geom)", "{'x': p.x_m, 'y': p.y_m}")
+    points_sql = points_sql.replace("ST_X(geom_m)", "geom_m.x").replace("ST_Y(geom_m)", "geom_m.y")
+    con.execute(points_sql.replace("p.geom IS NOT NULL", "p.x_m IS NOT NULL"))
+
+
+POIS = [
+    # poi_id, name, poi_type, source, subtype, address, district, lon, lat, x, y
+    ("a", "Kadıköy İskele Durağı", "bus_stop", "iett_bus_stops", "3", None, "Kadıköy", 29.02, 40.99, 0, 0),
+    ("b", "KADIKÖY İSKELE", "bus_stop", "osm", "3", "Rıhtım Cd.", "Kadıköy", 29.02, 40.99, 12, 5),
+    ("c", "Kadıköy İskele", "bus_stop", "iett_bus_stops", "4", None, "Kadıköy", 29.02, 40.99, -30, 0),
+    ("d", "Moda Sahil", "bus_stop", "osm", "3", None, "Kadıköy", 29.02, 40.98, 15, 10),
+    ("e", "Kadıköy İskele", "kiosk", "ibb_kiosks", None, None, "Kadıköy", 29.02, 40.99, 3, 0),
+    ("f", "Kadıköy İskele", "bus_stop", "osm", "3", None, "Kadıköy", 29.03, 40.99, 300, 0),
+]
+
+
+def test_pairs_respect_type_radius_name_and_subtype(con, step):
+    build_points(con, step, POIS)
+    idx = dict(con.execute("SELECT poi_id, idx FROM dedupe_points").fetchall())
+    pairs = con.execute(step.PAIRS_SQL).fetchall()
+    found = {(a, b) for a, b, *_ in pairs}
+    # a-b: aynı isim anahtarı, farklı kaynak; a-c aynı kaynak ama farklı yön (subtype),
+    # b-c yarıçap dışı; d farklı isim, e farklı tip, f çok uzak
+    assert found == {(idx["a"], idx["b"])}
+
+
+def test_merges_keep_official_source_and_fill_gaps(con, step):
+    build_points(con, step, POIS)
+    clusters = {"idx": np.array([0, 1], dtype=np.int32), "cluster": np.array([0, 0], dtype=np.int32)}  # noqa: F841
+    con.execute(step.MERGES_SQL)
+    con.execute(step.APPLY_SQL)
+
+    merges = con.execute(
+        "SELECT poi_id, member_poi_id, is_canonical, distance_m FROM raw.poi_merges ORDER BY member_rank"
+    ).fetchall()
+    assert merges == [("a", "a", True, 0.0), ("a", "b", False, 13.0)]
+
+    pois = dict(con.execute("SELECT poi_id, address_text FROM raw.pois_pcd").fetchall())
+    assert set(pois) == {"a", "c", "d", "e", "f"}
+    assert pois["a"] == "Rıhtım Cd."
+
+
+def test_step_declares_its_io(step):
+    assert step.OUTPUTS == {"raw.pois_pcd": "TABLE", "raw.poi_merges": "TABLE"}
+    assert "raw.pois_pcd" in step.READS
+    assert "util.poi_name_key" in step.READS
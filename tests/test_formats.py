@@ -0,0 +1,97 @@
+import io
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pytest.importorskip("fastapi")
+pytest.importorskip("psycopg2")
+
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from fastapi import HTTPException
+
+from app import formats
+from app.formats import ARROW, FLATGEOBUF, GEOJSON, PARQUET, negotiate_format
+
+
+@pytest.mark.parametrize("fmt, accept, expected", [
+    (None, None, GEOJSON),
+    (None, "*/*", GEOJSON),
+    ("FlatGeobuf", None, FLATGEOBUF),
+    ("geoparquet", "application/flatgeobuf", PARQUET),
+    (None, "application/vnd.apache.arrow.stream", ARROW),
+    (None, "text/html, application/flatgeobuf", FLATGEOBUF),
+    (None, "application/flatgeobuf;q=0.1, application/json", GEOJSON),
+    (None, "application/json;q=0.5, application/x-parquet;q=0.9", PARQUET),
+    (None, "application/flatgeobuf;q=0", GEOJSON),
+])
+def test_negotiate_format(fmt, accept, expected):
+    assert negotiate_format(fmt, accept) == expected
+
+
+def test_negotiate_format_rejects_unknown_format():
+    with pytest.raises(HTTPException) as exc:
+        negotiate_format("shapefile", None)
+    assert exc.value.status_code == 400
+
+
+def test_layer_schema_geoparquet_metadata():
+    schema = formats._layer_schema(formats.POI_COLUMNS, ["Point"], geoparquet=True)
+    assert schema.names == [name for name, _ in formats.POI_COLUMNS] + ["geometry"]
+    assert schema.field("geometry").metadata[b"ARROW:extension:name"] == b"geoarrow.wkb"
+
+    import json
+    geo = json.loads(schema.metadata[b"geo"])
+    assert geo["primary_column"] == "geometry"
+    assert geo["columns"]["geometry"] == {"encoding": "WKB", "geometry_types": ["Point"]}
+
+
+def test_layer_schema_arrow_has_no_geo_metadata():
+    schema = formats._layer_schema(formats.DISTRICT_COLUMNS, ["MultiPolygon"])
+    assert schema.metadata is None
+
+
+def make_batches(schema, sizes):
+    # POINT(29 41) WKB
+    wkb = bytes.fromhex("01010000000000000000003d400000000000804440")
+    batches = []
+    for n in sizes:
+        batches.append(pa.RecordBatch.from_arrays(
+            [pa.array([f"id{i}" for i in range(n)])]
+            + [pa.array([None] * n, type=pa.string())] * 5
+            + [pa.array([wkb] * n, type=pa.binary())],
+            schema=schema,
+        ))
+    return batches
+
+
+def test_encode_arrow_stream_round_trip():
+    schema = formats._layer_schema(formats.POI_COLUMNS, ["Point"])
+    chunks = list(formats._encode(iter(make_batches(schema, [3, 2])), lambda s: ipc.new_stream(s, schema)))
+
+    assert len(chunks) >= 2  # her batch ayrı parça olarak akıyor
+    table = ipc.open_stream(b"".join(chunks)).read_all()
+    assert table.num_rows == 5
+    assert table.schema.equals(schema)
+
+
+def test_encode_parquet_round_trip():
+    schema = formats._layer_schema(formats.POI_COLUMNS, ["Point"], geoparquet=True)
+    data = b"".join(formats._encode(
+        iter(make_batches(schema, [4, 1])),
+        lambda s: pq.ParquetWriter(s, schema, compression="zstd"),
+    ))
+
+    parquet = pq.ParquetFile(io.BytesIO(data))
+    assert parquet.metadata.num_rows == 5
+    assert parquet.metadata.num_row_groups == 2
+    assert b"geo" in parquet.schema_arrow.metadata
+
+
+def test_bad_format_returns_400():
+    main = pytest.importorskip("app.main")
+    from fastapi.testclient import TestClient
+
+    client = TestClient(main.app)
+    res = client.get("/poi", params={"poi_type": "museum", "format": "shapefile"})
+    assert res.status_code == 400
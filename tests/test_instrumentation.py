@@ -0,0 +1,122 @@
+import re
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("psycopg2")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app import instrumentation  # noqa: E402
+from app.instrumentation import (  # noqa: E402
+    InstrumentationMiddleware,
+    Registry,
+    SlowRequestSampler,
+    normalize_statement,
+)
+
+
+@pytest.mark.parametrize(
+    "sql, label",
+    [
+        ("SELECT poi_id FROM city.pois WHERE poi_type = %s;", "SELECT city.pois"),
+        ("\n  SELECT 1;", "SELECT"),
+        (b"WITH area AS (SELECT 1) SELECT * FROM area JOIN city.cell_metrics m USING (cell_x)", "WITH city.cell_metrics"),
+        ("INSERT INTO city.data_version (id) VALUES (true)", "INSERT city.data_version"),
+    ],
+)
+def test_normalize_statement(sql, label):
+    assert normalize_statement(sql) == label
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    for value in (0.002, 0.02, 0.02, 50):
+        registry.observe("http_request_duration_seconds", value, route="/poi")
+    registry.inc("cache_requests_total", cache="poi_index", result="hit")
+    text = registry.render()
+
+    assert '# TYPE http_request_duration_seconds histogram' in text
+    assert 'http_request_duration_seconds_bucket{route="/poi",le="0.0025"} 1' in text
+    assert 'http_request_duration_seconds_bucket{route="/poi",le="0.025"} 3' in text
+    assert 'http_request_duration_seconds_bucket{route="/poi",le="+Inf"} 4' in text
+    assert 'http_request_duration_seconds_count{route="/poi"} 4' in text
+    assert 'cache_requests_total{cache="poi_index",result="hit"} 1' in text
+
+
+def test_gauges_are_grouped_per_metric():
+    registry = Registry()
+    registry.add_collector(lambda: [("a", {"x": 1}, 1), ("b", {"x": 1}, 2), ("a", {"x": 2}, 3)])
+    names = [line.split("{")[0] for line in registry.render().splitlines() if not line.startswith("#")]
+    assert names == ["a", "a", "b"]
+
+
+def test_middleware_records_route_template_and_size(monkeypatch):
+    registry = Registry()
+    monkeypatch.setattr(instrumentation, "registry", registry)
+
+    app = FastAPI()
+    app.add_middleware(InstrumentationMiddleware, sampler=None)
+
+    @app.get("/poi/{poi_id}")
+    def poi(poi_id: str):
+        return {"poi_id": poi_id}
+
+    client = TestClient(app)
+    client.get("/poi/a")
+    client.get("/poi/b")
+    client.get("/nope")
+
+    text = registry.render()
+    assert re.search(r'http_request_duration_seconds_count\{method="GET",route="/poi/\{poi_id\}",status="200"\} 2', text)
+    assert 'route="unmatched",status="404"' in text
+    assert re.search(r'http_response_size_bytes_sum\{method="GET",route="/poi/\{poi_id\}"\} \d+', text)
+
+
+def test_slow_request_sampler_reports_app_frames(monkeypatch):
+    monkeypatch.setattr(instrumentation, "SLOW_REQUEST_SECONDS", 0.05)
+    # Gerçekte yalnızca app/ altındaki çerçeveler tutulur; testte en içteki fonksiyon yeter
+    monkeypatch.setattr(instrumentation, "_app_stack", lambda frame: (frame.f_code.co_name,))
+    reports = []
+    sampler = SlowRequestSampler(interval=0.005, hook=lambda route, elapsed, stacks: reports.append(stacks))
+
+    started = sampler.start()
+    done = threading.Event()
+    threading.Thread(target=lambda: done.wait(0.2), daemon=True).start()
+    time.sleep(0.1)
+    sampler.finish("GET /slow", started, 0.1)
+    done.set()
+
+    assert len(reports) == 1 and isinstance(reports[0], Counter)
+    assert sum(reports[0].values()) > 0
+    assert sampler.samples == []  # uçuşta istek kalmayınca örnekler bırakılır
+
+
+def test_admission_rejections_are_recorded_per_route(monkeypatch):
+    from app.admission import AdmissionMiddleware, Limiter
+
+    registry = Registry()
+    monkeypatch.setattr(instrumentation, "registry", registry)
+
+    limiters = {("GET", "/search"): Limiter("search", concurrency=1, queue=1, timeout=5, rate=0.01, burst=1)}
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware, limiters=limiters)
+    app.add_middleware(InstrumentationMiddleware, sampler=None, known_paths=limiters)
+
+    @app.get("/search")
+    def search():
+        return {"results": []}
+
+    client = TestClient(app)
+    assert client.get("/search").status_code == 200
+    assert client.get("/search").status_code == 429
+    client.get("/nope")
+
+    text = registry.render()
+    assert 'http_request_duration_seconds_count{method="GET",route="/search",status="200"} 1' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="/search",status="429"} 1' in text
+    assert 'route="unmatched",status="404"' in text
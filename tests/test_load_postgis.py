@@ -0,0 +1,57 @@
+import struct
+
+import pytest
+
+pytest.importorskip("psycopg2")
+pytest.importorskip("duckdb")
+
+import load_postgis as loader  # noqa: E402
+
+
+def test_in_schema_rewrites_only_city_references():
+    sql = "CREATE SCHEMA IF NOT EXISTS city;\nCREATE TABLE city.pois (city TEXT);"
+    assert loader.in_schema(sql, "city_load") == (
+        "CREATE SCHEMA IF NOT EXISTS city_load;\nCREATE TABLE city_load.pois (city TEXT);"
+    )
+
+
+def test_ewkb_adds_srid():
+    wkb = struct.pack("<BIdd", 1, 1, 29.0, 41.0)
+    out = loader.ewkb(wkb)
+    order, geom_type, srid = struct.unpack("<BII", out[:9])
+    assert (order, geom_type, srid) == (1, 0x20000001, 4326)
+    assert out[9:] == wkb[5:]
+
+
+def test_source_query_casts_and_dedupes():
+    columns = [
+        ("district_id", "integer"),
+        ("area_m2", "double precision"),
+        ("geom", "geometry(MultiPolygon,4326)"),
+    ]
+    sql, encoders = loader.source_query(columns, "raw.green_areas_pcd", ["district_id"])
+    assert "CAST(district_id AS INTEGER)" in sql
+    assert "ST_AsWKB(ST_Multi(ST_CollectionExtract(geom, 3)))::BLOB" in sql
+    assert "PARTITION BY district_id" in sql
+    assert encoders[-1] is loader.ewkb
+
+    sql, _ = loader.source_query([("geom", "geometry(Point,4326)")], "raw.pois_pcd", [])
+    assert "ST_AsWKB(geom)::BLOB" in sql
+
+
+def test_copy_stream_is_valid_binary_copy():
+    encoders = [loader.PG_TYPES["integer"][1], loader.PG_TYPES["text"][1]]
+    stream = loader.CopyStream(loader.copy_rows(iter([(7, "Kadıköy"), (8, None)]), encoders))
+
+    data = b""
+    while chunk := stream.read(5):
+        data += chunk
+
+    assert data.startswith(loader.COPY_HEADER)
+    body = data[len(loader.COPY_HEADER):]
+    assert body.endswith(loader.COPY_TRAILER)
+
+    name = "Kadıköy".encode("utf-8")
+    first = struct.pack(">hii", 2, 4, 7) + struct.pack(">i", len(name)) + name
+    second = struct.pack(">hii", 2, 4, 8) + b"\xff\xff\xff\xff"
+    assert body[: -len(loader.COPY_TRAILER)] == first + second
@@ -0,0 +1,102 @@
+import math
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("psycopg2")
+
+from app.poi_index import PoiIndex, haversine_m  # noqa: E402
+
+TYPES = ["bus_stop", "kiosk", "toilet"]
+
+
+@pytest.fixture(scope="module")
+def index():
+    rng = random.Random(1)
+    rows = [
+        (f"p{i}", f"POI {i}", rng.choice(TYPES), None, f"D{i % 5}", None,
+         rng.uniform(28.9, 29.1), rng.uniform(40.95, 41.1))
+        for i in range(3000)
+    ]
+    return PoiIndex(rows, version=3)
+
+
+def brute_distances(index, lon, lat):
+    return haversine_m(lon, lat, index.lon, index.lat)
+
+
+def test_haversine_one_degree_latitude():
+    d = haversine_m(29.0, 41.0, np.array([29.0]), np.array([42.0]))[0]
+    assert d == pytest.approx(111_195, rel=1e-3)
+
+
+def test_radius_matches_brute_force(index):
+    lon, lat, r = 29.01, 41.02, 800
+    got = index.radius(lon, lat, r, "kiosk", limit=10_000)
+
+    dist = brute_distances(index, lon, lat)
+    expected = {
+        index.poi_id[i] for i in range(index.size)
+        if dist[i] <= r and index.types[index.type_code[i]] == "kiosk"
+    }
+    assert {row["poi_id"] for row in got} == expected
+    assert [row["distance_m"] for row in got] == sorted(row["distance_m"] for row in got)
+
+
+def test_bbox_matches_brute_force(index):
+    box = (28.98, 41.0, 29.03, 41.04)
+    got = index.bbox(*box, poi_type="BUS_STOP")
+    expected = {
+        index.poi_id[i] for i in range(index.size)
+        if box[0] <= index.lon[i] <= box[2] and box[1] <= index.lat[i] <= box[3]
+        and index.types[index.type_code[i]] == "bus_stop"
+    }
+    assert {row["poi_id"] for row in got} == expected
+
+
+@pytest.mark.parametrize("point", [(29.0, 41.0), (28.9, 40.95), (29.3, 41.3)])
+def test_nearest_matches_brute_force(index, point):
+    lon, lat = point
+    got = index.nearest(lon, lat, k=7)
+    dist = brute_distances(index, lon, lat)
+    expected = [index.poi_id[i] for i in np.argsort(dist, kind="stable")[:7]]
+    assert [row["poi_id"] for row in got] == expected
+
+
+def test_unknown_type_is_empty(index):
+    assert index.radius(29.0, 41.0, 5000, "museum") == []
+    assert index.nearest(29.0, 41.0, 3, "museum") == []
+
+
+def test_strings_are_interned(index):
+    assert sorted(index.types) == TYPES
+    assert len(index.districts) == 5
+    assert index.type_code.dtype == np.int16
+    assert math.isclose(index.row(0)["lon"], float(index.lon[0]))
+
+
+def destination(lon, lat, bearing_deg, d):
+    """Point d meters from (lon, lat) along a great circle (same sphere as haversine_m)."""
+    from app.poi_index import EARTH_RADIUS_M
+
+    phi, lam, theta, delta = math.radians(lat), math.radians(lon), math.radians(bearing_deg), d / EARTH_RADIUS_M
+    phi2 = math.asin(math.sin(phi) * math.cos(delta) + math.cos(phi) * math.sin(delta) * math.cos(theta))
+    lam2 = lam + math.atan2(
+        math.sin(theta) * math.sin(delta) * math.cos(phi), math.cos(delta) - math.sin(phi) * math.sin(phi2)
+    )
+    return math.degrees(lam2), math.degrees(phi2)
+
+
+# POI bir hücre sınırının hemen ötesinde, merkezden r - 1 m: aday kutusu kısa kalırsa hücresi hiç taranmaz
+@pytest.mark.parametrize("bearing", [90, 0, 45, 225])
+def test_radius_keeps_poi_just_inside_at_box_edge(bearing):
+    r = 1000
+    east, north = bearing in (90, 45), bearing in (0, 45)
+    poi = (29.02 + (1e-9 if east else -1e-9), 41.03 + (1e-9 if north else -1e-9))
+    lon, lat = destination(*poi, (bearing + 180) % 360, r - 1)
+    assert haversine_m(lon, lat, np.array([poi[0]]), np.array([poi[1]]))[0] == pytest.approx(r - 1, abs=1e-3)
+
+    index = PoiIndex([("edge", "Edge", "kiosk", None, "D", None, *poi)])
+    assert [row["poi_id"] for row in index.radius(lon, lat, r)] == ["edge"]
+    assert [row["poi_id"] for row in index.nearest(lon, lat, k=1)] == ["edge"]
@@ -0,0 +1,251 @@
+import pytest
+
+duckdb = pytest.importorskip("duckdb")
+
+import refresh_duckdb as runner
+
+
+def write_steps(tmp_path, files):
+    sql_dir = tmp_path / "sql"
+    sql_dir.mkdir()
+    for name, sql in files.items():
+        (sql_dir / name).write_text(sql)
+    return sql_dir, list(files)
+
+
+def nodes_by_name(sql_dir, steps):
+    _, nodes = runner.build_graph(sql_dir, steps)
+    return {n.name: n for n in nodes}
+
+
+def test_split_statements_ignores_quotes_and_comments():
+    sql = """
+    -- header; not a statement
+    CREATE TABLE raw.a AS SELECT 'x;y' AS s;  -- trailing; comment
+    CREATE TABLE raw.b AS SELECT 'it''s' AS s
+    """
+    assert runner.split_statements(sql) == [
+        "CREATE TABLE raw.a AS SELECT 'x;y' AS s",
+        "CREATE TABLE raw.b AS SELECT 'it''s' AS s",
+    ]
+
+
+def test_session_statements_are_not_nodes(tmp_path):
+    sql_dir, steps = write_steps(tmp_path, {
+        "01.sql": "INSTALL spatial; LOAD spatial; CREATE SCHEMA IF NOT EXISTS raw;",
+    })
+    session, nodes = runner.build_graph(sql_dir, steps)
+    assert session == ["INSTALL spatial", "LOAD spatial", "CREATE SCHEMA IF NOT EXISTS raw"]
+    assert nodes == []
+
+
+def test_in_place_rewrites_chain_to_previous_writer(tmp_path):
+    # raw.pois_pcd 03, 05 ve 06_step2'de yerinde yeniden yazılıyor
+    sql_dir, steps = write_steps(tmp_path, {
+        "03.sql": "CREATE OR REPLACE TABLE raw.pois_pcd AS SELECT * FROM raw.poi_points_raw;",
+        "05.sql": "CREATE OR REPLACE TABLE raw.pois_pcd AS SELECT * FROM raw.pois_pcd p;",
+        "06_1.sql": "CREATE OR REPLACE TABLE raw.pois_snapped AS SELECT poi_id FROM raw.pois_pcd;",
+        "06_2.sql": """
+            CREATE OR REPLACE TABLE raw.pois_pcd AS
+            SELECT * FROM raw.pois_pcd p LEFT JOIN raw.pois_snapped s USING (poi_id);
+        """,
+    })
+    nodes = nodes_by_name(sql_dir, steps)
+
+    first = nodes["03.sql:raw.pois_pcd"]
+    assert first.reads == {"raw.poi_points_raw"}
+    assert first.externals == {"raw.poi_points_raw"}
+
+    second = nodes["05.sql:raw.pois_pcd"]
+    assert second.deps == {"03.sql:raw.pois_pcd"}
+    assert second.rewrites == {"03.sql:raw.pois_pcd"}
+
+    snapped = nodes["06_1.sql:raw.pois_snapped"]
+    assert snapped.deps == {"05.sql:raw.pois_pcd"}
+
+    third = nodes["06_2.sql:raw.pois_pcd"]
+    assert third.deps == {"05.sql:raw.pois_pcd", "06_1.sql:raw.pois_snapped"}
+    assert third.rewrites == {"05.sql:raw.pois_pcd"}
+
+
+def test_writer_waits_for_readers_of_view(tmp_path):
+    sql_dir, steps = write_steps(tmp_path, {
+        "01.sql": "CREATE OR REPLACE TABLE raw.t AS SELECT 1 AS x;",
+        "02.sql": """
+            CREATE OR REPLACE VIEW raw.v AS SELECT * FROM raw.t;
+            CREATE OR REPLACE TABLE raw.out AS SELECT * FROM raw.v;
+            CREATE OR REPLACE TABLE raw.t AS SELECT 2 AS x;
+        """,
+    })
+    nodes = nodes_by_name(sql_dir, steps)
+    assert "02.sql:raw.out" in nodes["02.sql:raw.t"].after
+
+
+def test_duplicate_outputs_get_unique_names(tmp_path):
+    sql_dir, steps = write_steps(tmp_path, {
+        "01.sql": """
+            CREATE OR REPLACE TABLE raw.t AS SELECT 1 AS x;
+            CREATE OR REPLACE TABLE raw.t AS SELECT x + 1 AS x FROM raw.t;
+        """,
+    })
+    nodes = nodes_by_name(sql_dir, steps)
+    assert set(nodes) == {"01.sql:raw.t", "01.sql:raw.t#1"}
+    assert nodes["01.sql:raw.t#1"].deps == {"01.sql:raw.t"}
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "a.csv").write_text("x\n1\n2\n")
+    sql_dir, steps = write_steps(tmp_path, {
+        "01.sql": """
+            CREATE SCHEMA IF NOT EXISTS raw;
+            CREATE OR REPLACE TABLE raw.a_src AS SELECT * FROM read_csv('data/a.csv');
+            CREATE OR REPLACE TABLE raw.pts AS SELECT x FROM raw.a_src;
+        """,
+        "02.sql": """
+            CREATE OR REPLACE TABLE raw.pts AS SELECT x * 10 AS x FROM raw.pts;
+            CREATE OR REPLACE TABLE raw.total AS SELECT sum(x) AS s FROM raw.pts;
+        """,
+    })
+    db = str(tmp_path / "t.duckdb")
+
+    def run(force=False):
+        assert runner.run(db, sql_dir, steps, 2, force, False) == 0
+        con = duckdb.connect(db)
+        total = con.execute("SELECT s FROM raw.total").fetchone()[0]
+        last = con.execute("""
+            SELECT step, status FROM util.pipeline_runs
+            WHERE run_id = (SELECT run_id FROM util.pipeline_runs ORDER BY started_at DESC LIMIT 1)
+        """).fetchall()
+        con.close()
+        return total, dict(last)
+
+    return tmp_path, sql_dir, run
+
+
+def test_noop_run_skips_everything(pipeline):
+    _, _, run = pipeline
+    assert run()[0] == 30
+    total, status = run()
+    assert total == 30
+    assert set(status.values()) == {"skipped"}
+
+
+def test_changed_file_reruns_downstream(pipeline):
+    tmp_path, _, run = pipeline
+    run()
+    (tmp_path / "data" / "a.csv").write_text("x\n1\n2\n3\n")
+    total, status = run()
+    assert total == 60
+    assert set(status.values()) == {"ran"}
+
+
+def test_in_place_step_change_reruns_previous_writer(pipeline):
+    _, sql_dir, run = pipeline
+    run()
+    step = sql_dir / "02.sql"
+    step.write_text(step.read_text().replace("x * 10", "x * 100"))
+
+    total, status = run()
+    # 02 raw.pts'i yerinde yazdığı için 01'deki yazar da yeniden çalışmalı
+    assert total == 300
+    assert status["01.sql:raw.a_src"] == "skipped"
+    assert status["01.sql:raw.pts"] == "ran"
+    assert status["02.sql:raw.pts"] == "ran"
+    assert status["02.sql:raw.total"] == "ran"
+
+
+def test_external_relation_changes_are_detected(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db = str(tmp_path / "t.duckdb")
+    con = duckdb.connect(db)
+    con.execute("CREATE SCHEMA raw; CREATE TABLE raw.bus_stops_src AS SELECT 1 AS x")
+    con.close()
+    sql_dir, steps = write_steps(tmp_path, {
+        "02.sql": "CREATE OR REPLACE TABLE raw.bus_stops AS SELECT * FROM raw.bus_stops_src;",
+    })
+
+    assert runner.run(db, sql_dir, steps, 1, False, False) == 0
+    con = duckdb.connect(db)
+    con.execute("INSERT INTO raw.bus_stops_src VALUES (2)")
+    con.close()
+    assert runner.run(db, sql_dir, steps, 1, False, False) == 0
+
+    con = duckdb.connect(db)
+    assert con.execute("SELECT count(*) FROM raw.bus_stops").fetchone()[0] == 2
+    con.close()
+
+
+def test_python_step_runs_with_declared_io(tmp_path):
+    sql_dir, steps = write_steps(tmp_path, {
+        "01.sql": "CREATE SCHEMA IF NOT EXISTS raw; CREATE OR REPLACE TABLE raw.t AS SELECT range AS x FROM range(3);",
+        "02.py": (
+            'READS = ["raw.t"]\n'
+            'OUTPUTS = {"raw.doubled": "TABLE"}\n'
+            "def run(cur):\n"
+            "    xs = [r[0] * 2 for r in cur.execute('SELECT x FROM raw.t').fetchall()]\n"
+            "    cur.execute('CREATE OR REPLACE TABLE raw.doubled AS SELECT unnest(?) AS x', [xs])\n"
+        ),
+        "03.sql": "CREATE OR REPLACE TABLE raw.total AS SELECT sum(x) AS s FROM raw.doubled;",
+    })
+    nodes = nodes_by_name(sql_dir, steps)
+    step = nodes["02.py:raw.doubled"]
+    assert step.deps == {"01.sql:raw.t"}
+    assert nodes["03.sql:raw.total"].deps == {step.name}
+
+    db = str(tmp_path / "p.duckdb")
+    assert runner.run(db, sql_dir, steps, 2, False, False) == 0
+    con = duckdb.connect(db)
+    assert con.execute("SELECT s FROM raw.total").fetchone()[0] == 6
+    con.close()
+
+
+def test_repository_pipeline_graph():
+    _, nodes = runner.build_graph(runner.ROOT_SQL_DIR, runner.STEPS)
+    by_name = {n.name: n for n in nodes}
+
+    parts = by_name["04_1_subdivide_districts.sql:raw.district_parts"]
+    assert "04_load_districts.sql:raw.dim_district" in parts.deps
+    assert "01_setup.sql:util.cell_envelope" in parts.deps
+
+    # 05: ilçe ataması parça/hücre indeksi üzerinden
+    assert parts.name in by_name["05_pois_with_district.sql:raw.pois_pcd"].deps
+
+    snap = by_name["06_snap_missing_pois_step1.sql:raw.pois_snapped"]
+    assert parts.name in snap.deps
+    assert "05_pois_with_district.sql:raw.pois_pcd" in snap.deps
+
+    # raw.pois_pcd: 03 -> 03_1 -> 05 -> 06_step2 zinciri
+    step2 = by_name["06_snap_missing_pois_step2.sql:raw.pois_pcd"]
+    assert step2.rewrites == {"05_pois_with_district.sql:raw.pois_pcd"}
+    assert by_name["05_pois_with_district.sql:raw.pois_pcd"].rewrites == {
+        "03_1_dedupe_points.py:raw.pois_pcd"
+    }
+    dedupe = by_name["03_1_dedupe_points.py:raw.pois_pcd"]
+    assert dedupe.rewrites == {"03_normalize_points.sql:raw.pois_pcd"}
+    assert "01_setup.sql:util.poi_name_key" in dedupe.deps
+
+    # 07: üç katmanın overlay'i birbirinden bağımsız (paralel çalışabilir)
+    overlay = by_name["07_normalize_areas_lines.sql:util.district_overlay"]
+    assert parts.name in overlay.deps
+    pieces = [
+        by_name[f"07_normalize_areas_lines.sql:raw.{t}"]
+        for t in ("green_area_pieces", "bike_lane_pieces", "pedestrian_area_pieces")
+    ]
+    for node in pieces:
+        assert overlay.name in node.deps
+        assert not {p.name for p in pieces} & node.deps
+    assert pieces[0].name in by_name["07_normalize_areas_lines.sql:raw.green_areas_pcd"].deps
+
+    # 09: Python adımı beyan ettiği girdilere bağlanır
+    grid = by_name["09_accessibility_grid.py:raw.accessibility_grid"]
+    assert grid.script is not None
+    assert {parts.name, "06_snap_missing_pois_step2.sql:raw.pois_pcd"} <= grid.deps
+    assert grid.name in by_name["09_1_district_accessibility.sql:raw.district_accessibility"].deps
+
+    # 10: hücre agregasyonları 07 parçalarından ve son POI tablosundan beslenir
+    cell_metrics = by_name["10_cell_aggregates.sql:raw.cell_metrics"]
+    assert {p.name for p in pieces} <= cell_metrics.deps
+    assert step2.name in by_name["10_cell_aggregates.sql:raw.cell_poi_counts"].deps
@@ -0,0 +1,75 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("psycopg2")
+pytest.importorskip("elasticsearch")
+
+API_DIR = Path(__file__).resolve().parents[1] / "api"
+
+
+def test_app_import_does_not_load_ml_stack():
+    # Temiz süreçte: app.main import'u torch/faiss/sentence-transformers yüklememeli
+    code = (
+        "import sys, app.main; "
+        "print(','.join(m for m in ('torch', 'faiss', 'sentence_transformers', 'pandas') if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=API_DIR, capture_output=True, text=True, check=True,
+    )
+    assert out.stdout.strip() == ""
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app import main, rag
+
+    monkeypatch.setattr(rag, "_components", None)
+    monkeypatch.setattr(rag, "warm_up_async", lambda: None)
+    return main, TestClient(main.app)
+
+
+def test_rag_query_returns_503_until_models_load(client):
+    _, c = client
+    res = c.post("/rag/query", json={"question": "Kadıköy'de kaç park var?"})
+    assert res.status_code == 503
+    assert res.headers["retry-after"]
+
+
+def test_ready_reports_components(client, monkeypatch):
+    main, c = client
+    monkeypatch.setattr(main, "check_db", lambda: None)
+    monkeypatch.setattr(main, "check_es", lambda: (_ for _ in ()).throw(ConnectionError("down")))
+
+    res = c.get("/ready")
+    assert res.status_code == 200
+    components = res.json()["components"]
+    assert components["db"]["ready"] is True
+    assert components["es"] == {"ready": False, "error": "down", "latency_ms": components["es"]["latency_ms"]}
+    assert components["rag"]["ready"] is False
+
+
+def test_ready_is_503_without_db(client, monkeypatch):
+    main, c = client
+    monkeypatch.setattr(main, "check_db", lambda: (_ for _ in ()).throw(ValueError("no db")))
+    monkeypatch.setattr(main, "check_es", lambda: None)
+    assert c.get("/ready").status_code == 503
+
+
+def test_ready_times_out_on_a_hanging_db(client, monkeypatch):
+    main, c = client
+    monkeypatch.setattr(main, "READY_TIMEOUT_SECONDS", 0.2)
+    monkeypatch.setattr(main, "check_db", lambda: time.sleep(2))
+    monkeypatch.setattr(main, "check_es", lambda: None)
+
+    started = time.perf_counter()
+    res = c.get("/ready")
+    assert time.perf_counter() - started < 1.5
+    assert res.status_code == 503
+    assert res.json()["components"]["db"]["error"] == "timed out after 0.2s"
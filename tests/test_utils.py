@@ -0,0 +1,24 @@
+import pytest
+
+pytest.importorskip("fastapi")
+
+from app.utils import CLUSTER_MAX_LEVEL, cluster_level, parse_bbox  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "zoom, level",
+    [(5, CLUSTER_MAX_LEVEL), (8, 5), (10, 3), (11, 2), (13, 0), (18, 0)],
+)
+def test_cluster_level(zoom, level):
+    assert cluster_level(zoom) == level
+
+
+def test_cluster_level_coarsens_as_zoom_drops():
+    levels = [cluster_level(z / 2) for z in range(30, 0, -1)]
+    assert levels == sorted(levels)
+
+
+def test_parse_bbox_rejects_inverted_box():
+    with pytest.raises(Exception) as exc:
+        parse_bbox("29.1,41.0,28.9,41.1")
+    assert exc.value.status_code == 400
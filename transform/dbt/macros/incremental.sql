@@ -0,0 +1,79 @@
+{#
+  Satır içeriğinin hash'i. columns verilirse yalnızca o (kararlı) kolonlar/ifadeler,
+  verilmezse satırın tamamı struct olarak metne çevrilip md5'i alınır.
+#}
+{% macro row_hash(alias, columns=none) -%}
+{%- if columns -%}
+md5(CAST([{% for c in columns %}CAST({{ c }} AS VARCHAR){% if not loop.last %}, {% endif %}{% endfor %}] AS VARCHAR))
+{%- else -%}
+md5(CAST({{ alias }} AS VARCHAR))
+{%- endif -%}
+{%- endmacro %}
+
+
+{#
+  Değişiklik yakalayan staging gövdesi (incremental, delete+insert, unique_key = key).
+  Yeni/değişen satırlar ve kaynaktan silinen satırlar için tombstone (is_deleted) yazar;
+  prev_district_id, ilçesi değişen satırın eski ilçesini de "dokunulmuş" saydırır.
+  hash_columns: değişiklik sayılan iş kolonları; her çalıştırmada değişen alanlar
+  (updated_at, parçalardan yeniden birleştirilen geom, float toplamların son haneleri)
+  dışarıda bırakılır ya da yuvarlanır, yoksa her satır her seferinde "değişmiş" görünür.
+#}
+{% macro incremental_stage(source_relation, key, hash_columns) %}
+WITH src AS (
+    SELECT s.*, {{ row_hash('s', hash_columns) }} AS row_hash
+    FROM {{ source_relation }} s
+)
+{% if is_incremental() %}
+, cur AS (
+    SELECT DISTINCT {{ key }}{% if key != 'row_hash' %}, row_hash{% endif %}, district_id, is_deleted
+    FROM {{ this }}
+)
+
+SELECT
+    s.*,
+    false AS is_deleted,
+    c.district_id AS prev_district_id,
+    current_timestamp AS dbt_loaded_at
+FROM src s
+LEFT JOIN cur c USING ({{ key }})
+WHERE c.{{ key }} IS NULL
+   OR c.is_deleted
+   OR c.row_hash <> s.row_hash
+
+UNION ALL BY NAME
+
+SELECT t.* REPLACE (
+    true AS is_deleted,
+    t.district_id AS prev_district_id,
+    current_timestamp AS dbt_loaded_at
+)
+FROM {{ this }} t
+ANTI JOIN src s USING ({{ key }})
+WHERE NOT t.is_deleted
+{% else %}
+SELECT
+    s.*,
+    false AS is_deleted,
+    CAST(NULL AS INTEGER) AS prev_district_id,
+    current_timestamp AS dbt_loaded_at
+FROM src s
+{% endif %}
+{% endmacro %}
+
+
+{# Modelin son yazdığı satırın zamanı; ilk çalıştırmada her şey "yeni" sayılır #}
+{% macro watermark() -%}
+COALESCE((SELECT max(dbt_updated_at) FROM {{ this }}), TIMESTAMPTZ '1970-01-01')
+{%- endmacro %}
+
+
+{# Verilen staging modellerinde watermark'tan sonra değişen satırların (eski ve yeni) ilçeleri #}
+{% macro touched_districts(relations) %}
+{% for rel in relations %}
+SELECT district_id FROM {{ rel }} WHERE dbt_loaded_at > {{ watermark() }}
+UNION
+SELECT prev_district_id FROM {{ rel }} WHERE dbt_loaded_at > {{ watermark() }} AND prev_district_id IS NOT NULL
+{% if not loop.last %}UNION{% endif %}
+{% endfor %}
+{% endmacro %}
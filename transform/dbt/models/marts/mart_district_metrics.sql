@@ -1,8 +1,25 @@
-WITH g AS (
+{{ config(materialized='incremental', unique_key='district_id', incremental_strategy='delete+insert') }}
+
+-- Artımlı çalışmada alan/çizgi toplamları yalnızca staging'de satırı değişen ilçeler
+-- için yeniden hesaplanır; diğer ilçeler mevcut toplamlarını korur.
+WITH touched AS (
+{% if is_incremental() %}
+    {{ touched_districts([ref('stg_green_areas'), ref('stg_bike_lanes'), ref('stg_pedestrian_areas')]) }}
+    UNION
+    -- mart'ta henüz olmayan ilçeler
+    SELECT district_id FROM {{ ref('stg_district_metrics') }} ANTI JOIN {{ this }} USING (district_id)
+{% else %}
+    SELECT district_id FROM {{ ref('stg_districts') }}
+{% endif %}
+),
+
+g AS (
     SELECT
         district_id,
         ROUND(SUM(area_m2), 2) AS green_area_m2
     FROM {{ ref('stg_green_areas') }}
+    WHERE NOT is_deleted
+      AND district_id IN (SELECT district_id FROM touched)
     GROUP BY district_id
 ),
 
@@ -11,6 +28,8 @@ b AS (
         district_id,
         ROUND(SUM(length_km), 2) AS bike_lane_km
     FROM {{ ref('stg_bike_lanes') }}
+    WHERE NOT is_deleted
+      AND district_id IN (SELECT district_id FROM touched)
     GROUP BY district_id
 ),
 
@@ -19,6 +38,8 @@ p AS (
         district_id,
         ROUND(SUM(length_m), 2) AS pedestrian_length_m
     FROM {{ ref('stg_pedestrian_areas') }}
+    WHERE NOT is_deleted
+      AND district_id IN (SELECT district_id FROM touched)
     GROUP BY district_id
 ),
 
@@ -30,16 +51,41 @@ m AS (
           3
         ) AS area_km2
     FROM {{ ref('stg_districts') }}
+),
+
+metrics AS (
+    SELECT
+        d.*,
+{% if is_incremental() %}
+        CASE WHEN t.district_id IS NULL THEN prev.green_area_m2 ELSE g.green_area_m2 END AS green_area_m2,
+        CASE WHEN t.district_id IS NULL THEN prev.bike_lane_km ELSE b.bike_lane_km END AS bike_lane_km,
+        CASE WHEN t.district_id IS NULL THEN prev.pedestrian_length_m ELSE p.pedestrian_length_m END AS pedestrian_length_m,
+{% else %}
+        g.green_area_m2,
+        b.bike_lane_km,
+        p.pedestrian_length_m,
+{% endif %}
+        m.area_km2
+    FROM {{ ref('stg_district_metrics') }} d
+    LEFT JOIN g USING (district_id)
+    LEFT JOIN b USING (district_id)
+    LEFT JOIN p USING (district_id)
+    LEFT JOIN m USING (district_id)
+{% if is_incremental() %}
+    LEFT JOIN (SELECT DISTINCT district_id FROM touched) t USING (district_id)
+    LEFT JOIN {{ this }} prev USING (district_id)
+{% endif %}
+),
+
+hashed AS (
+    SELECT *, {{ row_hash('metrics') }} AS metrics_hash
+    FROM metrics
 )
 
-SELECT
-    d.*,
-    g.green_area_m2,
-    b.bike_lane_km,
-    p.pedestrian_length_m,
-    m.area_km2
-FROM {{ ref('stg_district_metrics') }} d
-LEFT JOIN g USING (district_id)
-LEFT JOIN b USING (district_id)
-LEFT JOIN p USING (district_id)
-LEFT JOIN m USING (district_id)
+-- Yalnızca değeri gerçekten değişen ilçeler yazılır (sonraki martlar bunları izler)
+SELECT h.*, current_timestamp AS dbt_updated_at
+FROM hashed h
+{% if is_incremental() %}
+LEFT JOIN {{ this }} prev USING (district_id)
+WHERE prev.metrics_hash IS DISTINCT FROM h.metrics_hash
+{% endif %}
@@ -1,3 +1,5 @@
+{{ config(materialized='incremental', unique_key='district_id', incremental_strategy='delete+insert') }}
+
 with ranked as (
     select
         m.district_id,
@@ -18,6 +20,12 @@ with ranked as (
     join {{ ref('mart_district_scores') }} s using (district_id)
 ),
 
+-- sıralamalar tüm ilçelere bağlı: girdilerin tamamının hash'i değişmedikçe yeniden yazılmaz
+inputs as (
+    select md5(string_agg(cast(r as varchar), '|' order by r.district_id)) as inputs_hash
+    from ranked r
+),
+
 base_rankings as (
     select
         district_id,
@@ -65,5 +73,12 @@ final as (
     from composite
 )
 
-select *
-from final
+select
+    f.*,
+    i.inputs_hash,
+    current_timestamp as dbt_updated_at
+from final f
+cross join inputs i
+{% if is_incremental() %}
+where i.inputs_hash is distinct from (select max(inputs_hash) from {{ this }})
+{% endif %}
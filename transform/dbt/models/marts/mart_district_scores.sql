@@ -1,8 +1,23 @@
-WITH poi_count AS (
+{{ config(materialized='incremental', unique_key='district_id', incremental_strategy='delete+insert') }}
+
+-- Artımlı çalışmada yalnızca POI'si değişen veya metrikleri güncellenen ilçeler
+WITH touched AS (
+{% if is_incremental() %}
+    {{ touched_districts([ref('stg_pois')]) }}
+    UNION
+    SELECT district_id FROM {{ ref('mart_district_metrics') }} WHERE dbt_updated_at > {{ watermark() }}
+{% else %}
+    SELECT district_id FROM {{ ref('mart_district_metrics') }}
+{% endif %}
+),
+
+poi_count AS (
     SELECT
         district_id,
         COUNT(*) AS total_pois
     FROM {{ ref('stg_pois') }}
+    WHERE NOT is_deleted
+      AND district_id IN (SELECT district_id FROM touched)
     GROUP BY district_id
 )
 
@@ -12,6 +27,9 @@ SELECT
     ROUND(coalesce(m.green_area_m2,0) / nullif(coalesce(m.population,0),0), 3) AS green_per_capita_m2,
     ROUND(coalesce(m.bike_lane_km,0) / nullif(coalesce(m.area_km2,0),0), 3) AS bike_lane_density,
     ROUND((coalesce(m.pedestrian_length_m,0) / 1000.0) / nullif(coalesce(m.area_km2,0),0), 3) AS pedestrian_length_density,
-    p.total_pois
+    -- POI'si kalmayan ilçe 0 ile yazılır (eski satır artımlı modda silinemez)
+    coalesce(p.total_pois, 0) AS total_pois,
+    current_timestamp AS dbt_updated_at
 FROM {{ ref('mart_district_metrics') }} m
-JOIN poi_count p USING (district_id)
+LEFT JOIN poi_count p USING (district_id)
+WHERE m.district_id IN (SELECT district_id FROM touched)
@@ -1,17 +1,29 @@
-with poi_counts as (
+{{ config(materialized='incremental', unique_key='district_id', incremental_strategy='delete+insert') }}
+
+-- Artımlı çalışmada yalnızca POI'si değişen ilçeler (eski ve yeni ilçe) yeniden sayılır
+with touched as (
+{% if is_incremental() %}
+    {{ touched_districts([ref('stg_pois')]) }}
+{% else %}
+    select district_id from {{ ref('stg_districts') }}
+{% endif %}
+),
+
+poi_counts as (
     select
         district_id,
-        district_name,
         poi_type,
         count(*) as poi_count
     from {{ ref('stg_pois') }}
-    group by district_id, district_name, poi_type
+    where not is_deleted
+      and district_id in (select district_id from touched)
+    group by district_id, poi_type
 )
 
 select
-    district_id,
-    district_name,
-    sum(poi_count) as total_pois,
+    d.district_id,
+    d.district_name,
+    coalesce(sum(poi_count), 0) as total_pois,
     sum(case when poi_type = 'metro_station' then poi_count else 0 end) as metro_station_count,
     sum(case when poi_type = 'bus_stop' then poi_count else 0 end) as bus_stop_count,
     sum(case when poi_type = 'tram_station' then poi_count else 0 end) as tram_station_count,
@@ -23,5 +35,9 @@ select
     sum(case when poi_type = 'museum' then poi_count else 0 end) as museum_count,
     sum(case when poi_type = 'theater' then poi_count else 0 end) as theater_count,
     sum(case when poi_type = 'toilet' then poi_count else 0 end) as toilet_count,
-from poi_counts
-group by district_id, district_name
+    current_timestamp as dbt_updated_at
+-- POI'si kalmayan ilçe 0 sayılarla yazılır (eski satır artımlı modda silinemez)
+from {{ ref('stg_districts') }} d
+left join poi_counts c using (district_id)
+where d.district_id in (select district_id from touched)
+group by d.district_id, d.district_name
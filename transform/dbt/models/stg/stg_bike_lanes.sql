@@ -1 +1,6 @@
-SELECT * FROM {{ source('raw', 'bike_lanes_pcd') }}
+{{ config(materialized='incremental', unique_key='row_hash', incremental_strategy='delete+insert') }}
+-- area_id (isim|tip|kaynak|ilçe md5) benzersiz değil: satırlar içerik hash'iyle izlenir
+
+{{ incremental_stage(source('raw', 'bike_lanes_pcd'), 'row_hash', [
+    'area_id', 'name', 'subtype', 'source', 'poi_type', 'district_id', 'round(length_km, 4)',
+]) }}
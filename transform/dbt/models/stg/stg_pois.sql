@@ -1 +1,6 @@
-SELECT * FROM {{ source('raw', 'pois_pcd') }}
+{{ config(materialized='incremental', unique_key='poi_id', incremental_strategy='delete+insert') }}
+
+{{ incremental_stage(source('raw', 'pois_pcd'), 'poi_id', [
+    'poi_id', 'name', 'poi_type', 'subtype', 'source', 'address_text', 'district_id',
+    'round(lon, 6)', 'round(lat, 6)',
+]) }}
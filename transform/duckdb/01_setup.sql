@@ -6,3 +6,32 @@ LOAD spatial;
 CREATE SCHEMA IF NOT EXISTS raw;      -- dış dosyadan ST_Read ile gelenler
 CREATE SCHEMA IF NOT EXISTS stg;      -- normalize edilmiş staging
 CREATE SCHEMA IF NOT EXISTS util;     -- küçük yardımcı görünümler vs.
+
+-- Ortak grid: 0.01° hücreler (İstanbul'da ~840 m x 1.1 km).
+-- İlçe parçalama, yakın komşu aramaları ve hücre bazlı agregasyonlar bunu kullanır.
+CREATE OR REPLACE MACRO util.cell_x(lon) AS CAST(floor(lon / 0.01) AS INTEGER);
+CREATE OR REPLACE MACRO util.cell_y(lat) AS CAST(floor(lat / 0.01) AS INTEGER);
+CREATE OR REPLACE MACRO util.cell_key(cx, cy) AS CAST(cx AS BIGINT) * 100000 + cy;
+CREATE OR REPLACE MACRO util.cell_id(lon, lat) AS util.cell_key(util.cell_x(lon), util.cell_y(lat));
+CREATE OR REPLACE MACRO util.cell_envelope(cx, cy) AS
+  ST_MakeEnvelope(cx * 0.01, cy * 0.01, (cx + 1) * 0.01, (cy + 1) * 0.01);
+
+-- Metrik projeksiyon (UTM 35N, metre); always_xy: girdiler lon/lat sırasında
+CREATE OR REPLACE MACRO util.to_metric(g) AS ST_Transform(g, 'EPSG:4326', 'EPSG:32635', true);
+
+-- Türkçe isim anahtarı (yakın kopya POI eşleştirmesi için): İ/I'yı Türkçe kurala göre
+-- küçültür, aksanları ve ı'yı ASCII'ye katlar, kısaltmaları birleştirir ve POI tipini
+-- tekrarlayan genel kelimeleri ("durağı", "istasyonu", "şarj" ...) atar.
+CREATE OR REPLACE MACRO util.tr_fold(s) AS
+  replace(strip_accents(lower(replace(replace(s, 'İ', 'i'), 'I', 'ı'))), 'ı', 'i');
+CREATE OR REPLACE MACRO util.poi_name_key(name) AS trim(regexp_replace(
+  regexp_replace(
+    regexp_replace(
+      regexp_replace(
+        regexp_replace(
+          regexp_replace(util.tr_fold(coalesce(name, '')), '[^a-z0-9]+', ' ', 'g'),
+          '\b(mahallesi|mah)\b', 'mah', 'g'),
+        '\b(caddesi|cad|cd)\b', 'cad', 'g'),
+      '\b(sokagi|sokak|sok|sk)\b', 'sok', 'g'),
+    '\b(duragi|durak|istasyonu|istasyon|ist|metro|tramvay|sarj|elektrikli|arac|muzesi|muze|tiyatrosu|tiyatro|sahnesi|bufe|umumi|tuvalet|wc|bisiklet|park|parki|alani|otoparki)\b', ' ', 'g'),
+  '\s+', ' ', 'g'));
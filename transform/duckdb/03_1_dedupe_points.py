@@ -0,0 +1,243 @@
+"""
+Yakın kopya POI birleştirme: 03 yalnızca birebir aynı satırları atar; aynı durak ya da
+şarj noktası birkaç metre kayık veya hafif farklı isimle iki kez kalabiliyor.
+
+- Bloklama: adaylar yalnızca aynı poi_type'ın, tipin eşleşme yarıçapı boyundaki metrik
+  (UTM 35N) hücrelerinde ve 3x3 komşuluğunda aranır; çift sayısı POI sayısıyla doğrusal.
+- Karşılaştırma: util.poi_name_key ile Türkçe normalize edilmiş isimlerin Jaro-Winkler
+  benzerliği (kelime sırasından bağımsız olması için sıralı kelimelerle de denenir).
+  İsimsiz POI'ler yalnızca çok yakınsa eşleşir; aynı kaynağın iki kaydı ayrıca aynı
+  subtype'ı taşımalı (ör. iki yöndeki aynı isimli otobüs durakları ayrı kalır).
+- Kümeleme: çiftler mesafe sırasıyla union-find'a verilir; bir birleşme kümenin
+  kapsama kutusunu tipin yarıçapının MAX_SPAN katından büyütecekse yapılmaz (zincirleme
+  ile birbirinden uzak POI'lerin aynı kümeye düşmesini engeller).
+- Küme başına bir kanonik POI kalır (resmi kaynak > dolu alan sayısı > poi_id); boş
+  adres/subtype/ilçe diğer üyelerden doldurulur. Üyeler raw.poi_merges'e yazılır.
+"""
+import numpy as np
+
+READS = ["raw.pois_pcd", "util.poi_name_key", "util.to_metric"]
+OUTPUTS = {"raw.pois_pcd": "TABLE", "raw.poi_merges": "TABLE"}
+
+# Eşleşme yarıçapı (m); istasyonların farklı kaynaklardaki noktaları daha dağınık
+RADIUS_M = {
+    "metro_station": 150,
+    "tram_station": 100,
+    "museum": 100,
+    "theater": 100,
+    "health": 60,
+}
+DEFAULT_RADIUS_M = 40
+NAMELESS_M = 15          # isimlerden biri boşsa (ya da tip kelimelerinden ibaretse)
+NAME_SIMILARITY = 0.88   # Jaro-Winkler eşiği, normalize isimler üzerinde
+MAX_SPAN = 1.5           # küme kapsama kutusu köşegeni <= MAX_SPAN * yarıçap
+
+
+def _radius_values() -> str:
+    return ", ".join(f"('{t}', {r})" for t, r in RADIUS_M.items())
+
+
+# Metrik koordinatlar, isim anahtarları ve blok hücresi; idx union-find dizini
+POINTS_SQL = f"""
+CREATE OR REPLACE TEMP TABLE dedupe_points AS
+WITH pts AS (
+  SELECT
+    p.poi_id,
+    p.poi_type,
+    p.source,
+    p.subtype,
+    util.to_metric(p.geom) AS geom_m,
+    util.poi_name_key(p.name) AS name_key,
+    COALESCE(r.radius_m, {DEFAULT_RADIUS_M}) AS radius_m
+  FROM raw.pois_pcd p
+  LEFT JOIN (VALUES {_radius_values()}) r(poi_type, radius_m) USING (poi_type)
+  WHERE p.geom IS NOT NULL AND p.poi_type IS NOT NULL
+  -- 03'teki poi_id yalnızca isim/tip/kaynak/konumdan; adresi farklı satırlar aynı id'yi taşıyabilir
+  QUALIFY row_number() OVER (PARTITION BY p.poi_id ORDER BY p.address_text NULLS LAST) = 1
+)
+SELECT
+  CAST(row_number() OVER (ORDER BY poi_id) - 1 AS INTEGER) AS idx,
+  poi_id,
+  poi_type,
+  source,
+  subtype,
+  ST_X(geom_m) AS x_m,
+  ST_Y(geom_m) AS y_m,
+  name_key,
+  array_to_string(list_sort(string_split(name_key, ' ')), ' ') AS token_key,
+  radius_m,
+  CAST(floor(ST_X(geom_m) / radius_m) AS BIGINT) AS block_x,
+  CAST(floor(ST_Y(geom_m) / radius_m) AS BIGINT) AS block_y
+FROM pts
+"""
+
+# Aday çiftler: her nokta 3x3 komşu bloğu yoklar, eşitlikle hash join (b.idx > a.idx: tek yön)
+PAIRS_SQL = f"""
+WITH offsets AS (
+  SELECT * FROM (VALUES (-1), (0), (1)) t(d)
+),
+probe AS (
+  SELECT a.*, a.block_x + ox.d AS probe_x, a.block_y + oy.d AS probe_y
+  FROM dedupe_points a, offsets ox, offsets oy
+),
+near AS (
+  SELECT
+    a.idx AS a,
+    b.idx AS b,
+    sqrt((a.x_m - b.x_m) ^ 2 + (a.y_m - b.y_m) ^ 2) AS dist_m,
+    a.radius_m,
+    a.name_key AS a_key, b.name_key AS b_key,
+    a.token_key AS a_tokens, b.token_key AS b_tokens,
+    a.source = b.source AS same_source,
+    a.subtype IS NOT DISTINCT FROM b.subtype AS same_subtype
+  FROM probe a
+  JOIN dedupe_points b
+    ON b.poi_type = a.poi_type
+   AND b.block_x = a.probe_x
+   AND b.block_y = a.probe_y
+   AND b.idx > a.idx
+),
+scored AS (
+  SELECT
+    *,
+    CASE
+      WHEN a_key = '' OR b_key = '' THEN NULL
+      ELSE greatest(jaro_winkler_similarity(a_key, b_key), jaro_winkler_similarity(a_tokens, b_tokens))
+    END AS similarity
+  FROM near
+  WHERE dist_m <= radius_m
+    AND (NOT same_source OR same_subtype)
+)
+SELECT a, b, dist_m, radius_m, similarity
+FROM scored
+WHERE CASE
+  WHEN similarity IS NULL THEN dist_m <= {NAMELESS_M}
+  ELSE similarity >= {NAME_SIMILARITY}
+END
+ORDER BY dist_m, a, b
+"""
+
+# Kanonik seçim: resmi kaynak önce, sonra dolu alan sayısı, eşitlikte poi_id
+MERGES_SQL = """
+CREATE OR REPLACE TABLE raw.poi_merges AS
+WITH members AS (
+  SELECT
+    c.cluster,
+    d.x_m, d.y_m, d.name_key,
+    p.poi_id, p.name, p.source, p.lon, p.lat, p.address_text, p.subtype, p.district_name,
+    row_number() OVER (
+      PARTITION BY c.cluster
+      ORDER BY
+        CASE WHEN p.source LIKE 'ibb_%' OR p.source = 'iett_bus_stops' THEN 0 ELSE 1 END,
+        (p.name IS NOT NULL)::INT + (p.address_text IS NOT NULL)::INT
+          + (p.subtype IS NOT NULL)::INT + (p.district_name IS NOT NULL)::INT DESC,
+        p.poi_id
+    ) AS member_rank
+  FROM clusters c
+  JOIN dedupe_points d USING (idx)
+  JOIN (
+    SELECT * FROM raw.pois_pcd
+    QUALIFY row_number() OVER (PARTITION BY poi_id ORDER BY address_text NULLS LAST) = 1
+  ) p USING (poi_id)
+),
+canonical AS (
+  SELECT cluster, poi_id, x_m, y_m, name_key
+  FROM members
+  WHERE member_rank = 1
+)
+SELECT
+  k.poi_id,
+  m.poi_id AS member_poi_id,
+  m.member_rank = 1 AS is_canonical,
+  m.source,
+  m.name,
+  m.address_text,
+  m.subtype,
+  m.district_name,
+  m.lon,
+  m.lat,
+  round(sqrt((m.x_m - k.x_m) ^ 2 + (m.y_m - k.y_m) ^ 2), 1) AS distance_m,
+  round(jaro_winkler_similarity(m.name_key, k.name_key), 3) AS name_similarity,
+  m.member_rank
+FROM members m
+JOIN canonical k USING (cluster)
+"""
+
+# Kopyalar atılır; kanonik satırın boş alanları küme üyelerinden (sıra önceliğiyle) dolar
+APPLY_SQL = """
+CREATE OR REPLACE TABLE raw.pois_pcd AS
+WITH fill AS (
+  SELECT
+    poi_id,
+    first(address_text ORDER BY member_rank) FILTER (WHERE address_text IS NOT NULL) AS address_text,
+    first(subtype ORDER BY member_rank) FILTER (WHERE subtype IS NOT NULL) AS subtype,
+    first(district_name ORDER BY member_rank) FILTER (WHERE district_name IS NOT NULL) AS district_name
+  FROM raw.poi_merges
+  GROUP BY poi_id
+)
+SELECT
+  p.* REPLACE (
+    COALESCE(p.address_text, f.address_text) AS address_text,
+    COALESCE(p.district_name, f.district_name) AS district_name,
+    COALESCE(p.subtype, f.subtype) AS subtype
+  )
+FROM raw.pois_pcd p
+LEFT JOIN fill f USING (poi_id)
+WHERE NOT EXISTS (
+  SELECT 1 FROM raw.poi_merges m
+  WHERE m.member_poi_id = p.poi_id AND NOT m.is_canonical
+)
+"""
+
+
+def cluster_pairs(n, a, b, radius, x, y, max_span=MAX_SPAN):
+    """
+    Union-find over candidate pairs (already ordered by distance). A union is
+    skipped when the merged cluster's bounding box diagonal would exceed
+    max_span * radius. Returns the root index of every point.
+    """
+    parent = list(range(n))
+    # Kök başına kapsama kutusu; listeler numpy skaler erişiminden hızlı
+    minx, maxx = list(map(float, x)), list(map(float, x))
+    miny, maxy = list(map(float, y)), list(map(float, y))
+
+    def find(i):
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:  # yol sıkıştırma
+            parent[i], i = root, parent[i]
+        return root
+
+    for i, j, r in zip(a.tolist(), b.tolist(), radius.tolist()):
+        ri, rj = find(i), find(j)
+        if ri == rj:
+            continue
+        x0, x1 = min(minx[ri], minx[rj]), max(maxx[ri], maxx[rj])
+        y0, y1 = min(miny[ri], miny[rj]), max(maxy[ri], maxy[rj])
+        if (x1 - x0) ** 2 + (y1 - y0) ** 2 > (max_span * r) ** 2:
+            continue
+        parent[rj] = ri
+        minx[ri], maxx[ri], miny[ri], maxy[ri] = x0, x1, y0, y1
+
+    return np.array([find(i) for i in range(n)], dtype=np.int64)
+
+
+def run(cur):
+    cur.execute(POINTS_SQL)
+    points = cur.execute("SELECT idx, x_m, y_m FROM dedupe_points ORDER BY idx").fetchnumpy()
+    pairs = cur.execute(PAIRS_SQL).fetchnumpy()
+
+    roots = cluster_pairs(
+        len(points["idx"]), pairs["a"], pairs["b"], pairs["radius_m"], points["x_m"], points["y_m"],
+    )
+    sizes = np.bincount(roots, minlength=len(roots))
+    merged = np.flatnonzero(sizes[roots] > 1)
+    clusters = {  # noqa: F841 (DuckDB replacement scan)
+        "idx": merged.astype(np.int32),
+        "cluster": roots[merged].astype(np.int32),
+    }
+
+    cur.execute(MERGES_SQL)
+    cur.execute(APPLY_SQL)
+    cur.execute("DROP TABLE dedupe_points")
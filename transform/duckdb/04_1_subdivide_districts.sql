@@ -0,0 +1,42 @@
+LOAD spatial;
+
+-- İlçe sınırlarını grid hücreleriyle parçala (DuckDB spatial'da ST_Subdivide yok).
+-- Her parça tek bir hücrede kalır: bbox/hücre anahtarıyla ucuzca elenir ve
+-- karmaşık çokgen yerine küçük parçalarla mesafe/kesişim hesaplanır.
+-- is_interior: parça hücrenin tamamını kaplıyor, hücredeki nokta testsiz bu ilçeye düşer.
+CREATE OR REPLACE TABLE raw.district_parts AS
+WITH xs AS (
+  SELECT
+    district_id,
+    district_name,
+    geom,
+    UNNEST(range(util.cell_x(ST_XMin(geom)), util.cell_x(ST_XMax(geom)) + 1)) AS cell_x,
+    util.cell_y(ST_YMin(geom)) AS y0,
+    util.cell_y(ST_YMax(geom)) AS y1
+  FROM raw.dim_district
+),
+cells AS (
+  SELECT district_id, district_name, geom, cell_x, UNNEST(range(y0, y1 + 1)) AS cell_y
+  FROM xs
+),
+parts AS (
+  SELECT
+    district_id,
+    district_name,
+    cell_x,
+    cell_y,
+    ST_Intersection(geom, util.cell_envelope(cell_x, cell_y)) AS geom,
+    ST_Covers(geom, util.cell_envelope(cell_x, cell_y)) AS is_interior
+  FROM cells
+)
+SELECT
+  district_id,
+  district_name,
+  cell_x,
+  cell_y,
+  util.cell_key(cell_x, cell_y) AS cell_id,
+  is_interior,
+  geom,
+  util.to_metric(geom) AS geom_m
+FROM parts
+WHERE NOT ST_IsEmpty(geom);
@@ -9,14 +9,29 @@ SELECT
   ST_AsText(d.geom) AS geom_wkt
 FROM raw.dim_district d;
 
--- Covers ile eşle
+-- Hücre indeksiyle eşle: POI'nin hücresindeki ilçe parçaları adaydır.
+-- İç hücreler (is_interior) doğrudan eşleşir, yalnızca sınır hücrelerinde
+-- küçük parça üzerinde ST_Covers çalışır. cell_id sonraki agregasyonlar için saklanır.
 CREATE OR REPLACE TABLE raw.pois_pcd AS
-SELECT DISTINCT
+WITH pts AS (
+  SELECT *, util.cell_id(lon, lat) AS cell_id
+  FROM raw.pois_pcd
+),
+matched AS (
+  SELECT p.poi_id, dp.district_id, dp.district_name
+  FROM pts p
+  JOIN raw.district_parts dp
+    ON dp.cell_id = p.cell_id
+  WHERE dp.is_interior OR ST_Covers(dp.geom, p.geom)
+)
+SELECT
   p.poi_id, p.name, p.poi_type, p.subtype, p.source,
-  dd.district_id,
-  dd.district_name AS district_name,
+  m.district_id,
+  m.district_name AS district_name,
   p.address_text, p.lon, p.lat, p.geom,
-  p.updated_at
-FROM raw.pois_pcd p
-LEFT JOIN raw.districts_fix dd
-  ON ST_Covers(dd.geom, p.geom);
+  p.updated_at,
+  p.cell_id
+FROM pts p
+LEFT JOIN matched m USING (poi_id)
+-- poi_id başına tek satır (sınırdaki noktalar iki ilçeye de düşebilir)
+QUALIFY row_number() OVER (PARTITION BY p.poi_id ORDER BY m.district_id NULLS LAST) = 1;
@@ -1,21 +1,35 @@
 LOAD spatial;
 
--- Null kalan POI’ler için nearest district
+-- Null kalan POI’ler için nearest district, tek geçişte:
+-- adaylar POI hücresi + 8 komşu hücredeki ilçe parçaları (hücre > 500 m, toleransı kapsar),
+-- mesafe metrik projeksiyonda (UTM 35N) parça başına bir kez hesaplanır.
+-- Komşulukta parça yoksa snapped_district_id / snap_dist_m NULL kalır (> ~840 m uzakta).
 CREATE OR REPLACE TABLE raw.pois_snapped AS
-WITH fixed AS (
-  SELECT district_id, geom FROM raw.districts_fix
+WITH missing AS (
+  SELECT
+    poi_id,
+    util.cell_x(lon) AS cell_x,
+    util.cell_y(lat) AS cell_y,
+    util.to_metric(geom) AS geom_m
+  FROM raw.pois_pcd
+  WHERE district_id IS NULL
+),
+candidates AS (
+  SELECT
+    m.poi_id,
+    dp.district_id,
+    ST_Distance(m.geom_m, dp.geom_m) AS dist_m
+  FROM missing m
+  CROSS JOIN (SELECT UNNEST([-1, 0, 1]) AS dx) ox
+  CROSS JOIN (SELECT UNNEST([-1, 0, 1]) AS dy) oy
+  JOIN raw.district_parts dp
+    ON dp.cell_x = m.cell_x + ox.dx
+   AND dp.cell_y = m.cell_y + oy.dy
 )
 SELECT
-  p.poi_id,
-  (
-    SELECT d.district_id
-    FROM fixed d
-    ORDER BY ST_Distance(p.geom, d.geom)
-    LIMIT 1
-  ) AS snapped_district_id,
-  (
-    SELECT MIN(ST_Distance(p.geom, d.geom))
-    FROM fixed d
-  ) AS snap_dist_m
-FROM raw.pois_pcd p
-WHERE p.district_id IS NULL;
+  m.poi_id,
+  arg_min(c.district_id, c.dist_m) AS snapped_district_id,
+  min(c.dist_m) AS snap_dist_m
+FROM missing m
+LEFT JOIN candidates c USING (poi_id)
+GROUP BY m.poi_id;
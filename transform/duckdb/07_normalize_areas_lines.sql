@@ -1,49 +1,103 @@
 LOAD SPATIAL;
 
+-- Ortak overlay: bir katmanı ilçe parçalarıyla (raw.district_parts) keser.
+-- Her özellik kapladığı grid hücrelerine açılır, yalnızca aynı hücredeki küçük
+-- parçalarla eşleşir ve her (özellik, parça) kesişimi tek bir kez hesaplanır.
+-- Yeni bir çokgen/çizgi katmanı için: util.district_overlay('raw.<katman>')
+CREATE OR REPLACE MACRO util.district_overlay(layer) AS TABLE
+WITH features AS (
+  SELECT
+    row_number() OVER () AS feature_idx,
+    name, subtype, source, poi_type, geom
+  FROM query_table(layer)
+  WHERE geom IS NOT NULL
+),
+xs AS (
+  SELECT
+    *,
+    UNNEST(range(util.cell_x(ST_XMin(geom)), util.cell_x(ST_XMax(geom)) + 1)) AS cell_x,
+    util.cell_y(ST_YMin(geom)) AS y0,
+    util.cell_y(ST_YMax(geom)) AS y1
+  FROM features
+),
+cells AS (
+  SELECT feature_idx, name, subtype, source, poi_type, geom, cell_x, UNNEST(range(y0, y1 + 1)) AS cell_y
+  FROM xs
+)
+SELECT
+  f.feature_idx,
+  f.name,
+  f.subtype,
+  f.source,
+  f.poi_type,
+  dp.district_id,
+  dp.district_name,
+  dp.cell_id,
+  dp.cell_x,
+  dp.cell_y,
+  ST_Intersection(f.geom, dp.geom) AS geom
+FROM cells f
+JOIN raw.district_parts dp
+  ON dp.cell_x = f.cell_x
+ AND dp.cell_y = f.cell_y
+ AND ST_Intersects(f.geom, dp.geom);
+
+-- Parça tabloları: ölçü, kesişim geometrisinden bir kez türetilir (eski 3857 ölçüsü korunur).
+-- Üç katman birbirinden bağımsız, runner bunları paralel çalıştırır.
+CREATE OR REPLACE TABLE raw.green_area_pieces AS
+SELECT *, ST_Area(ST_Transform(geom, 'EPSG:4326', 'EPSG:3857')) AS area_m2
+FROM util.district_overlay('raw.green_areas');
+
+CREATE OR REPLACE TABLE raw.bike_lane_pieces AS
+SELECT *, ST_Length(ST_Transform(geom, 'EPSG:4326', 'EPSG:3857')) AS length_m
+FROM util.district_overlay('raw.bike_lanes');
+
+CREATE OR REPLACE TABLE raw.pedestrian_area_pieces AS
+SELECT *, ST_Length(ST_Transform(geom, 'EPSG:4326', 'EPSG:3857')) AS length_m
+FROM util.district_overlay('raw.pedestrian_areas');
+
+-- Parçaları özellik × ilçe bazında geri birleştir (çıktı şeması değişmedi)
 CREATE OR REPLACE TABLE raw.green_areas_pcd AS
 SELECT
-  md5(COALESCE(g.name,'') || '|' || COALESCE(g.poi_type,'') || '|' || COALESCE(g.source,'') || '|' || COALESCE(d.district_name,'')) AS area_id,
-  g.name,
-  g.subtype,
-  d.district_name AS district_name,
-  d.district_id AS district_id,
-  ST_Area(ST_Transform(ST_Intersection(g.geom, d.geom), 'EPSG:4326', 'EPSG:3857')) AS area_m2,
-  ST_Intersection(g.geom, d.geom) AS geom,
-  g.source,
-  g.poi_type
-FROM raw.green_areas g
-JOIN raw.districts_fix d
-  ON ST_Intersects(g.geom, d.geom)
-WHERE ST_Area(ST_Transform(ST_Intersection(g.geom, d.geom), 'EPSG:4326', 'EPSG:3857')) > 0;
+  md5(COALESCE(name,'') || '|' || COALESCE(poi_type,'') || '|' || COALESCE(source,'') || '|' || COALESCE(district_name,'')) AS area_id,
+  name,
+  subtype,
+  district_name,
+  district_id,
+  SUM(area_m2) AS area_m2,
+  ST_Union_Agg(geom) AS geom,
+  source,
+  poi_type
+FROM raw.green_area_pieces
+WHERE area_m2 > 0
+GROUP BY feature_idx, name, subtype, source, poi_type, district_id, district_name;
 
 CREATE OR REPLACE TABLE raw.bike_lanes_pcd AS
 SELECT
-  md5(COALESCE(b.name,'') || '|' || COALESCE(b.poi_type,'') || '|' || COALESCE(b.source,'') || '|' || COALESCE(d.district_name,'')) AS area_id,
-  b.name,
-  b.subtype,
-  d.district_name AS district_name,
-  d.district_id AS district_id,
-  ST_Length(ST_Transform(ST_Intersection(b.geom, d.geom), 'EPSG:4326', 'EPSG:3857')) / 1000 AS length_km,
-  ST_Intersection(b.geom, d.geom) AS geom,
-  b.source,
-  b.poi_type
-FROM raw.bike_lanes b
-JOIN raw.districts_fix d
-  ON ST_Intersects(b.geom, d.geom)
-WHERE ST_Length(ST_Transform(ST_Intersection(b.geom, d.geom), 'EPSG:4326', 'EPSG:3857')) > 0;
+  md5(COALESCE(name,'') || '|' || COALESCE(poi_type,'') || '|' || COALESCE(source,'') || '|' || COALESCE(district_name,'')) AS area_id,
+  name,
+  subtype,
+  district_name,
+  district_id,
+  SUM(length_m) / 1000 AS length_km,
+  ST_Union_Agg(geom) AS geom,
+  source,
+  poi_type
+FROM raw.bike_lane_pieces
+WHERE length_m > 0
+GROUP BY feature_idx, name, subtype, source, poi_type, district_id, district_name;
 
 CREATE OR REPLACE TABLE raw.pedestrian_areas_pcd AS
 SELECT
-  md5(COALESCE(p.name,'') || '|' || COALESCE(p.poi_type,'') || '|' || COALESCE(p.source,'') || '|' || COALESCE(d.district_name,'')) AS area_id,
-  p.name,
-  p.subtype,
-  d.district_name AS district_name,
-  d.district_id AS district_id,
-  ST_Length(ST_Transform(ST_Intersection(p.geom, d.geom), 'EPSG:4326', 'EPSG:3857')) AS length_m,
-  ST_Intersection(p.geom, d.geom) AS geom,
-  p.source,
-  p.poi_type
-FROM raw.pedestrian_areas p
-JOIN raw.districts_fix d
-  ON ST_Intersects(p.geom, d.geom)
-WHERE ST_Length(ST_Transform(ST_Intersection(p.geom, d.geom), 'EPSG:4326', 'EPSG:3857')) > 0;
+  md5(COALESCE(name,'') || '|' || COALESCE(poi_type,'') || '|' || COALESCE(source,'') || '|' || COALESCE(district_name,'')) AS area_id,
+  name,
+  subtype,
+  district_name,
+  district_id,
+  SUM(length_m) AS length_m,
+  ST_Union_Agg(geom) AS geom,
+  source,
+  poi_type
+FROM raw.pedestrian_area_pieces
+WHERE length_m > 0
+GROUP BY feature_idx, name, subtype, source, poi_type, district_id, district_name;
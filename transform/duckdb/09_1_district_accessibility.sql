@@ -0,0 +1,21 @@
+LOAD spatial;
+
+-- İlçe × poi_type erişilebilirlik özeti (raw.accessibility_grid'den).
+-- Nüfus ızgarası yok: hücreler eşit alanlı ve nüfus ilçe içinde düzgün dağılmış
+-- varsayılır, yani "X m içindeki nüfus payı" = X m içindeki hücre payı.
+CREATE OR REPLACE TABLE raw.district_accessibility AS
+SELECT
+  g.district_id,
+  d.district_name,
+  g.poi_type,
+  count(*) AS cells,
+  round(median(g.dist_m)) AS median_dist_m,
+  round(quantile_cont(g.dist_m, 0.9)) AS p90_dist_m,
+  round(avg(CASE WHEN g.dist_m <= 500 THEN 1 ELSE 0 END), 4) AS share_within_500m,
+  round(avg(CASE WHEN g.dist_m <= 1000 THEN 1 ELSE 0 END), 4) AS share_within_1000m,
+  round(any_value(m.population) * avg(CASE WHEN g.dist_m <= 500 THEN 1 ELSE 0 END)) AS population_within_500m,
+  round(any_value(m.population) * avg(CASE WHEN g.dist_m <= 1000 THEN 1 ELSE 0 END)) AS population_within_1000m
+FROM raw.accessibility_grid g
+JOIN raw.dim_district d USING (district_id)
+LEFT JOIN raw.district_metrics m USING (district_id)
+GROUP BY g.district_id, d.district_name, g.poi_type;
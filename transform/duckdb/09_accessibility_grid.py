@@ -0,0 +1,98 @@
+"""
+Erişilebilirlik yüzeyi: İstanbul'u 500 m'lik metrik (UTM 35N) bir grid ile kaplar ve
+her hücre merkezi için her poi_type'ın en yakın POI'sine olan mesafeyi hesaplar.
+
+En yakın komşu araması tip başına bir cKDTree ile vektörel yapılır (hücre × POI
+döngüsü yok). Pipeline adımı olarak scripts/refresh_duckdb.py çalıştırır: run(cur).
+"""
+import numpy as np
+from scipy.spatial import cKDTree
+
+READS = ["raw.district_parts", "raw.pois_pcd", "util.cell_id", "util.to_metric"]
+OUTPUTS = {"raw.accessibility_grid": "TABLE"}
+
+CELL_M = 500
+
+# Hücre merkezleri; ilçesi 04_1'deki hücre indeksiyle bulunur (iç hücre => testsiz)
+CELLS_SQL = f"""
+WITH bounds AS (
+  SELECT
+    CAST(floor(min(ST_XMin(geom_m)) / {CELL_M}) AS BIGINT) AS x0,
+    CAST(floor(max(ST_XMax(geom_m)) / {CELL_M}) AS BIGINT) AS x1,
+    CAST(floor(min(ST_YMin(geom_m)) / {CELL_M}) AS BIGINT) AS y0,
+    CAST(floor(max(ST_YMax(geom_m)) / {CELL_M}) AS BIGINT) AS y1
+  FROM raw.district_parts
+),
+xs AS (
+  SELECT UNNEST(range(x0, x1 + 1)) AS gx, y0, y1 FROM bounds
+),
+centers AS (
+  SELECT
+    gx,
+    gy,
+    ST_Transform(
+      ST_Point((gx + 0.5) * {CELL_M}, (gy + 0.5) * {CELL_M}),
+      'EPSG:32635', 'EPSG:4326', true
+    ) AS geom
+  FROM (SELECT gx, UNNEST(range(y0, y1 + 1)) AS gy FROM xs)
+)
+SELECT
+  c.gx,
+  c.gy,
+  (c.gx + 0.5) * {CELL_M} AS x_m,
+  (c.gy + 0.5) * {CELL_M} AS y_m,
+  ST_X(c.geom) AS lon,
+  ST_Y(c.geom) AS lat,
+  dp.district_id
+FROM centers c
+JOIN raw.district_parts dp
+  ON dp.cell_id = util.cell_id(ST_X(c.geom), ST_Y(c.geom))
+WHERE dp.is_interior OR ST_Covers(dp.geom, c.geom)
+QUALIFY row_number() OVER (PARTITION BY c.gx, c.gy ORDER BY dp.district_id) = 1
+ORDER BY c.gx, c.gy
+"""
+
+POIS_SQL = """
+SELECT poi_type, ST_X(geom_m) AS x_m, ST_Y(geom_m) AS y_m
+FROM (
+  SELECT poi_type, util.to_metric(geom) AS geom_m
+  FROM raw.pois_pcd
+  WHERE geom IS NOT NULL AND poi_type IS NOT NULL
+)
+"""
+
+
+def nearest_distances(cell_xy, pois):
+    """Yields (poi_type, distance array) for every POI type present in `pois`."""
+    types = np.asarray(pois["poi_type"], dtype=object)
+    poi_xy = np.column_stack([pois["x_m"], pois["y_m"]]).astype(np.float64)
+    for poi_type in sorted(set(types)):
+        tree = cKDTree(poi_xy[types == poi_type])
+        dist, _ = tree.query(cell_xy, k=1, workers=-1)
+        yield poi_type, dist
+
+
+def run(cur):
+    cells = cur.execute(CELLS_SQL).fetchnumpy()
+    pois = cur.execute(POIS_SQL).fetchnumpy()
+    cell_xy = np.column_stack([cells["x_m"], cells["y_m"]]).astype(np.float64)
+
+    parts = {key: [] for key in ("gx", "gy", "district_id", "lon", "lat", "poi_type", "dist_m")}
+    for poi_type, dist in nearest_distances(cell_xy, pois):
+        for key in ("gx", "gy", "district_id", "lon", "lat"):
+            parts[key].append(np.asarray(cells[key]))
+        parts["poi_type"].append(np.full(len(dist), poi_type, dtype=object))
+        parts["dist_m"].append(np.round(dist, 1))
+
+    accessibility = {key: np.concatenate(values) if values else np.array([]) for key, values in parts.items()}
+    cur.execute("""
+        CREATE OR REPLACE TABLE raw.accessibility_grid AS
+        SELECT
+          CAST(gx AS INTEGER) AS cell_x,
+          CAST(gy AS INTEGER) AS cell_y,
+          CAST(district_id AS INTEGER) AS district_id,
+          CAST(poi_type AS VARCHAR) AS poi_type,
+          dist_m,
+          ST_Point(lon, lat) AS geom
+        FROM accessibility
+    """)
@@ -0,0 +1,43 @@
+LOAD spatial;
+
+-- Hücre bazlı ön-agregasyonlar (0.01° ortak grid): /metrics/area keyfi bir çokgen için
+-- tamamen kapsanan hücreleri buradan toplar, yalnızca sınır hücrelerinde kesişim yapar.
+-- Ölçüler 07'deki parçalarla aynı (3857), böylece ilçe toplamlarıyla tutarlı.
+CREATE OR REPLACE TABLE raw.cell_metrics AS
+WITH pieces AS (
+  SELECT cell_x, cell_y, area_m2 AS green_area_m2, 0 AS bike_lane_m, 0 AS pedestrian_length_m
+  FROM raw.green_area_pieces
+  UNION ALL
+  SELECT cell_x, cell_y, 0, length_m, 0
+  FROM raw.bike_lane_pieces
+  UNION ALL
+  SELECT cell_x, cell_y, 0, 0, length_m
+  FROM raw.pedestrian_area_pieces
+)
+SELECT
+  cell_x,
+  cell_y,
+  SUM(green_area_m2) AS green_area_m2,
+  SUM(bike_lane_m) / 1000 AS bike_lane_km,
+  SUM(pedestrian_length_m) AS pedestrian_length_m
+FROM pieces
+GROUP BY cell_x, cell_y;
+
+-- POI'ler konumlarının hücresine sayılır (sınır hücresinde aynı floor kuralı kullanılır)
+CREATE OR REPLACE TABLE raw.cell_poi_counts AS
+SELECT
+  util.cell_x(ST_X(geom)) AS cell_x,
+  util.cell_y(ST_Y(geom)) AS cell_y,
+  poi_type,
+  count(*) AS poi_count
+FROM raw.pois_pcd
+WHERE geom IS NOT NULL AND poi_type IS NOT NULL
+GROUP BY ALL;
+
+-- Sınır hücrelerinde tam kesişim için hücreye kırpılmış parçalar
+CREATE OR REPLACE TABLE raw.cell_pieces AS
+SELECT cell_x, cell_y, 'green_area' AS layer, geom FROM raw.green_area_pieces WHERE area_m2 > 0
+UNION ALL
+SELECT cell_x, cell_y, 'bike_lane', geom FROM raw.bike_lane_pieces WHERE length_m > 0
+UNION ALL
+SELECT cell_x, cell_y, 'pedestrian', geom FROM raw.pedestrian_area_pieces WHERE length_m > 0;
@@ -35,4 +35,24 @@ CREATE INDEX IF NOT EXISTS idx_rankings_district_id
 
 -- POI Summary
 CREATE INDEX IF NOT EXISTS idx_summary_district_id
-    ON city.poi_summary (district_id);
\ No newline at end of file
+    ON city.poi_summary (district_id);
+
+-- POI Clusters (seviye + hücre aralığı sorguları)
+CREATE INDEX IF NOT EXISTS idx_poi_clusters_cell
+    ON city.poi_clusters (level, cell_x, cell_y);
+
+-- Accessibility grid (ısı haritası bbox + tip sorguları)
+CREATE INDEX IF NOT EXISTS idx_accessibility_grid_geom
+    ON city.accessibility_grid
+    USING GIST (geom);
+
+CREATE INDEX IF NOT EXISTS idx_accessibility_grid_type
+    ON city.accessibility_grid (poi_type);
+
+-- Cell pieces (sınır hücresi araması)
+CREATE INDEX IF NOT EXISTS idx_cell_pieces_cell
+    ON city.cell_pieces (cell_x, cell_y);
+
+-- POI merges (kanonik POI'nin üyeleri)
+CREATE INDEX IF NOT EXISTS idx_poi_merges_poi_id
+    ON city.poi_merges (poi_id);
@@ -98,3 +98,96 @@ CREATE TABLE IF NOT EXISTS city.poi_summary (
     theater_count                BIGINT,
     toilet_count                 BIGINT
 );
+
+-- 8. Data version (her tam yüklemede load_postgis.py tarafından artırılır)
+CREATE TABLE IF NOT EXISTS city.data_version (
+    id        BOOLEAN PRIMARY KEY DEFAULT true CHECK (id),
+    version   BIGINT NOT NULL,
+    loaded_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- 9. POI clusters (düşük zoom için çok çözünürlüklü grid; load_postgis.py yeniler)
+-- level: hücre boyu 0.01° * 2^level; centroid ve kapsama kutusu hücredeki POI'lerden
+CREATE TABLE IF NOT EXISTS city.poi_clusters (
+    level      SMALLINT NOT NULL,
+    cell_x     INT NOT NULL,
+    cell_y     INT NOT NULL,
+    poi_type   TEXT NOT NULL,
+    poi_count  INT NOT NULL,
+    lon        DOUBLE PRECISION NOT NULL,
+    lat        DOUBLE PRECISION NOT NULL,
+    min_lon    DOUBLE PRECISION NOT NULL,
+    min_lat    DOUBLE PRECISION NOT NULL,
+    max_lon    DOUBLE PRECISION NOT NULL,
+    max_lat    DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (level, poi_type, cell_x, cell_y)
+);
+
+-- 10. Accessibility grid (500 m UTM hücre merkezinden her poi_type'ın en yakın POI'sine mesafe)
+CREATE TABLE IF NOT EXISTS city.accessibility_grid (
+    cell_x      INT,
+    cell_y      INT,
+    district_id INT,
+    poi_type    TEXT,
+    dist_m      DOUBLE PRECISION,
+    geom        GEOMETRY(POINT, 4326)
+);
+
+-- 11. District accessibility (ilçe × poi_type mesafe istatistikleri)
+CREATE TABLE IF NOT EXISTS city.district_accessibility (
+    district_id             INT,
+    district_name           TEXT,
+    poi_type                TEXT,
+    cells                   INT,
+    median_dist_m           DOUBLE PRECISION,
+    p90_dist_m              DOUBLE PRECISION,
+    share_within_500m       DOUBLE PRECISION,
+    share_within_1000m      DOUBLE PRECISION,
+    population_within_500m  DOUBLE PRECISION,
+    population_within_1000m DOUBLE PRECISION,
+    PRIMARY KEY (district_id, poi_type)
+);
+
+-- 12. Cell aggregates (0.01° grid; /metrics/area tam kapsanan hücreleri buradan toplar)
+CREATE TABLE IF NOT EXISTS city.cell_metrics (
+    cell_x              INT,
+    cell_y              INT,
+    green_area_m2       DOUBLE PRECISION,
+    bike_lane_km        DOUBLE PRECISION,
+    pedestrian_length_m DOUBLE PRECISION,
+    PRIMARY KEY (cell_x, cell_y)
+);
+
+CREATE TABLE IF NOT EXISTS city.cell_poi_counts (
+    cell_x    INT,
+    cell_y    INT,
+    poi_type  TEXT,
+    poi_count BIGINT,
+    PRIMARY KEY (cell_x, cell_y, poi_type)
+);
+
+-- Sınır hücrelerinde tam kesişim için hücreye kırpılmış alan/çizgi parçaları
+CREATE TABLE IF NOT EXISTS city.cell_pieces (
+    cell_x INT,
+    cell_y INT,
+    layer  TEXT,
+    geom   GEOMETRY(GEOMETRY, 4326)
+);
+
+-- 13. POI merges (03_1 yakın kopya birleştirme; poi_id kanonik POI, her üye bir satır)
+CREATE TABLE IF NOT EXISTS city.poi_merges (
+    poi_id          TEXT,
+    member_poi_id   TEXT,
+    is_canonical    BOOLEAN,
+    source          TEXT,
+    name            TEXT,
+    address_text    TEXT,
+    subtype         TEXT,
+    district_name   TEXT,
+    lon             DOUBLE PRECISION,
+    lat             DOUBLE PRECISION,
+    distance_m      DOUBLE PRECISION,
+    name_similarity DOUBLE PRECISION,
+    member_rank     INT,
+    PRIMARY KEY (member_poi_id)
+);
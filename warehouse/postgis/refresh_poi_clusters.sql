@@ -0,0 +1,27 @@
+-- POI kümelerini city.pois'ten yeniden hesapla (seviye 0..5 => 0.01°..0.32° hücreler).
+-- load_postgis.py bunu staging şemasında, swap'tan önce çalıştırır.
+TRUNCATE city.poi_clusters;
+
+INSERT INTO city.poi_clusters (
+    level, cell_x, cell_y, poi_type, poi_count, lon, lat, min_lon, min_lat, max_lon, max_lat
+)
+SELECT
+    l.level,
+    floor(ST_X(p.geom) / l.size)::int AS cell_x,
+    floor(ST_Y(p.geom) / l.size)::int AS cell_y,
+    p.poi_type,
+    count(*) AS poi_count,
+    avg(ST_X(p.geom)) AS lon,
+    avg(ST_Y(p.geom)) AS lat,
+    min(ST_X(p.geom)) AS min_lon,
+    min(ST_Y(p.geom)) AS min_lat,
+    max(ST_X(p.geom)) AS max_lon,
+    max(ST_Y(p.geom)) AS max_lat
+FROM city.pois p
+CROSS JOIN (
+    SELECT level, 0.01 * 2 ^ level AS size
+    FROM generate_series(0, 5) AS level
+) l
+WHERE p.geom IS NOT NULL
+  AND p.poi_type IS NOT NULL
+GROUP BY 1, 2, 3, 4;